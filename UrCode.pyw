@@ -1,2 +1,3 @@
-from __init__ import run
-run()
\ No newline at end of file
+if __name__ == "__main__":
+	from __init__ import run
+	run()
\ No newline at end of file
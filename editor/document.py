@@ -0,0 +1,173 @@
+from bisect import bisect_left
+from typing import Callable, Tuple
+
+_MAX_COALESCED_INSERT = 4096
+
+def _find_breaks(text: str, start: int = 0, end: int = -1) -> "list[int]":
+	result: list[int] = []
+	if end < 0: end = len(text)
+	index = text.find("\n", start, end)
+	while index >= 0:
+		result.append(index - start)
+		index = text.find("\n", index + 1, end)
+	return result
+
+class TextChange:
+	def __init__(self, offset: int, line: int, column: int, removed: int, removed_lines: int, text: str, inserted_lines: int) -> None:
+		self.offset = offset
+		self.line = line
+		self.column = column
+		self.removed = removed
+		self.removed_lines = removed_lines
+		self.text = text
+		self.inserted_lines = inserted_lines
+
+	def get_line_delta(self) -> int: return self.inserted_lines - self.removed_lines
+
+class _Piece:
+	__slots__ = ("buffer", "start", "length", "breaks")
+
+	def __init__(self, buffer: int, start: int, length: int, breaks: "list[int]") -> None:
+		self.buffer = buffer
+		self.start = start
+		self.length = length
+		self.breaks = breaks
+
+class TextDocument:
+	def __init__(self, text: str = "") -> None:
+		self.listeners: list[Callable[[TextChange], None]] = []
+		self._reset(text)
+
+	def _reset(self, text: str) -> None:
+		self.buffers: list[str] = [text]
+		self.pieces: list[_Piece] = [_Piece(0, 0, len(text), _find_breaks(text))] if len(text) > 0 else []
+		self.size: int = len(text)
+		self.breaks: int = text.count("\n")
+		self._append_piece: int = -1
+		self._append_offset: int = -1
+
+	def bind(self, listener: Callable[[TextChange], None]) -> None:
+		self.listeners.append(listener)
+
+	def unbind(self, listener: Callable[[TextChange], None]) -> None:
+		self.listeners.remove(listener)
+
+	def get_length(self) -> int: return self.size
+
+	def get_line_count(self) -> int: return self.breaks + 1
+
+	def get_text(self) -> str:
+		return "".join([self.buffers[piece.buffer][piece.start:piece.start + piece.length] for piece in self.pieces])
+
+	def get_range(self, start: int, end: int) -> str:
+		start = max(start, 0)
+		end = min(end, self.size)
+		if start >= end: return ""
+		result: list[str] = []
+		piece_offset = 0
+		for piece in self.pieces:
+			piece_end = piece_offset + piece.length
+			if piece_end > start:
+				buffer = self.buffers[piece.buffer]
+				result.append(buffer[piece.start + max(start - piece_offset, 0):piece.start + min(end, piece_end) - piece_offset])
+				if piece_end >= end: break
+			piece_offset = piece_end
+		return "".join(result)
+
+	def get_line(self, line: int) -> str:
+		return self.get_range(self.get_line_start(line), self.get_line_end(line))
+
+	def get_line_start(self, line: int) -> int:
+		if line <= 1: return 0
+		if line - 1 > self.breaks: return self.size
+		remaining = line - 2
+		piece_offset = 0
+		for piece in self.pieces:
+			if remaining < len(piece.breaks): return piece_offset + piece.breaks[remaining] + 1
+			remaining -= len(piece.breaks)
+			piece_offset += piece.length
+		return self.size
+
+	def get_line_end(self, line: int) -> int:
+		if line < 1: return 0
+		return self.size if line > self.breaks else self.get_line_start(line + 1) - 1
+
+	def get_offset(self, line: int, column: int) -> int:
+		start = self.get_line_start(line)
+		return min(start + max(column, 0), self.get_line_end(line)) if line <= self.breaks + 1 else self.size
+
+	def get_position(self, offset: int) -> Tuple[int, int]:
+		offset = min(max(offset, 0), self.size)
+		line = 1
+		line_start = 0
+		piece_offset = 0
+		for piece in self.pieces:
+			if piece_offset >= offset: break
+			count = bisect_left(piece.breaks, offset - piece_offset)
+			if count > 0:
+				line += count
+				line_start = piece_offset + piece.breaks[count - 1] + 1
+			piece_offset += piece.length
+		return line, offset - line_start
+
+	def set_text(self, text: str) -> None:
+		removed = self.size
+		removed_lines = self.breaks
+		self._reset(text)
+		self._notify(TextChange(0, 1, 0, removed, removed_lines, "", 0))
+		self._notify(TextChange(0, 1, 0, 0, 0, text, self.breaks))
+
+	def insert(self, offset: int, text: str) -> None:
+		if len(text) == 0: return
+		offset = min(max(offset, 0), self.size)
+		line, column = self.get_position(offset)
+		breaks = _find_breaks(text)
+		if offset == self._append_offset and len(self.buffers[-1]) < _MAX_COALESCED_INSERT:
+			piece = self.pieces[self._append_piece]
+			piece.breaks.extend([piece.length + index for index in breaks])
+			piece.length += len(text)
+			self.buffers[-1] += text
+		else:
+			index = self._split(offset)
+			self.buffers.append(text)
+			self.pieces.insert(index, _Piece(len(self.buffers) - 1, 0, len(text), breaks))
+			self._append_piece = index
+		self._append_offset = offset + len(text)
+		self.size += len(text)
+		self.breaks += len(breaks)
+		self._notify(TextChange(offset, line, column, 0, 0, text, len(breaks)))
+
+	def delete(self, start: int, end: int) -> None:
+		start = min(max(start, 0), self.size)
+		end = min(max(end, 0), self.size)
+		if start >= end: return
+		line, column = self.get_position(start)
+		first = self._split(start)
+		last = self._split(end)
+		removed_lines = 0
+		for piece in self.pieces[first:last]: removed_lines += len(piece.breaks)
+		del self.pieces[first:last]
+		self._append_piece = -1
+		self._append_offset = -1
+		self.size -= end - start
+		self.breaks -= removed_lines
+		self._notify(TextChange(start, line, column, end - start, removed_lines, "", 0))
+
+	def _split(self, offset: int) -> int:
+		piece_offset = 0
+		for index, piece in enumerate(self.pieces):
+			if piece_offset == offset: return index
+			if offset < piece_offset + piece.length:
+				inner = offset - piece_offset
+				split = bisect_left(piece.breaks, inner)
+				right = _Piece(piece.buffer, piece.start + inner, piece.length - inner, [value - inner for value in piece.breaks[split:]])
+				piece.length = inner
+				del piece.breaks[split:]
+				self.pieces.insert(index + 1, right)
+				if self._append_piece > index: self._append_piece += 1
+				return index + 1
+			piece_offset += piece.length
+		return len(self.pieces)
+
+	def _notify(self, change: TextChange) -> None:
+		for listener in self.listeners: listener(change)
@@ -4,6 +4,7 @@ from multiprocessing import Queue
 import tkinter as tk
 import tkinter.font as tkfont
 from typing import Any, Callable, Literal, Tuple, Union
+from editor.document import TextChange, TextDocument
 
 class ui:
 	@staticmethod
@@ -119,9 +120,17 @@ class ui:
 			super().__init__(*args, **kwargs)
 			self.configure(borderwidth=0, highlightthickness=0, wrap="none")
 			self.highlight_event = ui.DelayedEvent(self, 300)
-			self.highlight_event.bind(self.highlight)
+			self.highlight_event.bind(self.highlight_changes)
 			self.definitions: list[ui.CodeObject] = []
-			self.bind("<Key>", lambda e: self.highlight_event.fire() if e.char else None)
+			self.dirty_lines: Union[Tuple[int, int], None] = None
+			self.lines_changed = ui.MultiBinding()
+			self.document = TextDocument()
+			self.document.bind(self._on_document_changed)
+			self._widget_command = self._w + "_widget"
+			self.tk.call("rename", self._w, self._widget_command)
+			self.tk.createcommand(self._w, self._on_widget_command)
+			self.hotpath_buckets = 8
+			self.hotpath_tags: set[str] = set()
 			self.set_colors(ui.CodeColors())
 		
 		def set_colors(self, colors: "ui.CodeColors") -> None:
@@ -129,12 +138,12 @@ class ui:
 			types: dict[str, str] = colors.get_colors()
 			for type in types: self.tag_configure(type, foreground=types[type])
 			self.tag_configure("location_back", background=colors.location)
-			for level in range(256): self.tag_configure(f"hotpath_{level}", background=colors.get_lerp_color("background", "hotpath", level / 255.0))
+			self.colors = colors
+			for bucket in range(self.hotpath_buckets): self.tag_configure(f"hotpath_{bucket}", background=colors.get_lerp_color("background", "hotpath", (bucket + 1) / self.hotpath_buckets))
 
 		def add_object_type(self, type: str, regex: str) -> None: self.definitions.append(ui.CodeObject(type, regex))
 
-		def get_text(self) -> str:
-			return self.get("1.0", "end").rstrip("\n")
+		def get_text(self) -> str: return self.document.get_text()
 
 		def set_text(self, text: str) -> None:
 			self.delete(self.index("1.0"), self.index("end"))
@@ -157,8 +166,6 @@ class ui:
 		def warning(self, line: int) -> None:
 			self.override_highlight("warning", f"{line}.0", f"{line + 1}.0")
 
-		def get_text(self) -> str: return self.get("1.0", "end")
-
 		def set_location(self, line: int) -> None:
 			self.clear_highlight(type="location_back")
 			self.tag_add("location_back", self.index(f"{line}.0"), self.index(f"{line+1}.0"))
@@ -167,29 +174,50 @@ class ui:
 		def clear_location(self) -> None:
 			self.clear_highlight(type="location_back")
 		
+		def set_hotpath_buckets(self, buckets: int) -> None:
+			self.clear_hotpath()
+			for bucket in range(self.hotpath_buckets): self.tag_delete(f"hotpath_{bucket}")
+			self.hotpath_buckets = max(buckets, 1)
+			self.set_colors(self.colors)
+
+		def get_hotpath_tag(self, amount: float) -> str:
+			return f"hotpath_{min(max(floor(amount * self.hotpath_buckets), 0), self.hotpath_buckets - 1)}"
+
 		def set_hotpath(self, hotpath: "dict[int, float]") -> None:
 			self.clear_hotpath()
-			for line in hotpath:
-				self.tag_add(f"hotpath_{floor(hotpath[line] * 255)}", self.index(f"{line}.0"), self.index(f"{line+1}.0"))
+			ranges: dict[str, list[str]] = {}
+			previous: Union[Tuple[int, str], None] = None
+			for line in sorted(hotpath):
+				tag = self.get_hotpath_tag(hotpath[line])
+				if previous != None and previous[0] == line - 1 and previous[1] == tag: ranges[tag][-1] = f"{line + 1}.0"
+				else: ranges.setdefault(tag, []).extend([f"{line}.0", f"{line + 1}.0"])
+				previous = (line, tag)
+			for tag in ranges:
+				self.tag_add(tag, *ranges[tag])
+				self.hotpath_tags.add(tag)
 		
 		def set_hotpath_line(self, line: int, amount: float) -> None:
 			self.clear_hotpath(line)
-			self.tag_add(f"hotpath_{floor(amount * 255)}", self.index(f"{line}.0"), self.index(f"{line+1}.0"))
+			tag = self.get_hotpath_tag(amount)
+			self.tag_add(tag, f"{line}.0", f"{line + 1}.0")
+			self.hotpath_tags.add(tag)
 		
 		def clear_hotpath(self, line: int = 0) -> None:
 			if line == 0:
-				for level in range(256): self.clear_highlight(type=f"hotpath_{level}")
+				for tag in self.hotpath_tags: self.tag_remove(tag, "1.0", "end")
+				self.hotpath_tags.clear()
 			else:
-				for level in range(256): self.clear_highlight(f"{line}.0", f"{line + 1}.0", f"hotpath_{level}")
+				for tag in self.hotpath_tags: self.tag_remove(tag, f"{line}.0", f"{line + 1}.0")
 
-		def highlight(self) -> None:
-			self.clear_highlight()
+		def highlight(self, start="1.0", end="end") -> None:
+			self.dirty_lines = None
+			self.clear_highlight(start, end)
 
 			count = tk.IntVar()
 			for definition in self.definitions:
-				self.mark_set("matchStart", self.index("1.0"))
-				self.mark_set("matchEnd", self.index("1.0"))
-				self.mark_set("searchLimit", self.index("end"))
+				self.mark_set("matchStart", self.index(start))
+				self.mark_set("matchEnd", self.index(start))
+				self.mark_set("searchLimit", self.index(end))
 
 				while True:
 					index = self.search(definition.regex, "matchEnd", "searchLimit", count=count, regexp=True)
@@ -199,24 +227,70 @@ class ui:
 					for tag in self.tag_names(): self.tag_remove(tag, "matchStart", "matchEnd")
 					self.tag_add(definition.type, "matchStart", "matchEnd")
 
+		def highlight_changes(self) -> None:
+			if self.dirty_lines == None: return
+			first, last = self.dirty_lines
+			self.highlight(f"{first}.0", f"{last + 1}.0")
+
+		def _on_document_changed(self, change: TextChange) -> None:
+			first = change.line
+			last = change.line + change.inserted_lines
+			if self.dirty_lines != None:
+				dirty_first, dirty_last = self.dirty_lines
+				if dirty_last >= change.line: dirty_last = max(dirty_last + change.get_line_delta(), change.line)
+				first = min(first, dirty_first)
+				last = max(last, dirty_last)
+			self.dirty_lines = (first, last)
+			self.highlight_event.fire()
+			row = change.line if change.column == 0 else change.line + 1
+			if change.removed_lines > 0: self.lines_changed.event(row, -change.removed_lines)
+			if change.inserted_lines > 0: self.lines_changed.event(row, change.inserted_lines)
+
+		def _get_offset(self, index: str) -> int:
+			line, column = self.tk.call(self._widget_command, "index", index).split(".")
+			return self.document.get_offset(int(line), int(column))
+
+		def _on_widget_command(self, operation: str, *args) -> Any:
+			if operation == "insert" and len(args) >= 2:
+				offset = self._get_offset(args[0])
+				result = self.tk.call((self._widget_command, operation) + args)
+				self.document.insert(offset, "".join(args[1::2]))
+				return result
+			elif operation == "delete" and len(args) >= 1:
+				ranges: list[Tuple[int, int]] = []
+				for i in range(0, len(args), 2):
+					start = self._get_offset(args[i])
+					ranges.append((start, self._get_offset(args[i + 1]) if i + 1 < len(args) else start + 1))
+				result = self.tk.call((self._widget_command, operation) + args)
+				for start, end in sorted(ranges, reverse=True): self.document.delete(start, end)
+				return result
+			elif operation == "replace" and len(args) >= 3:
+				start = self._get_offset(args[0])
+				end = self._get_offset(args[1])
+				result = self.tk.call((self._widget_command, operation) + args)
+				self.document.delete(start, end)
+				self.document.insert(start, "".join(args[2::2]))
+				return result
+			return self.tk.call((self._widget_command, operation) + args)
+
 	class LineNumbers(tk.Text):
-		def __init__(self, *args, bind_to: tk.Text, scroll_bind: "Union[ui.MultiBinding, None]" = None, key_bind: "Union[ui.MultiBinding, None]" = None, **kwargs) -> None:
+		def __init__(self, *args, bind_to: "ui.HighlightText", scroll_bind: "Union[ui.MultiBinding, None]" = None, lines_bind: "Union[ui.MultiBinding, None]" = None, **kwargs) -> None:
 			super().__init__(*args, **kwargs)
 
 			def get_digits(value: int) -> int: return floor(log(max(value, 1), 10)) + 1
 
+			def on_lines_changed(line: int, count: int) -> None:
+				lines = self.last_line_count + count
+				self.configure(state="normal")
+				if count < 0: self.delete(f"{lines}.end", "end-1c")
+				else: self.insert("end-1c", ("" if self.last_line_count == 0 else "\n") + "\n".join([str(number) for number in range(self.last_line_count + 1, lines + 1)]), "right_align")
+				self.last_line_count = lines
+				self.configure(state="disabled", width=get_digits(self.last_line_count))
+				on_scroll()
+
 			def on_modified() -> None:
-				bind_to.update_idletasks()
-				lines = int(bind_to.index("end").split(".")[0]) - 1
-				if lines != self.last_line_count:
-					self.configure(state="normal")
-					while self.last_line_count > lines:
-						self.delete(f"{self.last_line_count}.0", f"{self.last_line_count + 1}.0")
-						self.last_line_count -= 1
-					while self.last_line_count < lines:
-						self.last_line_count += 1
-						self.insert(f"{self.last_line_count}.0", ("" if self.last_line_count == 1 else "\n") + str(self.last_line_count), "right_align")
-					self.configure(state="disabled", width=get_digits(self.last_line_count))
+				lines = bind_to.document.get_line_count()
+				if lines != self.last_line_count: on_lines_changed(min(lines, self.last_line_count) + 1, lines - self.last_line_count)
 				on_scroll()
 			
 			def on_scroll(*args):
@@ -225,8 +299,8 @@ class ui:
 			self.last_line_count: int = 0
 			self.configure(borderwidth=0, highlightthickness=0, wrap="none", cursor="arrow")
 			self.tag_configure("right_align", justify="right")
-			if key_bind == None: bind_to.bind("<KeyRelease>", lambda e: on_modified())
-			else: key_bind.bind(lambda e: on_modified())
+			if lines_bind == None: bind_to.lines_changed.bind(on_lines_changed)
+			else: lines_bind.bind(on_lines_changed)
 			if scroll_bind == None: bind_to.configure(yscrollcommand=on_scroll)
 			else: scroll_bind.bind(on_scroll)
 			self.set_colors(ui.CodeColors())
@@ -237,24 +311,28 @@ class ui:
 			self.configure(background=colors.window_background, foreground=colors.text_disabled, font=(colors.font_name, colors.font_size))
 
 	class LineInfo(tk.Text):
-		def __init__(self, *args, bind_to: tk.Text, scroll_bind: "Union[ui.MultiBinding, None]" = None, key_bind: "Union[ui.MultiBinding, None]" = None, **kwargs) -> None:
+		def __init__(self, *args, bind_to: "ui.HighlightText", scroll_bind: "Union[ui.MultiBinding, None]" = None, lines_bind: "Union[ui.MultiBinding, None]" = None, **kwargs) -> None:
 			super().__init__(*args, **kwargs)
 
 			self.lines: list[str] = []
+			self.bind_to = bind_to
+
+			def on_lines_changed(line: int, count: int) -> None:
+				self.configure(state="normal")
+				if count > 0:
+					if line <= len(self.lines): self.lines[line - 1:line - 1] = [""] * count
+					rows = self.lines[line - 1:line - 1 + count]
+					ui.insert_lines(self, line, self.last_line_count, rows + [""] * (count - len(rows)), "align")
+				else:
+					del self.lines[line - 1:line - 1 - count]
+					ui.delete_lines(self, line, self.last_line_count, -count)
+				self.last_line_count += count
+				self.configure(state="disabled")
+				on_scroll()
 
 			def on_modified() -> None:
-				bind_to.update_idletasks()
-				lines = int(bind_to.index("end").split(".")[0]) - 1
-				if lines != self.last_line_count:
-					self.configure(state="normal")
-					while self.last_line_count > lines:
-						self.delete(f"{self.last_line_count}.0", f"{self.last_line_count + 1}.0")
-						self.last_line_count -= 1
-					while self.last_line_count < lines:
-						self.last_line_count += 1
-						if len(self.lines) < self.last_line_count: self.lines.append("")
-						self.insert(f"{self.last_line_count}.0", ("" if self.last_line_count == 1 else "\n") + self.lines[self.last_line_count - 1], "align")
-					self.configure(state="disabled")
+				lines = bind_to.document.get_line_count()
+				if lines != self.last_line_count: on_lines_changed(min(lines, self.last_line_count) + 1, lines - self.last_line_count)
 				on_scroll()
 			
 			def on_scroll(*args):
@@ -263,8 +341,8 @@ class ui:
 			self.last_line_count: int = 0
 			self.configure(width=0, borderwidth=0, highlightthickness=0, wrap="none", cursor="arrow")
 			self.tag_configure("align", justify="left")
-			if key_bind == None: bind_to.bind("<KeyRelease>", lambda e: on_modified())
-			else: key_bind.bind(lambda e: on_modified())
+			if lines_bind == None: bind_to.lines_changed.bind(on_lines_changed)
+			else: lines_bind.bind(on_lines_changed)
 			if scroll_bind == None: bind_to.configure(yscrollcommand=on_scroll)
 			else: scroll_bind.bind(on_scroll)
 			self.set_colors(ui.CodeColors())
@@ -272,7 +350,7 @@ class ui:
 			self.on_modified = on_modified
 		
 		def show(self) -> None:
-			self.grid_remove()
+			self.grid()
 		
 		def hide(self) -> None:
 			self.grid_remove()
@@ -280,15 +358,31 @@ class ui:
 		def set_alignment(self, justify: Literal["left", "center", "right"]) -> None:
 			self.tag_configure("align", justify=justify)
 		
-		def set_line(self, line: int, value: Any) -> None:
+		def set_line(self, line: int, value: Any, tag: str = "") -> None:
 			while len(self.lines) < line: self.lines.append("")
 			self.lines[line - 1] = str(value)
+			if line > self.last_line_count: return
+			self.configure(state="normal")
+			self.delete(f"{line}.0", f"{line}.end")
+			self.insert(f"{line}.0", self.lines[line - 1], ("align", tag) if tag != "" else "align")
+			self.configure(state="disabled")
+
+		def clear_lines(self) -> None:
+			self.lines.clear()
+			self.configure(state="normal")
+			self.delete("1.0", "end")
+			ui.insert_lines(self, 1, 0, [""] * self.last_line_count, "align")
+			self.configure(state="disabled")
+			self.yview_moveto(self.bind_to.yview()[0])
 		
 		def set_width(self, chars: int) -> None:
 			self.configure(width=chars)
 
 		def set_colors(self, colors: "ui.CodeColors") -> None:
 			self.configure(background=colors.window_background, foreground=colors.text_disabled, font=(colors.font_name, colors.font_size))
+			self.tag_configure("success", foreground=colors.comment)
+			self.tag_configure("warning", foreground=colors.warning)
+			self.tag_configure("error", foreground=colors.error)
 
 	class BreakPointButton(tk.Button):
 		def __init__(self, *args, line: int = 0, on_set: Callable[[int], None] = lambda line: None, on_remove: Callable[[int], None] = lambda line: None, **kwargs) -> None:
@@ -313,32 +407,46 @@ class ui:
 			self.configure(background=colors.window_background, foreground=colors.breakpoint if self.toggled else colors.window_background, activebackground=colors.text_selected, activeforeground=colors.breakpoint, font=(colors.font_name, colors.font_size), width=height, height=height)
 
 	class BreakPoints(tk.Text):
-		def __init__(self, *args, bind_to: tk.Text, scroll_bind: "Union[ui.MultiBinding, None]" = None, key_bind: "Union[ui.MultiBinding, None]" = None, on_set: Callable[[int], None] = lambda line: None, on_remove: Callable[[int], None] = lambda line: None, **kwargs) -> None:
+		def __init__(self, *args, bind_to: "ui.HighlightText", scroll_bind: "Union[ui.MultiBinding, None]" = None, lines_bind: "Union[ui.MultiBinding, None]" = None, on_set: Callable[[int], None] = lambda line: None, on_remove: Callable[[int], None] = lambda line: None, **kwargs) -> None:
 			super().__init__(*args, **kwargs)
 
 			self.buttons: list[ui.BreakPointButton] = []
 			self.on_set = on_set
 			self.on_remove = on_remove
 
-			def on_modified() -> None:
-				bind_to.update_idletasks()
-				lines = int(bind_to.index("end").split(".")[0]) - 1
-				if lines != self.last_line_count:
-					self.configure(state="normal")
-					while self.last_line_count > lines:
-						self.delete(f"{self.last_line_count}.0", f"{self.last_line_count + 1}.0")
-						button = self.buttons.pop()
+			def on_lines_changed(line: int, count: int) -> None:
+				self.configure(state="normal")
+				if count > 0:
+					buttons: list[ui.BreakPointButton] = []
+					for i in range(count):
+						button = ui.BreakPointButton(self, line=line + i, on_set=self.on_set, on_remove=self.on_remove)
+						button.set_colors(self.colors)
+						buttons.append(button)
+					ui.insert_lines(self, line, self.last_line_count, [""] * count)
+					for i in range(count): self.window_create(f"{line + i}.0", window=buttons[i])
+					self.buttons[line - 1:line - 1] = buttons
+				else:
+					for button in self.buttons[line - 1:line - 1 - count]:
 						if button.toggled: button.toggle()
 						button.destroy()
-						self.last_line_count -= 1
-					while self.last_line_count < lines:
-						self.last_line_count += 1
-						button = ui.BreakPointButton(self, line=self.last_line_count, on_set=self.on_set, on_remove=self.on_remove)
-						button.set_colors(self.colors)
-						self.buttons.append(button)
-						self.insert(f"{self.last_line_count}.0", " " if self.last_line_count == 1 else " \n")
-						self.window_create(f"{self.last_line_count}.0", window=button)
-					self.configure(state="disabled")
+					del self.buttons[line - 1:line - 1 - count]
+					ui.delete_lines(self, line, self.last_line_count, -count)
+				self.last_line_count += count
+				moved: list[Tuple[ui.BreakPointButton, int]] = []
+				for i in range(line - 1 + max(count, 0), len(self.buttons)):
+					button = self.buttons[i]
+					if button.toggled: moved.append((button, i + 1))
+					else: button.line = i + 1
+				for button, _ in moved: self.on_remove(button.line)
+				for button, new_line in moved:
+					button.line = new_line
+					self.on_set(new_line)
+				self.configure(state="disabled")
+				on_scroll()
+
+			def on_modified() -> None:
+				lines = bind_to.document.get_line_count()
+				if lines != self.last_line_count: on_lines_changed(min(lines, self.last_line_count) + 1, lines - self.last_line_count)
 				on_scroll()
 			
 			def on_scroll(*args):
@@ -346,8 +454,8 @@ class ui:
 
 			self.last_line_count: int = 0
 			self.configure(width=1, height=0, borderwidth=0, highlightthickness=0, wrap="none", cursor="arrow")
-			if key_bind == None: bind_to.bind("<KeyRelease>", lambda e: on_modified())
-			else: key_bind.bind(lambda e: on_modified())
+			if lines_bind == None: bind_to.lines_changed.bind(on_lines_changed)
+			else: lines_bind.bind(on_lines_changed)
 			if scroll_bind == None: bind_to.configure(yscrollcommand=on_scroll)
 			else: scroll_bind.bind(on_scroll)
 			self.set_colors(ui.CodeColors())
@@ -437,6 +545,9 @@ class ui:
 		def disable_action(self, id: int) -> None:
 			if id >= 0: self.actions[id].grid_remove()
 
+		def set_action_color(self, id: int, color: str) -> None:
+			if id >= 0: self.actions[id].configure(foreground=color, activeforeground=color)
+
 	class Tabs(tk.Frame):
 		def __init__(self, *args, resize_row: bool = False, resize_column: bool = False, **kwargs):
 			super().__init__(*args, **kwargs)
@@ -450,6 +561,7 @@ class ui:
 			self.tab_widgets: list[Union[tk.Widget, None]] = []
 			self.tab_buttons: list[tk.Button] = []
 			self.tab_events: list[Callable[[], None]] = []
+			self.selected: int = -1
 			self.set_colors(ui.CodeColors())
 		
 		def set_colors(self, colors: "ui.CodeColors") -> None:
@@ -476,7 +588,11 @@ class ui:
 			self.tab_widgets.append(widget)
 			if select: self.select_tab(index)
 		
+		def get_selected_widget(self) -> Union[tk.Widget, None]:
+			return self.tab_widgets[self.selected] if self.selected >= 0 else None
+
 		def select_tab(self, index: int) -> None:
+			self.selected = index
 			for tab in self.tab_widgets:
 				if tab != None: tab.grid_remove()
 			for button in self.tab_buttons: button.configure(state="normal")
@@ -530,8 +646,7 @@ class ui:
 	class VariableList(ScrollView):
 		def __init__(self, *args, **kwargs):
 			super().__init__(*args, **kwargs)
-			self.widgets: list[tk.Frame] = []
-			self.labels: list[ui.HighlightLabel] = []
+			self.rows: dict[str, Tuple[tk.Frame, ui.HighlightLabel, ui.HighlightLabel]] = {}
 			self.scroll_root.grid_columnconfigure(0, weight=1)
 			self.scroll_root.grid_columnconfigure(1, weight=1)
 			self.set_colors(ui.CodeColors())
@@ -541,18 +656,20 @@ class ui:
 			self.configure(background=colors.window_background)
 			self.canvas.configure(background=colors.window_background)
 			self.scroll_root.configure(background=colors.window_background)
-			for widget in self.widgets: widget.configure(background=colors.window_background)
-			for label in self.labels: label.set_colors(colors)
+			for pair, key, value in self.rows.values():
+				pair.configure(background=colors.window_background)
+				key.set_colors(colors)
+				value.set_colors(colors)
 		
 		def clear_variables(self) -> None:
-			for widget in self.widgets: widget.destroy()
-			self.widgets.clear()
-			for label in self.labels: label.destroy()
-			self.labels.clear()
+			for pair, key, value in self.rows.values(): pair.destroy()
+			self.rows.clear()
 
-		def set_variables(self, variables: "dict[str, Any]", int_format: Callable[[int], Tuple[str, str]] = lambda value: (str(value), "number"), float_format: Callable[[float], Tuple[str, str]] = lambda value: (str(value), "number"), string_format: Callable[[str], Tuple[str, str]] = lambda value: ("\"" + value.replace("\\", "\\\\").replace("\n", "\\n").replace("\t", "\\t").replace("\"", "\\\"") + "\"", "string"), object_format: Callable[[Any], Tuple[str, str]] = lambda value: (str(value), "text_disabled")) -> None:
+		def set_variables(self, variables: "dict[str, Any]", **kwargs) -> None:
 			self.clear_variables()
-			index = 0
+			self.update_variables(variables, **kwargs)
+
+		def update_variables(self, variables: "dict[str, Any]", int_format: Callable[[int], Tuple[str, str]] = lambda value: (str(value), "number"), float_format: Callable[[float], Tuple[str, str]] = lambda value: (str(value), "number"), string_format: Callable[[str], Tuple[str, str]] = lambda value: ("\"" + value.replace("\\", "\\\\").replace("\n", "\\n").replace("\t", "\\t").replace("\"", "\\\"") + "\"", "string"), object_format: Callable[[Any], Tuple[str, str]] = lambda value: (str(value), "text_disabled")) -> None:
 			for name in variables:
 				rawValue = variables[name]
 				value_string: str
@@ -561,24 +678,28 @@ class ui:
 				elif isinstance(rawValue, float): value_string, value_type = float_format(rawValue)
 				elif isinstance(rawValue, str): value_string, value_type = string_format(rawValue)
 				else: value_string, value_type = object_format(rawValue)
-				pair = tk.Frame(self.scroll_root)
-				pair.grid_columnconfigure(1, weight=1)
-				key = ui.HighlightLabel(pair, text=name, type="text")
-				key.grid(row=0, column=0)
-				self.labels.append(key)
-				value = ui.HighlightLabel(pair, text=value_string, type=value_type, anchor=("e" if value_type == "number" else "w"))
-				value.grid(row=0, column=1, sticky="WE")
-				self.labels.append(value)
-				pair.grid(row=(index >> 1), column=(index & 1), sticky="WE")
-				self.widgets.append(pair)
-				index += 1
-			self.set_colors(self.colors)
+				row = self.rows.get(name)
+				if row == None:
+					index = len(self.rows)
+					pair = tk.Frame(self.scroll_root, background=self.colors.window_background)
+					pair.grid_columnconfigure(1, weight=1)
+					key = ui.HighlightLabel(pair, text=name, type="text")
+					key.grid(row=0, column=0)
+					key.set_colors(self.colors)
+					value = ui.HighlightLabel(pair)
+					value.grid(row=0, column=1, sticky="WE")
+					pair.grid(row=(index >> 1), column=(index & 1), sticky="WE")
+					row = (pair, key, value)
+					self.rows[name] = row
+				value = row[2]
+				value.type = value_type
+				value.configure(text=value_string, anchor=("e" if value_type == "number" else "w"))
+				value.set_colors(self.colors)
 
 	class StackList(ScrollView):
 		def __init__(self, *args, **kwargs):
 			super().__init__(*args, **kwargs)
-			self.widgets: list[tk.Frame] = []
-			self.labels: list[ui.HighlightLabel] = []
+			self.rows: list[Tuple[tk.Frame, ui.HighlightLabel, ui.HighlightLabel]] = []
 			self.scroll_root.grid_columnconfigure(0, weight=1)
 			self.set_colors(ui.CodeColors())
 		
@@ -587,37 +708,42 @@ class ui:
 			self.configure(background=colors.window_background)
 			self.canvas.configure(background=colors.window_background)
 			self.scroll_root.configure(background=colors.window_background)
-			for widget in self.widgets: widget.configure(background=colors.window_background)
-			for label in self.labels: label.set_colors(colors)
+			for pair, key, value in self.rows:
+				pair.configure(background=colors.window_background)
+				key.set_colors(colors)
+				value.set_colors(colors)
 		
 		def clear_stack(self) -> None:
-			for widget in self.widgets: widget.destroy()
-			self.widgets.clear()
-			for label in self.labels: label.destroy()
-			self.labels.clear()
+			for pair, key, value in self.rows: pair.destroy()
+			self.rows.clear()
 
 		def set_stack(self, stack: "list[Tuple[int, Union[str, None]]]", address_format: Callable[[int], str] = lambda value: str(value), value_format: Callable[[Union[int, None]], str] = lambda value: str(value)) -> None:
 			self.clear_stack()
-			index = 0
-			for address, value in stack:
-				pair = tk.Frame(self.scroll_root)
+			self.update_stack(len(stack), dict(enumerate(stack)), address_format, value_format)
+
+		def update_stack(self, length: int, changes: "dict[int, Tuple[int, Union[int, None]]]", address_format: Callable[[int], str] = lambda value: str(value), value_format: Callable[[Union[int, None]], str] = lambda value: str(value)) -> None:
+			while len(self.rows) > length: self.rows.pop()[0].destroy()
+			while len(self.rows) < length:
+				pair = tk.Frame(self.scroll_root, background=self.colors.window_background)
 				pair.grid_columnconfigure(1, weight=1)
-				key = ui.HighlightLabel(pair, text=address_format(address), type="number", anchor="w")
+				key = ui.HighlightLabel(pair, type="number", anchor="w")
 				key.grid(row=0, column=0)
-				self.labels.append(key)
-				value = ui.HighlightLabel(pair, text=value_format(value), type="number", anchor="w")
+				key.set_colors(self.colors)
+				value = ui.HighlightLabel(pair, type="number", anchor="w")
 				value.grid(row=0, column=1, sticky="WE")
-				self.labels.append(value)
-				pair.grid(row=index, column=0, sticky="WE")
-				self.widgets.append(pair)
-				index += 1
-			self.set_colors(self.colors)
+				value.set_colors(self.colors)
+				pair.grid(row=len(self.rows), column=0, sticky="WE")
+				self.rows.append((pair, key, value))
+			for index in changes:
+				if index >= length: continue
+				address, value = changes[index]
+				self.rows[index][1].configure(text=address_format(address))
+				self.rows[index][2].configure(text=value_format(value))
 
 	class CallList(ScrollView):
 		def __init__(self, *args, **kwargs):
 			super().__init__(*args, **kwargs)
-			self.widgets: list[tk.Frame] = []
-			self.labels: list[ui.HighlightLabel] = []
+			self.rows: list[Tuple[tk.Frame, ui.HighlightLabel, ui.HighlightLabel]] = []
 			self.scroll_root.grid_columnconfigure(0, weight=1)
 			self.set_colors(ui.CodeColors())
 		
@@ -626,31 +752,32 @@ class ui:
 			self.configure(background=colors.window_background)
 			self.canvas.configure(background=colors.window_background)
 			self.scroll_root.configure(background=colors.window_background)
-			for widget in self.widgets: widget.configure(background=colors.window_background)
-			for label in self.labels: label.set_colors(colors)
+			for pair, key, value in self.rows:
+				pair.configure(background=colors.window_background)
+				key.set_colors(colors)
+				value.set_colors(colors)
 		
 		def clear_calls(self) -> None:
-			for widget in self.widgets: widget.destroy()
-			self.widgets.clear()
-			for label in self.labels: label.destroy()
-			self.labels.clear()
+			for pair, key, value in self.rows: pair.destroy()
+			self.rows.clear()
 
 		def set_calls(self, calls: "list[Tuple[int, Union[str, None]]]", address_format: Callable[[int], str] = lambda value: str(value), name_format: Callable[[Union[str, None]], str] = lambda value: value) -> None:
 			self.clear_calls()
-			index = 0
-			for address, name in calls:
-				pair = tk.Frame(self.scroll_root)
+			self.update_calls(0, calls, address_format, name_format)
+
+		def update_calls(self, popped: int, pushed: "list[Tuple[int, Union[str, None]]]", address_format: Callable[[int], str] = lambda value: str(value), name_format: Callable[[Union[str, None]], str] = lambda value: value) -> None:
+			for i in range(min(popped, len(self.rows))): self.rows.pop()[0].destroy()
+			for address, name in pushed:
+				pair = tk.Frame(self.scroll_root, background=self.colors.window_background)
 				pair.grid_columnconfigure(1, weight=1)
 				key = ui.HighlightLabel(pair, text=address_format(address), type="number", anchor="w")
 				key.grid(row=0, column=0)
-				self.labels.append(key)
+				key.set_colors(self.colors)
 				value = ui.HighlightLabel(pair, text=name_format(name), type="function", anchor="w")
 				value.grid(row=0, column=1, sticky="WE")
-				self.labels.append(value)
-				pair.grid(row=index, column=0, sticky="WE")
-				self.widgets.append(pair)
-				index += 1
-			self.set_colors(self.colors)
+				value.set_colors(self.colors)
+				pair.grid(row=len(self.rows), column=0, sticky="WE")
+				self.rows.append((pair, key, value))
 
 	class HexEntry(tk.Entry):
 		def __init__(self, *args, **kwargs) -> None:
@@ -673,14 +800,21 @@ class ui:
 			self.address_label = tk.Label(self.scroll_root, text="Address: 0x")
 			self.address_label.grid(row=0, column=0)
 			self.address_entry = ui.HexEntry(self.scroll_root)
-			self.address_entry.bind("<Return>", lambda e: self.clear_memory() if len(self.address_entry.get()) == 0 else self.set_memory(int(self.address_entry.get(), 16)))
+			self.address_entry.bind("<Return>", lambda e: self.clear_memory() if len(self.address_entry.get()) == 0 else self.set_memory(int(self.address_entry.get(), 16), self.last_count))
 			self.address_entry.grid(row=0, column=1, sticky="WE")
-			self.widgets: list[tk.Frame] = []
-			self.labels: list[ui.HighlightLabel] = []
+			self.rows: list[Tuple[tk.Frame, ui.HighlightLabel, ui.HighlightLabel]] = []
 			self.scroll_root.grid_columnconfigure(1, weight=1)
 			self.request_callback: Union[Callable[[int], int], None] = None
+			self.range_request_callback: Union[Callable[[int, int], "list[int]"], None] = None
 			self.last_address: Union[int, None] = None
 			self.last_count: int = 20
+			self.address_limit: int = 0x10000
+			self.address_format: Callable[[int], str] = lambda value: str(value)
+			self.value_format: Callable[[int], str] = lambda value: str(value)
+			self.canvas.configure(yscrollcommand="")
+			self.vscroll.configure(command=self.scroll_memory)
+			self.vscroll.set(0, 1)
+			for widget in [self.canvas, self.scroll_root]: self.bind_wheel(widget)
 			self.set_colors(ui.CodeColors())
 		
 		def set_colors(self, colors: "ui.CodeColors") -> None:
@@ -690,18 +824,29 @@ class ui:
 			self.scroll_root.configure(background=colors.window_background)
 			self.address_label.configure(background=colors.window_background, foreground=colors.text)
 			self.address_entry.set_colors(colors)
-			for widget in self.widgets: widget.configure(background=colors.window_background)
-			for label in self.labels: label.set_colors(colors)
+			for pair, key, value in self.rows:
+				pair.configure(background=colors.window_background)
+				key.set_colors(colors)
+				value.set_colors(colors)
 		
+		def bind_wheel(self, widget: tk.Widget) -> None:
+			widget.bind("<MouseWheel>", lambda e: self.scroll_memory("scroll", -1 if e.delta > 0 else 1, "units"))
+			widget.bind("<Button-4>", lambda e: self.scroll_memory("scroll", -1, "units"))
+			widget.bind("<Button-5>", lambda e: self.scroll_memory("scroll", 1, "units"))
+
 		def set_request_callback(self, callback: Callable[[int], int]) -> None:
 			self.request_callback = callback
 
+		def set_range_request_callback(self, callback: Callable[[int, int], "list[int]"]) -> None:
+			self.range_request_callback = callback
+
+		def set_address_limit(self, limit: int) -> None:
+			self.address_limit = max(limit, 1)
+
 		def clear_memory(self) -> None:
 			self.last_address = None
-			for widget in self.widgets: widget.destroy()
-			self.widgets.clear()
-			for label in self.labels: label.destroy()
-			self.labels.clear()
+			for pair, key, value in self.rows: pair.grid_remove()
+			self.vscroll.set(0, 1)
 		
 		def set_address_format(self, address_format: Callable[[int], str] = lambda value: str(value)) -> None:
 			self.address_format = address_format
@@ -713,30 +858,80 @@ class ui:
 			if self.last_address == None: self.clear_memory()
 			else: self.set_memory(self.last_address, self.last_count)
 
+		def scroll_memory(self, operation: str, amount: Any, unit: str = "units") -> None:
+			if self.last_address == None: return
+			if operation == "moveto": address = int(float(amount) * self.address_limit)
+			elif unit == "pages": address = self.last_address + (int(amount) * self.last_count)
+			else: address = self.last_address + int(amount)
+			address = min(max(address, 0), max(self.address_limit - self.last_count, 0))
+			if address != self.last_address: self.set_memory(address, self.last_count)
+
+		def read_memory(self, start_address: int, count: int) -> "list[int]":
+			if self.range_request_callback != None: return self.range_request_callback(start_address, count)
+			elif self.request_callback != None: return [self.request_callback(address) for address in range(start_address, start_address + count, 1)]
+			else: return [0] * count
+
 		def set_memory(self, start_address: int, count: int = 20) -> None:
-			self.clear_memory()
 			self.last_address = start_address
 			self.last_count = count
-			if self.request_callback == None: return
-			for address in range(start_address, start_address + count, 1):
+			if self.request_callback == None and self.range_request_callback == None:
+				self.clear_memory()
+				return
+			while len(self.rows) < count:
 				pair = tk.Frame(self.scroll_root)
 				pair.grid_columnconfigure(1, weight=1)
-				key = ui.HighlightLabel(pair, text=self.address_format(address), type="number", anchor="e")
+				key = ui.HighlightLabel(pair, type="number", anchor="e")
 				key.grid(row=0, column=0)
-				self.labels.append(key)
-				value = ui.HighlightLabel(pair, text=self.value_format(self.request_callback(address)), type="number", anchor="e")
+				value = ui.HighlightLabel(pair, type="number", anchor="e")
 				value.grid(row=0, column=1, sticky="WE")
-				self.labels.append(value)
-				pair.grid(row=(address - start_address) + 1, column=0, columnspan=2, sticky="WE")
-				self.widgets.append(pair)
-			self.set_colors(self.colors)
+				pair.grid(row=len(self.rows) + 1, column=0, columnspan=2, sticky="WE")
+				for widget in [pair, key, value]: self.bind_wheel(widget)
+				pair.configure(background=self.colors.window_background)
+				key.set_colors(self.colors)
+				value.set_colors(self.colors)
+				self.rows.append((pair, key, value))
+			values = self.read_memory(start_address, count)
+			for index, (pair, key, value) in enumerate(self.rows):
+				if index < count:
+					key.configure(text=self.address_format(start_address + index))
+					value.configure(text=self.value_format(values[index]))
+					pair.grid()
+				else: pair.grid_remove()
+			self.vscroll.set(start_address / self.address_limit, min((start_address + count) / self.address_limit, 1.0))
 
 	class PerformanceList(ScrollView):
 		def __init__(self, *args, **kwargs):
 			super().__init__(*args, **kwargs)
 			self.buttons: list[ui.HighlightLabel] = []
+			self.counters: dict[str, Tuple[ui.HighlightLabel, ui.HighlightLabel]] = {}
 			self.scroll_root.grid_columnconfigure(0, weight=1)
+			self.counters_root = tk.Frame(self.scroll_root)
+			self.counters_root.grid_columnconfigure(1, weight=1)
+			self.counters_root.grid(row=0, column=0, sticky="WE")
+			self.table = tk.Text(self.scroll_root, height=1, borderwidth=0, highlightthickness=0, wrap="none", cursor="arrow", state="disabled")
+			self.table.grid(row=1, column=0, sticky="WE")
+			self.table.grid_remove()
+			self.table_rows: list[Tuple[str, int, int, int]] = []
+			self.table_order: list[str] = []
+			self.table_sort: int = 1
+			self.table_limit: int = 50
+			self.table.tag_bind("header", "<Button-1>", lambda e: self._on_table_header_click(e))
+			self.table.tag_bind("name", "<Button-1>", lambda e: self._on_table_name_click(e))
+			self.flame = tk.Canvas(self.scroll_root, height=0, borderwidth=0, highlightthickness=0)
+			self.flame.grid(row=2, column=0, sticky="WE")
+			self.flame_nodes: list[Tuple[int, str, int]] = []
+			self.flame_inclusive: list[int] = []
+			self.flame_children: list[list[int]] = []
+			self.flame_depth: int = 0
+			self.flame_width: int = 0
+			self.flame_names: dict[int, str] = {}
+			self.flame_job: Union[str, None] = None
+			self.flame_row_height: int = 18
+			self.flame_batch_size: int = 500
+			self.flame.bind("<Configure>", lambda e: self.render_flame_graph() if e.width != self.flame_width else None)
+			self.flame.tag_bind("frame", "<Button-1>", lambda e: self._on_flame_click())
 			self.show_callback: Callable[[str], None] = lambda name: None
+			self.shown_bind = ui.MultiBinding()
 			self.set_colors(ui.CodeColors())
 		
 		def set_colors(self, colors: "ui.CodeColors") -> None:
@@ -744,11 +939,140 @@ class ui:
 			self.configure(background=colors.window_background)
 			self.canvas.configure(background=colors.window_background)
 			self.scroll_root.configure(background=colors.window_background)
+			self.counters_root.configure(background=colors.window_background)
+			self.table.configure(background=colors.window_background, foreground=colors.number, font=(colors.font_name, colors.font_size), selectbackground=colors.window_background)
+			self.table.tag_configure("header", foreground=colors.keyword)
+			self.table.tag_configure("name", foreground=colors.function)
+			self.flame.configure(background=colors.window_background)
+			self.render_flame_graph()
+			for key, value in self.counters.values():
+				key.set_colors(colors)
+				value.set_colors(colors)
 			for button in self.buttons: button.configure(background=colors.window_background, foreground=colors.function, activebackground=colors.text_selected, activeforeground=colors.function)
 		
 		def set_show_callback(self, callback: Callable[[str], None]) -> None:
 			self.show_callback = callback
 
+		def is_shown(self) -> bool:
+			return isinstance(self.master, ui.Tabs) and self.master.get_selected_widget() == self
+
+		def clear_counters(self) -> None:
+			for key, value in self.counters.values():
+				key.destroy()
+				value.destroy()
+			self.counters.clear()
+
+		def set_counters(self, counters: "dict[str, str]") -> None:
+			for name in counters:
+				row = self.counters.get(name)
+				if row == None:
+					index = len(self.counters)
+					key = ui.HighlightLabel(self.counters_root, text=name, type="text", anchor="w")
+					key.grid(row=index, column=0, sticky="WE")
+					key.set_colors(self.colors)
+					value = ui.HighlightLabel(self.counters_root, type="number", anchor="e")
+					value.grid(row=index, column=1, sticky="WE")
+					value.set_colors(self.colors)
+					row = (key, value)
+					self.counters[name] = row
+				row[1].configure(text=counters[name])
+
+		def clear_profile(self) -> None:
+			self.set_call_table([])
+			self.set_flame_graph([])
+
+		def set_call_table(self, rows: "list[Tuple[str, int, int, int]]") -> None:
+			self.table_rows = rows
+			self.render_call_table()
+
+		def render_call_table(self) -> None:
+			rows = sorted(self.table_rows, key=lambda row: row[self.table_sort] if self.table_sort > 0 else row[0].lower(), reverse=self.table_sort > 0)[:self.table_limit]
+			self.table_order = [row[0] for row in rows]
+			width = max([len(row[0]) for row in rows] + [8]) + 2
+			headers = ["Function", "Inclusive", "Self", "Calls"]
+			self.table.configure(state="normal")
+			self.table.delete("1.0", "end")
+			if len(rows) == 0:
+				self.table.configure(state="disabled")
+				self.table.grid_remove()
+				return
+			for index in range(len(headers)):
+				header = headers[index] + (" \u25BE" if index == self.table_sort else "  ")
+				self.table.insert("end", header.ljust(width) if index == 0 else header.rjust(14), ("header", f"column_{index}"))
+			for name, inclusive, exclusive, calls in rows:
+				self.table.insert("end", "\n")
+				self.table.insert("end", name.ljust(width), "name")
+				self.table.insert("end", f"{inclusive:>14,}{exclusive:>14,}{calls:>14,}")
+			self.table.configure(state="disabled", height=len(rows) + 1)
+			self.table.grid()
+
+		def _on_table_header_click(self, event: tk.Event) -> None:
+			for tag in self.table.tag_names(f"@{event.x},{event.y}"):
+				if tag.startswith("column_"):
+					self.table_sort = int(tag[len("column_"):])
+					self.render_call_table()
+					return
+
+		def _on_table_name_click(self, event: tk.Event) -> None:
+			row = int(self.table.index(f"@{event.x},{event.y}").split(".")[0]) - 2
+			if row >= 0 and row < len(self.table_order): self.show_callback(self.table_order[row])
+
+		def set_flame_graph(self, nodes: "list[Tuple[int, str, int]]") -> None:
+			self.flame_nodes = nodes
+			self.flame_inclusive = [node[2] for node in nodes]
+			self.flame_children = [[] for _ in nodes]
+			depths = [0] * len(nodes)
+			for index in range(1, len(nodes)):
+				depths[index] = depths[nodes[index][0]] + 1
+				self.flame_children[nodes[index][0]].append(index)
+			for index in range(len(nodes) - 1, 0, -1): self.flame_inclusive[nodes[index][0]] += self.flame_inclusive[index]
+			self.flame_depth = max(depths + [-1]) + 1
+			self.render_flame_graph()
+
+		def render_flame_graph(self) -> None:
+			if self.flame_job != None: self.flame.after_cancel(self.flame_job)
+			self.flame_job = None
+			self.flame.delete("all")
+			self.flame_names.clear()
+			self.flame_width = self.flame.winfo_width()
+			if len(self.flame_nodes) == 0 or self.flame_inclusive[0] == 0:
+				self.flame.configure(height=0)
+				return
+			self.flame.configure(height=self.flame_depth * self.flame_row_height)
+			scale = max(self.flame_width, 1) / self.flame_inclusive[0]
+			character_width = max(self.colors.font_size * 0.75, 1)
+			palette = [self.colors.hotpath, self.colors.string, self.colors.warning, self.colors.number, self.colors.macro]
+			pending: list[Tuple[int, float, int]] = [(0, 0.0, 0)]
+
+			def draw() -> None:
+				count = 0
+				while len(pending) > 0 and count < self.flame_batch_size:
+					node, x, depth = pending.pop()
+					width = self.flame_inclusive[node] * scale
+					if width < 1: continue
+					name = self.flame_nodes[node][1]
+					top = depth * self.flame_row_height
+					color = palette[sum([ord(character) for character in name]) % len(palette)]
+					item = self.flame.create_rectangle(x, top, x + width, top + self.flame_row_height - 1, fill=color, outline=self.colors.window_background, tags="frame")
+					self.flame_names[item] = name
+					characters = int((width - 4) / character_width)
+					if characters >= 3:
+						label = name if len(name) <= characters else name[:characters - 1] + "\u2026"
+						item = self.flame.create_text(x + 2, top + self.flame_row_height / 2, text=label, anchor="w", fill=self.colors.background, font=(self.colors.font_name, self.colors.font_size - 2), tags="frame")
+						self.flame_names[item] = name
+					child_x = x
+					for child in self.flame_children[node]:
+						pending.append((child, child_x, depth + 1))
+						child_x += self.flame_inclusive[child] * scale
+					count += 1
+				self.flame_job = self.flame.after(1, draw) if len(pending) > 0 else None
+
+			draw()
+
+		def _on_flame_click(self) -> None:
+			items = self.flame.find_withtag("current")
+			if len(items) > 0 and items[0] in self.flame_names: self.show_callback(self.flame_names[items[0]])
+
 		def clear_functions(self) -> None:
 			for button in self.buttons: button.destroy()
 			self.buttons.clear()
@@ -764,11 +1088,22 @@ class ui:
 					button.bind("<Enter>", lambda e: button.configure(background=self.colors.text_selected))
 					button.bind("<Leave>", lambda e: button.configure(background=self.colors.window_background))
 				bind_button(self, name, button)
-				button.grid(row=index, column=0, sticky="WE")
+				button.grid(row=index + 3, column=0, sticky="WE")
 				self.buttons.append(button)
 				index += 1
 			self.set_colors(self.colors)
 
+	@staticmethod
+	def insert_lines(widget: tk.Text, line: int, line_count: int, rows: "list[str]", *tags) -> None:
+		if line_count == 0: widget.insert("1.0", "\n".join(rows), *tags)
+		elif line <= line_count: widget.insert(f"{line}.0", "\n".join(rows) + "\n", *tags)
+		else: widget.insert("end-1c", "\n" + "\n".join(rows), *tags)
+
+	@staticmethod
+	def delete_lines(widget: tk.Text, line: int, line_count: int, count: int) -> None:
+		if line + count <= line_count: widget.delete(f"{line}.0", f"{line + count}.0")
+		else: widget.delete(f"{line - 1}.end", "end-1c")
+
 	@staticmethod
 	def set_colors(colors: CodeColors) -> None:
 		ui.window.configure(background=colors.window_background)
@@ -823,6 +1158,7 @@ class ui:
 	editor_area: tk.Frame
 	text_editor_scroll_bind: MultiBinding
 	text_editor_key_bind: MultiBinding
+	text_editor_lines_bind: MultiBinding
 	text_editor: HighlightText
 	breakpoint_added_bind: MultiBinding
 	breakpoint_removed_bind: MultiBinding
@@ -865,17 +1201,18 @@ class ui:
 		ui.text_editor = ui.HighlightText(ui.editor_area, yscrollcommand=ui.text_editor_scroll_bind.event)
 		ui.text_editor.bind("<KeyRelease>", ui.text_editor_key_bind.event)
 		ui.text_editor.grid(row=0, column=3, sticky="NSEW")
+		ui.text_editor_lines_bind = ui.text_editor.lines_changed
 
 		ui.breakpoint_added_bind = ui.MultiBinding()
 		ui.breakpoint_removed_bind = ui.MultiBinding()
 
-		ui.break_points = ui.BreakPoints(ui.editor_area, bind_to=ui.text_editor, scroll_bind=ui.text_editor_scroll_bind, key_bind=ui.text_editor_key_bind, on_set=ui.breakpoint_added_bind.event, on_remove=ui.breakpoint_removed_bind.event)
+		ui.break_points = ui.BreakPoints(ui.editor_area, bind_to=ui.text_editor, scroll_bind=ui.text_editor_scroll_bind, lines_bind=ui.text_editor_lines_bind, on_set=ui.breakpoint_added_bind.event, on_remove=ui.breakpoint_removed_bind.event)
 		ui.break_points.grid(row=0, column=0, sticky="NS")
 
-		ui.line_numbers = ui.LineNumbers(ui.editor_area, bind_to=ui.text_editor, scroll_bind=ui.text_editor_scroll_bind, key_bind=ui.text_editor_key_bind)
+		ui.line_numbers = ui.LineNumbers(ui.editor_area, bind_to=ui.text_editor, scroll_bind=ui.text_editor_scroll_bind, lines_bind=ui.text_editor_lines_bind)
 		ui.line_numbers.grid(row=0, column=1, sticky="NS")
 
-		ui.line_info = ui.LineInfo(ui.editor_area, bind_to=ui.text_editor, scroll_bind=ui.text_editor_scroll_bind, key_bind=ui.text_editor_key_bind)
+		ui.line_info = ui.LineInfo(ui.editor_area, bind_to=ui.text_editor, scroll_bind=ui.text_editor_scroll_bind, lines_bind=ui.text_editor_lines_bind)
 		ui.line_info.grid(row=0, column=2, sticky="NS")
 		ui.line_info.hide()
 
@@ -904,7 +1241,7 @@ class ui:
 		ui.lower_tabs.add(ui.stack_tab, "Stack")
 		ui.lower_tabs.add(ui.calls_tab, "Calls")
 		ui.lower_tabs.add(ui.memory_tab, "Memory")
-		ui.lower_tabs.add(ui.performance_tab, "Performance")
+		ui.lower_tabs.add(ui.performance_tab, "Performance", on_selected=ui.performance_tab.shown_bind.event)
 
 		ui.set_colors(ui.CodeColors())
 
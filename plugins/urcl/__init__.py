@@ -1 +1,2 @@
-import plugins.urcl.ui
\ No newline at end of file
+import sys
+if "editor.base" in sys.modules: import plugins.urcl.ui
\ No newline at end of file
@@ -1,7 +1,36 @@
+import asyncio
+import hashlib
+import heapq
+import json
+import mmap
+import operator
 import random
+import subprocess
 import sys
-from typing import Callable, Tuple, Union
-from plugins.urcl.urcl import NOP, IInstruction, IMachine
+from array import array
+from collections import deque
+from time import monotonic, perf_counter_ns
+from typing import Any, BinaryIO, Callable, Tuple, Union
+from plugins.urcl.urcl import BITS, NOP, OUT, IBranchInstruction, IInstruction, IMachine, IOperand, Immediate, Label, Port, Register, SpecialRegister
+
+_comparisons: "dict[str, Callable[[int, int], bool]]" = { "==": operator.eq, "!=": operator.ne, "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge }
+_UNDO_REGISTER = 0
+_UNDO_SPECIAL_REGISTER = 1
+_UNDO_MEMORY = 2
+_UNDO_PORT = 3
+_UNDO_CALL = 4
+_UNDO_RETURN = 5
+_HISTORY_WORD_BYTES = 8
+_HISTORY_ENTRY_BYTES = 64
+_DISPATCH_METHODS = ["step_into", "write_register", "write_register_unmasked", "write_special_register", "write_memory", "read_port", "write_port", "indicate_call", "indicate_return"]
+_STATE_MAGIC = b"URST\x01\x00\x00\x00"
+_STATE_WORD_TYPES = [(8, "B"), (16, "H"), (32, "I"), (64, "Q")]
+HALT_INSTRUCTION = "hlt"
+HALT_END_OF_ROM = "end_of_rom"
+HALT_BUDGET = "budget"
+HALT_FAULT = "fault"
+HALT_STOPPED = "stopped"
+_HALT_DESCRIPTIONS = { HALT_INSTRUCTION: "Program halted.", HALT_END_OF_ROM: "Program ran past the end of the ROM.", HALT_BUDGET: "Program exceeded its budget.", HALT_FAULT: "Program faulted.", HALT_STOPPED: "Program was stopped." }
 
 class IDebugger:
 	def set_break_callback(self, callback: "Callable[[IDebugger, dict], None]", data: dict = {}) -> None: ...
@@ -12,11 +41,36 @@ class IDebugger:
 	def get_stack(self) -> "list[Tuple[int, int]]": ...
 	def get_call_stack(self) -> "list[Tuple[int, Union[str, None]]]": ...
 	def get_hotpaths(self) -> "dict[str, dict[int, float]]": ...
+	def get_counters(self) -> "dict[str, Any]": ...
+	def get_halt_reason(self) -> Union["HaltReason", None]: ...
+	def save_state(self, path: str) -> None: ...
+	def load_state(self, path: str) -> None: ...
+	def set_profiling(self, enabled: bool, sample_interval: int = 64) -> None: ...
+	def get_instruction_profile(self) -> "dict[str, Any]": ...
+	def set_call_profiling(self, enabled: bool) -> None: ...
+	def get_call_profile(self) -> "dict[str, Any]": ...
+	def set_coverage(self, enabled: bool) -> None: ...
+	def get_line_coverage(self) -> "dict[int, Tuple[int, int]]": ...
 	def read_memory(self, address: int) -> int: ...
+	def read_memory_range(self, address: int, count: int) -> "list[int]": ...
 	def resume(self) -> None: ...
 	def step_into(self) -> None: ...
 	def step_over(self) -> None: ...
 	def step_out(self) -> None: ...
+	def step_count(self, count: int) -> None: ...
+	def run_to_address(self, address: int) -> None: ...
+	def run_to_register(self, name: str, comparison: str, value: int) -> None: ...
+	def run_to_memory_write(self, address: int) -> None: ...
+	def step_back(self) -> None: ...
+	def reverse_continue(self) -> None: ...
+
+def _get_operand_kind(operand: IOperand) -> str:
+	if isinstance(operand, Register): return "R"
+	elif isinstance(operand, SpecialRegister): return "S"
+	elif isinstance(operand, Immediate): return "I"
+	elif isinstance(operand, Label): return "L"
+	elif isinstance(operand, Port): return "P"
+	return "?"
 
 class URCLEmulator(IMachine, IDebugger):
 	def __init__(self, integer_mask: int = 0xFFFFFFFFFFFFFFFF) -> None:
@@ -41,18 +95,88 @@ class URCLEmulator(IMachine, IDebugger):
 		self.break_callback: Union[Callable[[IDebugger, dict], None], None] = None
 		self.break_data: dict = {}
 		self.breakpoints: list[int] = []
+		self.line_map: dict[int, int] = {}
 		self.gopoints: list[int] = []
+		self.watching: bool = False
+		self.steps_remaining: int = -1
+		self.register_conditions: list[Tuple[str, str, int]] = []
+		self.watchpoints: set[int] = set()
+		self.poller: Union[Callable[[URCLEmulator], bool], None] = None
+		self.poll_interval: int = 4096
+		self.retired: int = 0
+		self.halt_reason: Union[HaltReason, None] = None
+		self.budgeted: bool = False
+		self.budget_interval: int = 4096
+		self.instruction_budget: int = -1
+		self.time_budget: float = -1.0
+		self.memory_block_budget: int = -1
+		self.output_budget: int = -1
+		self.budget_deadline: float = 0.0
+		self.port_reads: int = 0
+		self.port_writes: int = 0
+		self.address_samples: dict[int, int] = {}
+		self.profile_keys: list[Tuple[str, str]] = []
+		self.profile_counts: list[int] = []
+		self.profile_samples: list[int] = []
+		self.profile_times: list[int] = []
+		self.profile_sample_interval: int = 64
+		self.profile_countdown: int = 0
+		self.context: int = 0
+		self.context_stack: list[int] = []
+		self.context_nodes: list[Tuple[int, int, int]] = [(-1, 0, -1)]
+		self.context_children: dict[Tuple[int, int], int] = {}
+		self.context_counts: list[int] = [0]
+		self.context_calls: list[int] = [1]
+		self.profiling: bool = False
+		self.call_profiling: bool = False
+		self.call_profiled_step_into: Union[Callable[[], None], None] = None
+		self.recording: bool = False
+		self.checkpoint_interval: int = 65536
+		self.history_budget: int = 64 * 1024 * 1024
+		self.history_step: int = 0
+		self.history_end: int = 0
+		self.history_halt_reason: Union[HaltReason, None] = None
+		self.checkpoints: list[HistoryCheckpoint] = []
+		self.checkpoint_index: int = 0
+		self.shared_blocks: set[int] = set()
+		self.undo_log: list[Tuple[int, int, Any]] = []
+		self.undo_marks: list[int] = []
+		self.port_log: list[int] = []
+		self.port_log_offset: int = 0
+		self.port_cursor: int = 0
+		self.tracer: Union[ITracer, None] = None
+		self.traced_methods: dict[str, Callable] = {}
+		self.covering: bool = False
+		self.coverage = bytearray()
+		self.coverage_branches = bytearray()
+		self.coverage_edges: set[Tuple[int, int]] = set()
+		self.covered_step_into: Union[Callable[[], None], None] = None
+		self.paused_step_into: Union[Callable[[], None], None] = None
 		self.pc = self.get_special_register_id("PC")
 	
 	def set_bit_mask(self, integer_mask: int) -> None:
 		if integer_mask <= 0: raise Exception("Integer mask must be greater than zero.")
 		self.integer_mask = integer_mask
 		self.integer_bits = self._get_bit_count(self.integer_mask)
+		self.sign_bit_mask = 1 << (self.integer_bits - 1)
+		self.carry_bit_mask = 1 << self.integer_bits
 
 	def load_program_rom(self, program: "list[IInstruction]") -> None:
 		self.rom = program
+		register_count = 1
+		for instruction in self.rom:
+			if isinstance(instruction, BITS): instruction.compile(self)
+			for operand in instruction.get_operands():
+				if isinstance(operand, Register): register_count = max(register_count, operand.index + 1)
+		self.reserve_registers(register_count)
 		for instruction in self.rom: instruction.compile(self)
+		self.profile_keys = [(instruction.__class__.__name__, " ".join([instruction.__class__.__name__] + [_get_operand_kind(operand) for operand in instruction.get_operands()])) for instruction in self.rom]
+		self.reset_profile()
+		self.reset_coverage()
 	
+	def reserve_registers(self, count: int) -> None:
+		if len(self.general_registers) < count: self.general_registers.extend([0] * (count - len(self.general_registers)))
+
 	def set_port_data(self, data: dict = {}) -> None:
 		self.port_data = data
 	
@@ -63,11 +187,14 @@ class URCLEmulator(IMachine, IDebugger):
 		self.break_callback = callback
 		self.break_data = data
 	
+	def set_line_map(self, line_map: "dict[int, int]") -> None:
+		self.line_map = line_map
+
 	def set_breakpoint(self, line: int) -> None:
-		self.breakpoints.append(line)
+		self.breakpoints.append(self.line_map.get(line, line))
 	
 	def remove_breakpoint(self, line: int) -> None:
-		self.breakpoints.remove(line)
+		self.breakpoints.remove(self.line_map.get(line, line))
 
 	def set_gopoint(self, address: int) -> None:
 		self.gopoints.append(address)
@@ -78,9 +205,103 @@ class URCLEmulator(IMachine, IDebugger):
 		self.port_map[name] = len(self.ports)
 		self.ports.append(port)
 
-	def execute(self) -> None:
+	def set_poller(self, poller: "Callable[[URCLEmulator], bool]", poll_interval: int = 4096) -> None:
+		if poll_interval <= 0: raise Exception("Poll interval must be greater than zero.")
+		self.poller = poller
+		self.poll_interval = poll_interval
+
+	def set_budget(self, instructions: int = -1, seconds: float = -1.0, memory_blocks: int = -1, output_writes: int = -1, check_interval: int = 4096) -> None:
+		if check_interval <= 0: raise Exception("Check interval must be greater than zero.")
+		self.instruction_budget = instructions
+		self.time_budget = seconds
+		self.memory_block_budget = memory_blocks
+		self.output_budget = output_writes
+		self.budget_interval = check_interval
+		self.budgeted = instructions >= 0 or seconds >= 0
+
+	def check_budget(self) -> bool:
+		if self.instruction_budget >= 0 and self.retired >= self.instruction_budget: message = f"Instruction budget of {self.instruction_budget:,} exceeded."
+		elif self.time_budget >= 0 and monotonic() >= self.budget_deadline: message = f"Time budget of {self.time_budget:g}s exceeded."
+		else: return False
+		self.halt(HALT_BUDGET, message)
+		return True
+
+	def get_batch_size(self, interval: int) -> int:
+		if self.instruction_budget < 0: return interval
+		return max(min(interval, self.instruction_budget - self.retired), 0)
+
+	def begin_execution(self) -> None:
 		self.executing = True
-		while self.executing: self.step()
+		self.halt_reason = None
+		self.budget_deadline = monotonic() + self.time_budget if self.time_budget >= 0 else 0.0
+
+	def execute(self) -> None:
+		self.begin_execution()
+		step = self.step
+		interval = self.poll_interval if self.poller != None else self.budget_interval
+		while self.executing:
+			if self.budgeted and self.check_budget(): return
+			batch = self.get_batch_size(interval)
+			self.retired += batch
+			remaining = 0
+			try:
+				for remaining in range(batch - 1, -1, -1):
+					step()
+					if not self.executing: break
+			except Exception as ex:
+				self.retired -= remaining + 1
+				self.fault(ex)
+				return
+			self.retired -= remaining
+			if self.poller == None or not self.executing: continue
+			address = self.special_registers[self.pc]
+			self.address_samples[address] = self.address_samples.get(address, 0) + 1
+			if self.poller(self): self.debug()
+
+	async def run_async(self, slice: int = 10000) -> None:
+		if slice <= 0: raise Exception("Slice must be greater than zero.")
+		self.begin_execution()
+		step = self.step
+		reads = self.get_async_reads()
+		size = len(reads)
+		while self.executing:
+			if self.budgeted and self.check_budget(): break
+			batch = self.get_batch_size(slice)
+			self.retired += batch
+			remaining = 0
+			try:
+				for remaining in range(batch - 1, -1, -1):
+					address = self.special_registers[self.pc]
+					if address < size and reads[address] != None:
+						for port in reads[address]:
+							if not port.is_readable(reads[address].count(port)): raise PortBlocked(port, reads[address].count(port))
+					step()
+					if not self.executing: break
+			except PortBlocked as blocked:
+				self.retired -= remaining + 1
+				self.flush_ports()
+				await blocked.port.wait_readable(self, blocked.count)
+				continue
+			except Exception as ex:
+				self.retired -= remaining + 1
+				self.fault(ex)
+				break
+			self.retired -= remaining
+			await self.drain_ports()
+			await asyncio.sleep(0)
+		await self.drain_ports()
+
+	def get_async_reads(self) -> "list[Union[list[IAsyncPort], None]]":
+		result: list[Union[list[IAsyncPort], None]] = []
+		for instruction in self.rom:
+			operands = [instruction.b, instruction.c] if isinstance(instruction, OUT) else [instruction.a, instruction.b, instruction.c]
+			ports = [self.ports[operand.id] for operand in operands if isinstance(operand, Port) and isinstance(self.ports[operand.id], IAsyncPort)]
+			result.append(ports if len(ports) > 0 else None)
+		return result
+
+	async def drain_ports(self) -> None:
+		for port in self.ports:
+			if isinstance(port, IAsyncPort): await port.drain(self)
 
 	def step(self) -> None:
 		address = self.read_special_register(self.pc)
@@ -88,16 +309,34 @@ class URCLEmulator(IMachine, IDebugger):
 			if address in self.gopoints:
 				self.gopoints.remove(address)
 				self.debug()
-			elif len(self.breakpoints) > 0:
-				source = self.get_current_instruction().source
-				if source != None and (getattr(source, "line_index", -1) + 1) in self.breakpoints: self.debug()
+			elif len(self.breakpoints) > 0 and self.is_breakpoint(address): self.debug()
+			if self.watching and self.check_conditions(): self.debug()
 			if self.debugging and self.break_callback != None:
+				self.retired -= 1
 				self.break_callback(self, self.break_data)
 			else:
 				self.step_into()
 		else:
-			self.executing = False
+			self.retired -= 1
+			self.halt(HALT_END_OF_ROM)
+
+	def is_breakpoint(self, address: int) -> bool:
+		source = self.get_instruction(address).source
+		return source != None and (getattr(source, "line_index", -1) + 1) in self.breakpoints
 	
+	def check_conditions(self) -> bool:
+		if self.steps_remaining == 0: return True
+		elif self.steps_remaining > 0: self.steps_remaining -= 1
+		for name, comparison, value in self.register_conditions:
+			if _comparisons[comparison](self.read_named_register(name), value): return True
+		return False
+
+	def clear_conditions(self) -> None:
+		self.watching = False
+		self.steps_remaining = -1
+		self.register_conditions.clear()
+		self.watchpoints.clear()
+
 	def get_line(self) -> Union[int, None]:
 		instruction = self.get_current_instruction()
 		result = getattr(instruction.source, "line_index", None) if instruction.source != None else None
@@ -136,6 +375,17 @@ class URCLEmulator(IMachine, IDebugger):
 			result[func] = func_result
 		return result
 
+	def get_counters(self) -> "dict[str, Any]":
+		total = sum(self.address_samples.values())
+		return {
+			"retired": self.retired,
+			"memory_blocks": len(self.memory_blocks),
+			"port_reads": self.port_reads,
+			"port_writes": self.port_writes,
+			"call_depth": len(self.call_stack),
+			"hot_addresses": [(address, count / total) for address, count in heapq.nlargest(5, self.address_samples.items(), key=lambda item: item[1])]
+		}
+
 	def get_current_instruction(self) -> IInstruction:
 		return self.get_instruction(self.read_special_register(self.pc))
 	
@@ -144,16 +394,22 @@ class URCLEmulator(IMachine, IDebugger):
 	
 	def get_bit_mask(self) -> int: return self.integer_mask
 	
-	def get_sign_bit_mask(self) -> int: return 1 << (self.integer_mask - 1)
+	def get_sign_bit_mask(self) -> int: return self.sign_bit_mask
 
-	def read_register(self, index: int) -> int:
-		return 0 if index >= len(self.general_registers) else self.general_registers[index]
-	
-	def write_register(self, index: int, value: int) -> None:
-		if index == 0: return
-		while len(self.general_registers) <= index: self.general_registers.append(0)
-		self.general_registers[index] = value & self.integer_mask
+	def get_carry_bit_mask(self) -> int: return self.carry_bit_mask
+
+	def read_register(self, index: int) -> int: return self.general_registers[index]
+	def write_register(self, index: int, value: int) -> None: self.general_registers[index] = value & self.integer_mask
+	def write_register_unmasked(self, index: int, value: int) -> None: self.general_registers[index] = value
 	
+	def read_named_register(self, name: str) -> int:
+		name = name.upper()
+		if name in self.special_register_map: return self.read_special_register(self.special_register_map[name])
+		elif len(name) > 1 and name[0] in "R$" and name[1:].isdigit():
+			index = int(name[1:])
+			return self.read_register(index) if index < len(self.general_registers) else 0
+		raise Exception(f"Register \"{name}\" does not exist.")
+
 	def get_special_register_id(self, name: str) -> int:
 		result = self.special_register_map.get(name)
 		if result == None:
@@ -172,12 +428,28 @@ class URCLEmulator(IMachine, IDebugger):
 		block = self.memory_blocks.get(address)
 		return 0 if block == None else block[offset]
 	
+	def read_memory_range(self, address: int, count: int) -> "list[int]":
+		result: list[int] = []
+		if address < 0: address += self.integer_mask + 1
+		while count > 0:
+			offset = address & self.memory_block_offset_mask
+			length = min(count, self.memory_block_size - offset)
+			block = self.memory_blocks.get(address >> self.memory_block_offset_bits)
+			result.extend([0] * length if block == None else block[offset:offset + length])
+			address = (address + length) & self.integer_mask
+			count -= length
+		return result
+
 	def write_memory(self, address: int, value: int) -> None:
 		if address < 0: address += self.integer_mask + 1
+		if len(self.watchpoints) > 0 and address in self.watchpoints: self.debug()
 		offset = address & self.memory_block_offset_mask
 		address = address >> self.memory_block_offset_bits
 		block = self.memory_blocks.get(address)
 		if block == None:
+			if self.memory_block_budget >= 0 and len(self.memory_blocks) >= self.memory_block_budget:
+				self.halt(HALT_BUDGET, f"Memory budget of {self.memory_block_budget} block(s) exceeded.")
+				return
 			block = [0] * self.memory_block_size
 			self.memory_blocks[address] = block
 		block[offset] = value & self.integer_mask
@@ -187,39 +459,543 @@ class URCLEmulator(IMachine, IDebugger):
 		if result == None: raise Exception(f"Port \"{name}\" does not exist.")
 		return result
 	
-	def read_port(self, id: int) -> int: return self.ports[id].read(self)
-	def write_port(self, id: int, value: int) -> None: self.ports[id].write(self, value)
+	def read_port(self, id: int) -> int:
+		value = self.ports[id].read(self)
+		self.port_reads += 1
+		return value & self.integer_mask
+
+	def write_port(self, id: int, value: int) -> None:
+		if self.output_budget >= 0 and self.port_writes >= self.output_budget:
+			self.halt(HALT_BUDGET, f"Output budget of {self.output_budget:,} write(s) exceeded.")
+			return
+		self.port_writes += 1
+		self.ports[id].write(self, value)
 	
-	def halt(self) -> None: self.executing = False
+	def flush_ports(self) -> None:
+		for port in self.ports: port.flush(self)
+		if self.tracer != None: self.tracer.flush()
+
+	def halt(self, reason: str = HALT_INSTRUCTION, message: str = "") -> None:
+		self.executing = False
+		address = self.special_registers[self.pc]
+		self.halt_reason = HaltReason(reason, address, getattr(self.get_instruction(address).source, "line_index", -1) + 1, message)
+		if self.recording and self.history_step >= self.history_end: self.history_halt_reason = self.halt_reason
+		self.flush_ports()
+
+	def fault(self, error: Exception) -> None:
+		self.halt(HALT_FAULT, f"{type(error).__name__}: {error}")
+
+	def get_halt_reason(self) -> Union["HaltReason", None]: return self.halt_reason
 
-	def resume(self) -> None: self.debugging = False
+	def get_program_hash(self) -> str:
+		return hashlib.sha256("\n".join([str(instruction) for instruction in self.rom]).encode()).hexdigest()
+
+	def save_state(self, path: str) -> None:
+		self.flush_ports()
+		word = next((code for bits, code in _STATE_WORD_TYPES if self.integer_bits <= bits), None)
+		blocks = [index for index in sorted(self.memory_blocks) if any(self.memory_blocks[index])]
+		ports: dict[str, Tuple[str, Any]] = {}
+		for name in self.port_map:
+			port = self.ports[self.port_map[name]]
+			state = port.get_state()
+			if state != None: ports[name] = (port.__class__.__name__, state)
+		header = {
+			"program": self.get_program_hash(),
+			"integer_mask": self.integer_mask,
+			"general_registers": self.general_registers,
+			"special_registers": self.special_registers,
+			"special_register_map": self.special_register_map,
+			"call_stack": self.call_stack,
+			"call_source_stack": self.call_source_stack,
+			"ports": ports,
+			"block_size": self.memory_block_size,
+			"byteorder": sys.byteorder,
+			"word": word,
+			"blocks": blocks,
+			"memory": {} if word != None else { str(index): self.memory_blocks[index] for index in blocks }
+		}
+		data = json.dumps(header, separators=(",", ":")).encode()
+		data += b" " * (-(len(_STATE_MAGIC) + 8 + len(data)) % 8)
+		with open(path, "wb") as stream:
+			stream.write(_STATE_MAGIC)
+			stream.write(len(data).to_bytes(8, "little"))
+			stream.write(data)
+			if word != None:
+				for index in blocks: stream.write(array(word, self.memory_blocks[index]).tobytes())
+
+	def load_state(self, path: str) -> None:
+		with open(path, "rb") as stream: mapped = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+		view = memoryview(mapped)
+		try:
+			if bytes(view[:len(_STATE_MAGIC)]) != _STATE_MAGIC: raise Exception(f"\"{path}\" is not a machine snapshot.")
+			length = int.from_bytes(view[len(_STATE_MAGIC):len(_STATE_MAGIC) + 8], "little")
+			offset = len(_STATE_MAGIC) + 8
+			header = json.loads(bytes(view[offset:offset + length]))
+			if header["program"] != self.get_program_hash(): raise Exception("The snapshot was saved from a different program.")
+			if header["block_size"] != self.memory_block_size: raise Exception("The snapshot uses a different memory block size.")
+			self.set_bit_mask(header["integer_mask"])
+			self.general_registers[:] = header["general_registers"]
+			self.special_registers[:] = header["special_registers"]
+			self.special_register_map = header["special_register_map"]
+			self.call_stack[:] = header["call_stack"]
+			self.call_source_stack[:] = header["call_source_stack"]
+			ports = header["ports"]
+			for name in ports:
+				kind, state = ports[name]
+				if name in self.port_map and self.ports[self.port_map[name]].__class__.__name__ == kind: self.ports[self.port_map[name]].set_state(state)
+			self.memory_blocks = { int(index): header["memory"][index] for index in header["memory"] }
+			word = header["word"]
+			offset += length
+			size = self.memory_block_size * array(word).itemsize if word != None else 0
+			for index in header["blocks"] if word != None else []:
+				if header["byteorder"] == sys.byteorder: self.memory_blocks[index] = view[offset:offset + size].cast(word).tolist()
+				else:
+					block = array(word, view[offset:offset + size])
+					block.byteswap()
+					self.memory_blocks[index] = block.tolist()
+				offset += size
+		finally:
+			view.release()
+			mapped.close()
+		self.context = 0
+		self.context_stack.clear()
+		if self.recording: self.set_recording(True, self.checkpoint_interval, self.history_budget)
+
+	def resume(self) -> None:
+		self.step_into()
+		self.debugging = False
+		self._rebuild_dispatch()
 
 	def step_into(self) -> None:
-		self.mark_hotpath(self.read_special_register(self.pc))
 		self.get_current_instruction().execute(self)
 		if self.executing: self.write_special_register(self.pc, self.read_special_register(self.pc) + 1)
 
+	def step_into_profiled(self) -> None:
+		address = self.special_registers[self.pc]
+		if address >= len(self.rom):
+			URCLEmulator.step_into(self)
+			return
+		self.profile_counts[address] += 1
+		self.profile_countdown -= 1
+		if self.profile_countdown > 0:
+			URCLEmulator.step_into(self)
+			return
+		self.profile_countdown = random.randint(1, 2 * self.profile_sample_interval - 1)
+		start = perf_counter_ns()
+		URCLEmulator.step_into(self)
+		self.profile_times[address] += perf_counter_ns() - start
+		self.profile_samples[address] += 1
+
+	def set_profiling(self, enabled: bool, sample_interval: int = 64) -> None:
+		if sample_interval <= 0: raise Exception("Sample interval must be greater than zero.")
+		self.profile_sample_interval = sample_interval
+		self.profile_countdown = sample_interval
+		self.profiling = enabled
+		self._rebuild_dispatch()
+
+	def _rebuild_dispatch(self) -> None:
+		for name in _DISPATCH_METHODS:
+			if name in self.__dict__: del self.__dict__[name]
+		self.traced_methods.clear()
+		self.call_profiled_step_into = None
+		self.covered_step_into = None
+		self.paused_step_into = None
+		if self.recording:
+			for name in _DISPATCH_METHODS: setattr(self, name, getattr(self, name + "_recorded"))
+		elif self.profiling: self.step_into = self.step_into_profiled
+		if self.tracer != None:
+			for name in _DISPATCH_METHODS:
+				self.traced_methods[name] = getattr(self, name)
+				setattr(self, name, getattr(self, name + "_traced"))
+		if self.call_profiling:
+			self.call_profiled_step_into = self.step_into
+			self.step_into = self.step_into_call_profiled
+		if self.covering:
+			self.covered_step_into = self.step_into
+			self.step_into = self.step_into_covered
+		if self.debugging and self.break_callback != None:
+			self.paused_step_into = self.step_into
+			self.step_into = self.step_into_paused
+
+	def step_into_paused(self) -> None:
+		self.retired += 1
+		self.paused_step_into()
+
+	def reset_profile(self) -> None:
+		self.profile_counts = [0] * len(self.rom)
+		self.profile_samples = [0] * len(self.rom)
+		self.profile_times = [0] * len(self.rom)
+
+	def get_instruction_profile(self) -> "dict[str, Any]":
+		opcodes: dict[str, dict[str, float]] = {}
+		forms: dict[str, dict[str, float]] = {}
+		for address in range(len(self.rom)):
+			if self.profile_counts[address] == 0: continue
+			opcode, form = self.profile_keys[address]
+			for entries, key in [(opcodes, opcode), (forms, form)]:
+				entry = entries.get(key)
+				if entry == None:
+					entry = { "count": 0, "samples": 0, "sampled_ns": 0 }
+					entries[key] = entry
+				entry["count"] += self.profile_counts[address]
+				entry["samples"] += self.profile_samples[address]
+				entry["sampled_ns"] += self.profile_times[address]
+		for entries in [opcodes, forms]:
+			for entry in entries.values():
+				entry["mean_ns"] = entry["sampled_ns"] / entry["samples"] if entry["samples"] > 0 else 0.0
+				entry["estimated_ns"] = entry["mean_ns"] * entry["count"]
+		return { "sample_interval": self.profile_sample_interval, "opcodes": opcodes, "forms": forms }
+
+	def set_coverage(self, enabled: bool) -> None:
+		self.covering = enabled
+		self.reset_coverage()
+		self._rebuild_dispatch()
+
+	def step_into_covered(self) -> None:
+		address = self.special_registers[self.pc]
+		self.covered_step_into()
+		if address < len(self.coverage):
+			self.coverage[address] = 1
+			if self.coverage_branches[address] != 0: self.coverage_edges.add((address, self.special_registers[self.pc]))
+
+	def reset_coverage(self) -> None:
+		self.coverage = bytearray(len(self.rom))
+		self.coverage_branches = bytearray([1 if isinstance(instruction, IBranchInstruction) else 0 for instruction in self.rom])
+		self.coverage_edges.clear()
+
+	def get_coverage(self) -> "Tuple[set[int], set[Tuple[int, int]]]":
+		return ({ address for address in range(len(self.coverage)) if self.coverage[address] != 0 }, set(self.coverage_edges))
+
+	def get_line_coverage(self) -> "dict[int, Tuple[int, int]]":
+		result: dict[int, Tuple[int, int]] = {}
+		taken = { source for source, target in self.coverage_edges if target != source + 1 }
+		for address in range(len(self.coverage)):
+			instruction = self.rom[address]
+			line = getattr(instruction.source, "line_index", -1) + 1 if instruction.source != None else 0
+			if line == 0: continue
+			hit, total = result.get(line, (0, 0))
+			hit += self.coverage[address]
+			total += 1
+			if self.coverage_branches[address] != 0 and instruction.b != None:
+				hit += int((address, address + 1) in self.coverage_edges) + int(address in taken)
+				total += 2
+			result[line] = (hit, total)
+		return result
+
+	def set_recording(self, enabled: bool, checkpoint_interval: int = 65536, history_budget: int = 64 * 1024 * 1024) -> None:
+		if checkpoint_interval <= 0: raise Exception("Checkpoint interval must be greater than zero.")
+		self.recording = enabled
+		self.checkpoint_interval = checkpoint_interval
+		self.history_budget = history_budget
+		self.history_step = 0
+		self.history_end = 0
+		self.history_halt_reason = None
+		self.checkpoints.clear()
+		self.shared_blocks.clear()
+		self.undo_log.clear()
+		self.undo_marks.clear()
+		self.port_log.clear()
+		self.port_log_offset = 0
+		self.port_cursor = 0
+		self._rebuild_dispatch()
+		if enabled: self._begin_segment(0)
+
+	def step_into_recorded(self) -> None:
+		if self.history_step < self.history_end:
+			self._record_step(URCLEmulator.replay_step)
+			return
+		self.history_halt_reason = None
+		if self.profiling: self._record_step(URCLEmulator.step_into_profiled)
+		else: self._record_step(URCLEmulator.step_into)
+
+	def replay_step(self) -> None:
+		self.executing = True
+		self.get_current_instruction().execute(self)
+		if self.executing: self.write_special_register(self.pc, self.read_special_register(self.pc) + 1)
+
+	def write_register_recorded(self, index: int, value: int) -> None:
+		self.undo_log.append((_UNDO_REGISTER, index, self.general_registers[index]))
+		self.general_registers[index] = value & self.integer_mask
+
+	def write_register_unmasked_recorded(self, index: int, value: int) -> None:
+		self.undo_log.append((_UNDO_REGISTER, index, self.general_registers[index]))
+		self.general_registers[index] = value
+
+	def write_special_register_recorded(self, id: int, value: int) -> None:
+		self.undo_log.append((_UNDO_SPECIAL_REGISTER, id, self.special_registers[id]))
+		self.special_registers[id] = value & self.integer_mask
+
+	def write_memory_recorded(self, address: int, value: int) -> None:
+		if address < 0: address += self.integer_mask + 1
+		self.undo_log.append((_UNDO_MEMORY, address, self.read_memory(address)))
+		if (address >> self.memory_block_offset_bits) in self.shared_blocks: self._get_writable_block(address >> self.memory_block_offset_bits)
+		URCLEmulator.write_memory(self, address, value)
+
+	def read_port_recorded(self, id: int) -> int:
+		index = self.port_cursor - self.port_log_offset
+		if index < len(self.port_log): value = self.port_log[index]
+		else:
+			value = URCLEmulator.read_port(self, id)
+			self.port_log.append(value)
+		self.undo_log.append((_UNDO_PORT, id, self.port_cursor))
+		self.port_cursor += 1
+		return value
+
+	def write_port_recorded(self, id: int, value: int) -> None:
+		if self.history_step >= self.history_end: URCLEmulator.write_port(self, id, value)
+
+	def indicate_call_recorded(self, return_address: int) -> None:
+		self.undo_log.append((_UNDO_CALL, 0, None))
+		URCLEmulator.indicate_call(self, return_address)
+
+	def indicate_return_recorded(self) -> None:
+		if len(self.call_stack) > 0: self.undo_log.append((_UNDO_RETURN, self.call_stack[-1], (self.call_source_stack[-1], self.context)))
+		URCLEmulator.indicate_return(self)
+
+	def step_back(self) -> None:
+		if self.recording: self.rewind_to(self.history_step - 1)
+
+	def reverse_continue(self) -> None:
+		if not self.recording: return
+		end = self.history_step
+		for index in range(len(self.checkpoints) - 1, -1, -1):
+			start = self.checkpoints[index].step
+			if start >= end: continue
+			self.rewind_to(start)
+			hit = -1
+			while self.history_step < end:
+				if self.is_breakpoint(self.special_registers[self.pc]): hit = self.history_step
+				self._record_step(URCLEmulator.replay_step)
+			if hit >= 0:
+				self.rewind_to(hit)
+				return
+			end = start
+		self.rewind_to(end)
+
+	def rewind_to(self, step: int) -> None:
+		if not self.recording or len(self.checkpoints) == 0: return
+		step = min(max(step, self.checkpoints[0].step), self.history_end)
+		self.executing = True
+		if step < self.checkpoints[self.checkpoint_index].step:
+			index = len(self.checkpoints) - 1
+			while self.checkpoints[index].step > step: index -= 1
+			self.checkpoints[index].restore(self)
+			self.checkpoint_index = index
+			self.undo_log.clear()
+			self.undo_marks.clear()
+		while self.history_step > step:
+			self._undo(self.undo_marks.pop())
+			self.history_step -= 1
+		while self.history_step < step: self._record_step(URCLEmulator.replay_step)
+		self.halt_reason = None if self.history_step < self.history_end else self.history_halt_reason
+		self.executing = self.halt_reason == None
+
+	def get_history_size(self) -> int:
+		blocks = set([id(block) for checkpoint in self.checkpoints for block in checkpoint.memory_blocks.values()])
+		return len(blocks) * self.memory_block_size * _HISTORY_WORD_BYTES + (len(self.undo_log) + len(self.undo_marks)) * _HISTORY_ENTRY_BYTES + len(self.port_log) * _HISTORY_WORD_BYTES
+
+	def _record_step(self, step: "Callable[[URCLEmulator], None]") -> None:
+		next = self.checkpoint_index + 1
+		if next < len(self.checkpoints):
+			if self.history_step == self.checkpoints[next].step: self._begin_segment(next)
+		elif self.history_step >= self.checkpoints[self.checkpoint_index].step + self.checkpoint_interval: self._begin_segment(next)
+		self.undo_marks.append(len(self.undo_log))
+		step(self)
+		self.history_step += 1
+		if self.history_step > self.history_end: self.history_end = self.history_step
+
+	def _begin_segment(self, index: int) -> None:
+		checkpoint = HistoryCheckpoint(self)
+		self.shared_blocks = set(self.memory_blocks.keys())
+		self.undo_log.clear()
+		self.undo_marks.clear()
+		self.checkpoint_index = index
+		if index < len(self.checkpoints):
+			self.checkpoints[index] = checkpoint
+			return
+		self.checkpoints.append(checkpoint)
+		while len(self.checkpoints) > 1 and self.get_history_size() > self.history_budget:
+			if len(self.checkpoints) > 2: self._thin_checkpoints()
+			else: self._drop_oldest_checkpoint()
+		self.checkpoint_index = len(self.checkpoints) - 1
+
+	def _thin_checkpoints(self) -> None:
+		steps = [checkpoint.step for checkpoint in self.checkpoints]
+		best = min(range(1, len(steps) - 1), key=lambda index: (steps[index + 1] - steps[index - 1]) / (self.history_step - steps[index - 1] + 1))
+		del self.checkpoints[best]
+
+	def _drop_oldest_checkpoint(self) -> None:
+		del self.checkpoints[0]
+		trimmed = self.checkpoints[0].port_cursor - self.port_log_offset
+		del self.port_log[:trimmed]
+		self.port_log_offset += trimmed
+
+	def _get_writable_block(self, index: int) -> "list[int]":
+		block = self.memory_blocks.get(index)
+		if block == None:
+			block = [0] * self.memory_block_size
+			self.memory_blocks[index] = block
+		elif index in self.shared_blocks:
+			block = list(block)
+			self.memory_blocks[index] = block
+		self.shared_blocks.discard(index)
+		return block
+
+	def _undo(self, mark: int) -> None:
+		while len(self.undo_log) > mark:
+			kind, key, value = self.undo_log.pop()
+			if kind == _UNDO_REGISTER: self.general_registers[key] = value
+			elif kind == _UNDO_SPECIAL_REGISTER: self.special_registers[key] = value
+			elif kind == _UNDO_MEMORY: self._get_writable_block(key >> self.memory_block_offset_bits)[key & self.memory_block_offset_mask] = value
+			elif kind == _UNDO_PORT: self.port_cursor = value
+			elif kind == _UNDO_CALL:
+				self.call_stack.pop()
+				self.call_source_stack.pop()
+				self.context = self.context_stack.pop()
+			elif kind == _UNDO_RETURN:
+				self.call_stack.append(key)
+				self.call_source_stack.append(value[0])
+				self.context_stack.append(self.context)
+				self.context = value[1]
+
+	def set_tracer(self, tracer: Union["ITracer", None]) -> None:
+		self.tracer = tracer
+		self._rebuild_dispatch()
+		if tracer == None: return
+		for index in range(len(self.general_registers)):
+			if self.general_registers[index] != 0: tracer.register(index, 0, self.general_registers[index])
+		for id in range(len(self.special_registers)):
+			if id != self.pc and self.special_registers[id] != 0: tracer.special_register(id, 0, self.special_registers[id])
+		for index in sorted(self.memory_blocks):
+			block = self.memory_blocks[index]
+			for offset in range(self.memory_block_size):
+				if block[offset] != 0: tracer.memory((index << self.memory_block_offset_bits) | offset, 0, block[offset])
+
+	def step_into_traced(self) -> None:
+		self.tracer.step(self.special_registers[self.pc])
+		self.traced_methods["step_into"]()
+
+	def write_register_traced(self, index: int, value: int) -> None:
+		old = self.general_registers[index]
+		self.traced_methods["write_register"](index, value)
+		self.tracer.register(index, old, self.general_registers[index])
+
+	def write_register_unmasked_traced(self, index: int, value: int) -> None:
+		old = self.general_registers[index]
+		self.traced_methods["write_register_unmasked"](index, value)
+		self.tracer.register(index, old, self.general_registers[index])
+
+	def write_special_register_traced(self, id: int, value: int) -> None:
+		if id == self.pc:
+			self.traced_methods["write_special_register"](id, value)
+			return
+		old = self.special_registers[id]
+		self.traced_methods["write_special_register"](id, value)
+		self.tracer.special_register(id, old, self.special_registers[id])
+
+	def write_memory_traced(self, address: int, value: int) -> None:
+		if address < 0: address += self.integer_mask + 1
+		old = self.read_memory(address)
+		self.traced_methods["write_memory"](address, value)
+		self.tracer.memory(address, old, self.read_memory(address))
+
+	def read_port_traced(self, id: int) -> int:
+		value = self.traced_methods["read_port"](id)
+		self.tracer.port_read(id, value)
+		return value
+
+	def write_port_traced(self, id: int, value: int) -> None:
+		self.traced_methods["write_port"](id, value)
+		self.tracer.port_write(id, value)
+
+	def indicate_call_traced(self, return_address: int) -> None:
+		self.tracer.call(self.special_registers[self.pc] + 1, return_address)
+		self.traced_methods["indicate_call"](return_address)
+
+	def indicate_return_traced(self) -> None:
+		self.tracer.ret()
+		self.traced_methods["indicate_return"]()
+
 	def step_over(self) -> None:
 		self.set_gopoint(self.read_special_register(self.pc) + 1)
 		self.step_into()
 		self.debugging = False
+		self._rebuild_dispatch()
 	
 	def step_out(self) -> None:
 		if len(self.call_stack) > 0: self.set_gopoint(self.call_stack[len(self.call_stack) - 1])
 		self.step_into()
 		self.debugging = False
+		self._rebuild_dispatch()
+
+	def step_count(self, count: int) -> None:
+		self.step_into()
+		self.debugging = False
+		self._rebuild_dispatch()
+		if count > 1:
+			self.steps_remaining = count - 1
+			self.watching = True
+
+	def run_to_address(self, address: int) -> None:
+		self.set_gopoint(address)
+		self.resume()
+
+	def run_to_register(self, name: str, comparison: str, value: int) -> None:
+		if not comparison in _comparisons: raise Exception(f"Unknown comparison \"{comparison}\".")
+		self.read_named_register(name)
+		self.resume()
+		self.register_conditions.append((name, comparison, value & self.integer_mask))
+		self.watching = True
+
+	def run_to_memory_write(self, address: int) -> None:
+		if address < 0: address += self.integer_mask + 1
+		self.resume()
+		self.watchpoints.add(address)
 
 	def debug(self) -> None:
 		self.debugging = True
+		self._rebuild_dispatch()
+		self.flush_ports()
+		if self.watching or len(self.watchpoints) > 0: self.clear_conditions()
 
 	def indicate_call(self, return_address: int) -> None:
 		address = self.read_special_register(self.pc) + 1
 		self.call_stack.append(address)
 		self.call_source_stack.append(return_address)
+		node = self.context_children.get((self.context, address))
+		if node == None:
+			node = len(self.context_nodes)
+			self.context_nodes.append((self.context, address, return_address))
+			self.context_children[(self.context, address)] = node
+			self.context_counts.append(0)
+			self.context_calls.append(0)
+		self.context_calls[node] += 1
+		self.context_stack.append(self.context)
+		self.context = node
 	
 	def indicate_return(self) -> None:
 		if len(self.call_stack) > 0: self.call_stack.pop()
 		if len(self.call_source_stack) > 0: self.call_source_stack.pop()
+		self.context = self.context_stack.pop() if len(self.context_stack) > 0 else 0
+
+	def set_call_profiling(self, enabled: bool) -> None:
+		self.call_profiling = enabled
+		self._rebuild_dispatch()
+
+	def step_into_call_profiled(self) -> None:
+		self.context_counts[self.context] += 1
+		self.mark_hotpath(self.special_registers[self.pc])
+		self.call_profiled_step_into()
+
+	def get_call_profile(self) -> "dict[str, Any]":
+		addresses = set([address for _, address, _ in self.context_nodes] + [site for _, _, site in self.context_nodes if site >= 0])
+		source = next((instruction.source for instruction in self.rom if instruction.source != None), None)
+		return {
+			"source": getattr(source, "source_name", "") or "program.urcl",
+			"nodes": [(parent, address, site, self.context_counts[index], self.context_calls[index]) for index, (parent, address, site) in enumerate(self.context_nodes)],
+			"names": { address: self.get_address_name(address) for address in addresses },
+			"lines": { address: getattr(self.get_instruction(address).source, "line_index", -1) + 1 for address in addresses }
+		}
 
 	def mark_hotpath(self, address: int, source_index: int = -1) -> None:
 		line = getattr(self.get_instruction(address).source, "line_index", -1) + 1
@@ -245,17 +1021,294 @@ class URCLEmulator(IMachine, IDebugger):
 			value >>= 1
 		return result
 
+class HaltReason:
+	def __init__(self, kind: str, address: int, line: int, message: str = "") -> None:
+		self.kind = kind
+		self.address = address
+		self.line = line
+		self.message = message
+
+	def __str__(self) -> str:
+		result = self.message if self.message != "" else _HALT_DESCRIPTIONS.get(self.kind, self.kind)
+		return result if self.line <= 0 else f"{result} (ln {self.line})"
+
+class HistoryCheckpoint:
+	def __init__(self, machine: URCLEmulator) -> None:
+		self.step = machine.history_step
+		self.general_registers = list(machine.general_registers)
+		self.special_registers = list(machine.special_registers)
+		self.call_stack = list(machine.call_stack)
+		self.call_source_stack = list(machine.call_source_stack)
+		self.context = machine.context
+		self.context_stack = list(machine.context_stack)
+		self.memory_blocks = dict(machine.memory_blocks)
+		self.port_cursor = machine.port_cursor
+
+	def restore(self, machine: URCLEmulator) -> None:
+		machine.history_step = self.step
+		machine.general_registers[:] = self.general_registers
+		machine.special_registers[:] = self.special_registers
+		machine.call_stack[:] = self.call_stack
+		machine.call_source_stack[:] = self.call_source_stack
+		machine.context = self.context
+		machine.context_stack[:] = self.context_stack
+		machine.memory_blocks = dict(self.memory_blocks)
+		machine.shared_blocks = set(self.memory_blocks.keys())
+		machine.port_cursor = self.port_cursor
+
+class ITracer:
+	def step(self, address: int) -> None: ...
+	def register(self, index: int, old: int, new: int) -> None: ...
+	def special_register(self, id: int, old: int, new: int) -> None: ...
+	def memory(self, address: int, old: int, new: int) -> None: ...
+	def port_read(self, id: int, value: int) -> None: ...
+	def port_write(self, id: int, value: int) -> None: ...
+	def call(self, address: int, return_address: int) -> None: ...
+	def ret(self) -> None: ...
+	def flush(self) -> None: return
+
+class FlagPoller:
+	def __init__(self, flag) -> None:
+		self.flag = flag
+
+	def __call__(self, machine: URCLEmulator) -> bool:
+		if self.flag.value == 0: return False
+		self.flag.value = 0
+		return True
+
 class IPort:
 	def read(self, machine: URCLEmulator) -> int: ...
 	def write(self, machine: URCLEmulator, value: int) -> None: ...
+	def read_block(self, machine: URCLEmulator, count: int) -> "list[int]": return [self.read(machine) for _ in range(count)]
+	def write_block(self, machine: URCLEmulator, values: "list[int]") -> None:
+		for value in values: self.write(machine, value)
+	def flush(self, machine: URCLEmulator) -> None: return
+	def get_state(self) -> Any: return None
+	def set_state(self, state: Any) -> None: return
 
 class StdioPort(IPort):
+	def __init__(self, buffer_size: int = 4096) -> None:
+		self.buffer_size = buffer_size
+		self.input: deque[int] = deque()
+		self.output = bytearray()
+
 	def read(self, machine: URCLEmulator) -> int:
-		try: return ord(sys.stdin.read(1))
-		except: return 0
+		if len(self.input) == 0:
+			self.flush(machine)
+			self.input.extend([ord(character) for character in sys.stdin.readline()])
+			if len(self.input) == 0: return 0
+		return self.input.popleft()
 	
 	def write(self, machine: URCLEmulator, value: int) -> None:
-		sys.stdout.write(chr(value & 0xFF))
+		self.output.append(value & 0xFF)
+		if len(self.output) >= self.buffer_size: self.flush(machine)
+
+	def write_block(self, machine: URCLEmulator, values: "list[int]") -> None:
+		self.output.extend([value & 0xFF for value in values])
+		if len(self.output) >= self.buffer_size: self.flush(machine)
+
+	def flush(self, machine: URCLEmulator) -> None:
+		if len(self.output) == 0: return
+		sys.stdout.write(self.output.decode("latin-1"))
+		sys.stdout.flush()
+		self.output.clear()
+
+	def get_state(self) -> Any: return list(self.input)
+	def set_state(self, state: Any) -> None: self.input = deque(state)
+
+class StreamPort(IPort):
+	def __init__(self, buffer_size: int = 4096) -> None:
+		self.buffer_size = buffer_size
+		self.input: deque[int] = deque()
+		self.output = bytearray()
+
+	def get_input_stream(self) -> Union[BinaryIO, None]: return None
+	def get_output_stream(self) -> Union[BinaryIO, None]: return None
+
+	def read(self, machine: URCLEmulator) -> int:
+		if len(self.input) == 0 and not self.fill(machine): return 0
+		return self.input.popleft()
+
+	def read_block(self, machine: URCLEmulator, count: int) -> "list[int]":
+		while len(self.input) < count and self.fill(machine): pass
+		return [self.input.popleft() if len(self.input) > 0 else 0 for _ in range(count)]
+
+	def fill(self, machine: URCLEmulator) -> bool:
+		stream = self.get_input_stream()
+		if stream == None: return False
+		self.flush(machine)
+		data = stream.read1(self.buffer_size) if hasattr(stream, "read1") else stream.read(self.buffer_size)
+		self.input.extend(data)
+		return len(data) > 0
+
+	def write(self, machine: URCLEmulator, value: int) -> None:
+		self.output.append(value & 0xFF)
+		if len(self.output) >= self.buffer_size: self.flush(machine)
+
+	def write_block(self, machine: URCLEmulator, values: "list[int]") -> None:
+		self.output.extend([value & 0xFF for value in values])
+		if len(self.output) >= self.buffer_size: self.flush(machine)
+
+	def flush(self, machine: URCLEmulator) -> None:
+		if len(self.output) == 0: return
+		stream = self.get_output_stream()
+		if stream != None:
+			stream.write(self.output)
+			stream.flush()
+		self.output.clear()
+
+	def get_state(self) -> Any: return list(self.input)
+	def set_state(self, state: Any) -> None: self.input = deque(state)
+
+class FilePort(StreamPort):
+	def __init__(self, input_path: Union[str, None] = None, output_path: Union[str, None] = None, buffer_size: int = 4096) -> None:
+		super().__init__(buffer_size)
+		self.input_path = input_path
+		self.output_path = output_path
+		self.input_stream: Union[BinaryIO, None] = None
+		self.output_stream: Union[BinaryIO, None] = None
+
+	def get_input_stream(self) -> Union[BinaryIO, None]:
+		if self.input_stream == None and self.input_path != None: self.input_stream = open(self.input_path, "rb")
+		return self.input_stream
+
+	def get_output_stream(self) -> Union[BinaryIO, None]:
+		if self.output_stream == None and self.output_path != None: self.output_stream = open(self.output_path, "wb")
+		return self.output_stream
+
+	def __getstate__(self) -> dict: return {**self.__dict__, "input_stream": None, "output_stream": None}
+
+class PipePort(StreamPort):
+	def __init__(self, command: "list[str]", buffer_size: int = 4096) -> None:
+		super().__init__(buffer_size)
+		self.command = command
+		self.process: Union[subprocess.Popen, None] = None
+
+	def get_process(self) -> subprocess.Popen:
+		if self.process == None: self.process = subprocess.Popen(self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+		return self.process
+
+	def get_input_stream(self) -> Union[BinaryIO, None]: return self.get_process().stdout
+	def get_output_stream(self) -> Union[BinaryIO, None]: return self.get_process().stdin
+
+	def __getstate__(self) -> dict: return {**self.__dict__, "process": None}
+
+class MemoryTapePort(IPort):
+	def __init__(self, data: "list[int]" = []) -> None:
+		self.input: deque[int] = deque(data)
+		self.output: list[int] = []
+
+	def read(self, machine: URCLEmulator) -> int: return self.input.popleft() if len(self.input) > 0 else 0
+	def write(self, machine: URCLEmulator, value: int) -> None: self.output.append(value)
+
+	def read_block(self, machine: URCLEmulator, count: int) -> "list[int]":
+		return [self.input.popleft() if len(self.input) > 0 else 0 for _ in range(count)]
+
+	def write_block(self, machine: URCLEmulator, values: "list[int]") -> None: self.output.extend(values)
+
+	def get_output(self) -> "list[int]": return self.output
+	def get_state(self) -> Any: return [list(self.input), self.output]
+
+	def set_state(self, state: Any) -> None:
+		self.input = deque(state[0])
+		self.output = list(state[1])
+
+class PortBlocked(Exception):
+	def __init__(self, port: "IAsyncPort", count: int = 1) -> None:
+		super().__init__("Port is waiting for input.")
+		self.port = port
+		self.count = count
+
+class IAsyncPort(IPort):
+	def __init__(self) -> None:
+		self.input: deque[int] = deque()
+		self.closed = False
+
+	async def wait_readable(self, machine: URCLEmulator, count: int = 1) -> None: ...
+	def is_readable(self, count: int = 1) -> bool: return self.closed or len(self.input) >= count
+	async def drain(self, machine: URCLEmulator) -> None: return
+
+	async def read_async(self, machine: URCLEmulator) -> int:
+		await self.wait_readable(machine)
+		return self.read(machine)
+
+	def read(self, machine: URCLEmulator) -> int:
+		if len(self.input) > 0: return self.input.popleft()
+		elif self.closed: return 0
+		raise PortBlocked(self)
+
+	def read_block(self, machine: URCLEmulator, count: int) -> "list[int]":
+		if not self.is_readable(count): raise PortBlocked(self, count)
+		return [self.input.popleft() if len(self.input) > 0 else 0 for _ in range(count)]
+
+	def get_state(self) -> Any: return [list(self.input), self.closed]
+
+	def set_state(self, state: Any) -> None:
+		self.input = deque(state[0])
+		self.closed = state[1]
+
+class AsyncQueuePort(IAsyncPort):
+	def __init__(self, data: "list[int]" = []) -> None:
+		super().__init__()
+		self.input.extend(data)
+		self.output: list[int] = []
+		self.readable: Union[asyncio.Event, None] = None
+
+	def feed(self, values: "list[int]") -> None:
+		self.input.extend(values)
+		if self.readable != None: self.readable.set()
+
+	def close(self) -> None:
+		self.closed = True
+		if self.readable != None: self.readable.set()
+
+	async def wait_readable(self, machine: URCLEmulator, count: int = 1) -> None:
+		if self.readable == None: self.readable = asyncio.Event()
+		while not self.is_readable(count):
+			self.readable.clear()
+			await self.readable.wait()
+
+	def write(self, machine: URCLEmulator, value: int) -> None: self.output.append(value)
+	def write_block(self, machine: URCLEmulator, values: "list[int]") -> None: self.output.extend(values)
+	def get_output(self) -> "list[int]": return self.output
+
+	def __getstate__(self) -> dict: return {**self.__dict__, "readable": None}
+
+class AsyncStreamPort(IAsyncPort):
+	def __init__(self, reader: Union[asyncio.StreamReader, None] = None, writer: Union[asyncio.StreamWriter, None] = None, buffer_size: int = 4096) -> None:
+		super().__init__()
+		self.reader = reader
+		self.writer = writer
+		self.buffer_size = buffer_size
+		self.output = bytearray()
+		if reader == None: self.closed = True
+
+	async def wait_readable(self, machine: URCLEmulator, count: int = 1) -> None:
+		if self.is_readable(count): return
+		await self.drain(machine)
+		while not self.is_readable(count):
+			data = await self.reader.read(self.buffer_size)
+			if len(data) == 0: self.closed = True
+			self.input.extend(data)
+
+	def write(self, machine: URCLEmulator, value: int) -> None:
+		self.output.append(value & 0xFF)
+		if len(self.output) >= self.buffer_size: self.flush(machine)
+
+	def write_block(self, machine: URCLEmulator, values: "list[int]") -> None:
+		self.output.extend([value & 0xFF for value in values])
+		if len(self.output) >= self.buffer_size: self.flush(machine)
+
+	def flush(self, machine: URCLEmulator) -> None:
+		if len(self.output) == 0: return
+		if self.writer != None: self.writer.write(bytes(self.output))
+		self.output.clear()
+
+	async def drain(self, machine: URCLEmulator) -> None:
+		self.flush(machine)
+		if self.writer != None: await self.writer.drain()
+
+	def __getstate__(self) -> dict: return {**self.__dict__, "reader": None, "writer": None}
 
 class RandomPort(IPort):
 	def read(self, machine: URCLEmulator) -> int:
@@ -0,0 +1,163 @@
+import argparse
+import hashlib
+import os
+import random
+import sys
+from multiprocessing import Pool
+from typing import Callable, Tuple, Union
+from plugins.urcl.emulator import HALT_BUDGET, HALT_FAULT, MemoryTapePort, RandomPort, URCLEmulator
+from plugins.urcl.parser import ParsingResult, parse_source
+
+_INTERESTING_BYTES = [0, 1, 9, 10, 13, 32, 45, 48, 57, 65, 90, 97, 122, 127, 128, 255]
+_worker_program: Union[ParsingResult, None] = None
+_worker_budget: int = 0
+
+class FuzzCase:
+	def __init__(self, data: bytes, status: str, message: str, steps: int, addresses: "set[int]", edges: "set[Tuple[int, int]]") -> None:
+		self.data = data
+		self.status = status
+		self.message = message
+		self.steps = steps
+		self.addresses = addresses
+		self.edges = edges
+
+def parse_program(source: str) -> ParsingResult:
+	parsed = parse_source(source)
+	if len(parsed.errors) > 0: raise Exception("\n".join([f"Error (ln {line}): {error}" for line, error in parsed.errors]))
+	return parsed
+
+def run_case(parsed: ParsingResult, data: bytes, budget: int) -> FuzzCase:
+	random.seed(data)
+	machine = URCLEmulator()
+	machine.add_port("TEXT", MemoryTapePort(list(data)))
+	machine.add_port("RAND", RandomPort())
+	machine.load_program_rom(parsed.program)
+	for name in parsed.labels: machine.add_label(parsed.labels[name], name)
+	machine.set_coverage(True)
+	machine.set_budget(budget)
+	machine.execute()
+	reason = machine.get_halt_reason()
+	addresses, edges = machine.get_coverage()
+	return FuzzCase(data, reason.kind, f"{machine.get_address_name(reason.address)}: {reason}", machine.retired, addresses, edges)
+
+def _init_worker(source: str, budget: int) -> None:
+	global _worker_program, _worker_budget
+	_worker_program = parse_program(source)
+	_worker_budget = budget
+
+def _run_worker_case(data: bytes) -> FuzzCase: return run_case(_worker_program, data, _worker_budget)
+
+class Fuzzer:
+	def __init__(self, source: str, jobs: int = 1, budget: int = 1000000, max_length: int = 256, seed: Union[int, None] = None) -> None:
+		self.source = source
+		self.parsed = parse_program(source)
+		self.jobs = max(jobs, 1)
+		self.budget = budget
+		self.max_length = max_length
+		self.random = random.Random(seed)
+		self.corpus: list[bytes] = []
+		self.addresses: set[int] = set()
+		self.edges: set[Tuple[int, int]] = set()
+		self.crashes: dict[str, bytes] = {}
+		self.hangs: list[bytes] = []
+		self.executions: int = 0
+
+	def add_seed(self, data: bytes) -> None:
+		self.process(run_case(self.parsed, data[:self.max_length], self.budget))
+
+	def mutate(self, data: bytes) -> bytes:
+		rng = self.random
+		result = bytearray(data)
+		for _ in range(rng.randint(1, 4)):
+			choice = rng.randrange(6)
+			if choice == 0 and len(result) > 0:
+				result[rng.randrange(len(result))] ^= 1 << rng.randrange(8)
+			elif choice == 1 and len(result) > 0:
+				result[rng.randrange(len(result))] = rng.choice(_INTERESTING_BYTES)
+			elif choice == 2:
+				result.insert(rng.randint(0, len(result)), rng.choice(_INTERESTING_BYTES) if rng.random() < 0.5 else rng.randrange(256))
+			elif choice == 3 and len(result) > 0:
+				start = rng.randrange(len(result))
+				del result[start:start + rng.randint(1, 8)]
+			elif choice == 4 and len(result) > 0:
+				start = rng.randrange(len(result))
+				chunk = result[start:start + rng.randint(1, 8)]
+				position = rng.randint(0, len(result))
+				result[position:position] = chunk
+			elif len(self.corpus) > 0:
+				other = rng.choice(self.corpus)
+				result = result[:rng.randint(0, len(result))] + other[rng.randint(0, len(other)):]
+		return bytes(result[:self.max_length])
+
+	def process(self, case: FuzzCase) -> bool:
+		self.executions += 1
+		new = not (case.addresses <= self.addresses and case.edges <= self.edges)
+		if new:
+			self.addresses |= case.addresses
+			self.edges |= case.edges
+			self.corpus.append(case.data)
+		if case.status == HALT_FAULT and not case.message in self.crashes: self.crashes[case.message] = case.data
+		elif case.status == HALT_BUDGET and new: self.hangs.append(case.data)
+		return new
+
+	def run(self, iterations: int, batch_size: int = 256, on_batch: Union[Callable[["Fuzzer"], None], None] = None) -> None:
+		if len(self.corpus) == 0: self.add_seed(b"")
+		pool = Pool(self.jobs, initializer=_init_worker, initargs=[self.source, self.budget]) if self.jobs > 1 else None
+		try:
+			remaining = iterations
+			while remaining > 0:
+				batch = [self.mutate(self.random.choice(self.corpus)) for _ in range(min(batch_size, remaining))]
+				remaining -= len(batch)
+				if pool == None: cases = [run_case(self.parsed, data, self.budget) for data in batch]
+				else: cases = pool.map(_run_worker_case, batch, chunksize=max(len(batch) // (self.jobs * 4), 1))
+				for case in cases: self.process(case)
+				if on_batch != None: on_batch(self)
+		finally:
+			if pool != None:
+				pool.close()
+				pool.join()
+
+	def get_coverage(self) -> float:
+		return len(self.addresses) / len(self.parsed.program) if len(self.parsed.program) > 0 else 1.0
+
+def _write_inputs(directory: str, inputs: "list[bytes]") -> None:
+	os.makedirs(directory, exist_ok=True)
+	for data in inputs:
+		stream = open(os.path.join(directory, hashlib.sha1(data).hexdigest()), "wb")
+		stream.write(data)
+		stream.close()
+
+def _read_inputs(directory: str) -> "list[bytes]":
+	result: list[bytes] = []
+	if not os.path.isdir(directory): return result
+	for name in sorted(os.listdir(directory)):
+		stream = open(os.path.join(directory, name), "rb")
+		result.append(stream.read())
+		stream.close()
+	return result
+
+def main(arguments: "list[str]") -> int:
+	parser = argparse.ArgumentParser(prog="plugins.urcl.fuzzer", description="Coverage-guided fuzzing of the input read by a URCL program from the TEXT port.")
+	parser.add_argument("source")
+	parser.add_argument("--corpus", default=None, help="Directory of seed inputs, also receives inputs that reach new coverage.")
+	parser.add_argument("--crashes", default=None, help="Directory receiving inputs that raise errors or exceed the budget.")
+	parser.add_argument("--iterations", type=int, default=10000)
+	parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+	parser.add_argument("--budget", type=int, default=1000000, help="Maximum number of instructions executed per input.")
+	parser.add_argument("--max-length", type=int, default=256)
+	parser.add_argument("--seed", type=int, default=None)
+	options = parser.parse_args(arguments)
+	stream = open(options.source, "r")
+	source = stream.read()
+	stream.close()
+	fuzzer = Fuzzer(source, options.jobs, options.budget, options.max_length, options.seed)
+	if options.corpus != None:
+		for data in _read_inputs(options.corpus): fuzzer.add_seed(data)
+	report = lambda fuzzer: print(f"{fuzzer.executions} executions, {len(fuzzer.corpus)} inputs, {fuzzer.get_coverage():.1%} instructions, {len(fuzzer.edges)} edges, {len(fuzzer.crashes)} errors, {len(fuzzer.hangs)} hangs", file=sys.stderr)
+	fuzzer.run(options.iterations, on_batch=report)
+	if options.corpus != None: _write_inputs(options.corpus, fuzzer.corpus)
+	if options.crashes != None: _write_inputs(options.crashes, list(fuzzer.crashes.values()) + fuzzer.hangs)
+	for message in fuzzer.crashes: print(message)
+	return 1 if len(fuzzer.crashes) > 0 else 0
+
+if __name__ == "__main__": sys.exit(main(sys.argv[1:]))
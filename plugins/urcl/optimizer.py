@@ -0,0 +1,162 @@
+from typing import Union
+from plugins.urcl.urcl import ADD, AND, BITS, BSL, BSR, CAL, DIV, HLT, IMM, JMP, MLT, MOD, MOV, OR, RET, SUB, XOR, BREAK, IBranchInstruction, IInstruction, Immediate, IRegister, Label, Port, Register, SpecialRegister
+
+_PURE_OPERATIONS = [
+	"LOD", "ADD", "SUB", "MLT", "DIV", "MOD", "RSH", "BSR", "LSH", "BSL", "OR", "AND", "XOR", "NOR", "NAND", "XNOR", "NOT", "NEG", "INC", "DEC", "MOV", "IMM"
+]
+_IDENTITY_OPERATIONS = [ADD, SUB, OR, XOR, BSL, BSR]
+
+class OptimizationResult:
+	def __init__(self) -> None:
+		self.program: "list[IInstruction]" = []
+		self.labels: "dict[str, int]" = {}
+		self.line_map: "dict[int, int]" = {}
+		self.removed: int = 0
+		self.register_count: int = 1
+
+def optimize(program: "list[IInstruction]", labels: "dict[str, int]") -> OptimizationResult:
+	result = OptimizationResult()
+	result.register_count = max([operand.index + 1 for instruction in program for operand in instruction.get_operands() if isinstance(operand, Register)] + [1])
+	bits = min([instruction.a.value for instruction in program if isinstance(instruction, BITS) and isinstance(instruction.a, Immediate)] + [64])
+	program = [_reduce_strength(instruction, bits) for instruction in program]
+	relocatable = _is_relocatable(program)
+	_thread_jumps(program)
+	leaders = _get_leaders(program)
+	removed: set[int] = set()
+	if relocatable:
+		for address in range(len(program)):
+			if _is_identity(program[address]): removed.add(address)
+		_propagate_constants(program, leaders, removed)
+		_eliminate_dead_stores(program, leaders, removed, bits)
+		_remove_fallthrough_jumps(program, removed)
+
+	remap: list[int] = []
+	for address in range(len(program) + 1):
+		remap.append(len(result.program))
+		if address < len(program) and not address in removed: result.program.append(program[address])
+	for instruction in result.program:
+		for operand in instruction.get_operands():
+			if isinstance(operand, Label) and operand.address >= 0 and operand.address < len(remap): operand.address = remap[operand.address]
+	for name in labels: result.labels[name] = remap[labels[name]] if labels[name] < len(remap) else labels[name]
+	for address in removed:
+		line = _get_line(program[address])
+		target = remap[address]
+		if line != None and target < len(result.program):
+			target_line = _get_line(result.program[target])
+			if target_line != None: result.line_map[line] = target_line
+	result.removed = len(removed)
+	return result
+
+def _get_line(instruction: IInstruction) -> Union[int, None]:
+	line_index = getattr(instruction.source, "line_index", None)
+	return None if line_index == None else line_index + 1
+
+def _get_operand_types(instruction: IInstruction) -> dict:
+	return instruction.__class__.__init__.__annotations__
+
+def _get_written_register(instruction: IInstruction) -> Union[int, None]:
+	info = _get_operand_types(instruction)
+	if isinstance(instruction.a, Register) and isinstance(info.get("a"), type) and issubclass(info["a"], IRegister): return instruction.a.index
+	return None
+
+def _get_read_registers(instruction: IInstruction) -> "list[int]":
+	written = instruction.a if _get_written_register(instruction) != None else None
+	return [operand.index for operand in instruction.get_operands() if isinstance(operand, Register) and operand is not written]
+
+def _is_pure(instruction: IInstruction, bits: int) -> bool:
+	if not instruction.__class__.__name__ in _PURE_OPERATIONS or _get_written_register(instruction) == None: return False
+	if (isinstance(instruction, DIV) or isinstance(instruction, MOD)) and not (isinstance(instruction.c, Immediate) and (instruction.c.value & ((1 << bits) - 1)) != 0): return False
+	for operand in instruction.get_operands():
+		if isinstance(operand, Port) or isinstance(operand, SpecialRegister): return False
+	return True
+
+def _get_power_of_two(operand: Union[object, None], bits: int) -> int:
+	if isinstance(operand, Immediate) and operand.value > 0 and operand.value.bit_length() <= bits and (operand.value & (operand.value - 1)) == 0: return operand.value.bit_length() - 1
+	return -1
+
+def _reduce_strength(instruction: IInstruction, bits: int) -> IInstruction:
+	if isinstance(instruction, MLT):
+		if _get_power_of_two(instruction.c, bits) >= 0: return BSL(instruction.a, instruction.b, Immediate(_get_power_of_two(instruction.c, bits), source=instruction.c.source), source=instruction.source)
+		if _get_power_of_two(instruction.b, bits) >= 0: return BSL(instruction.a, instruction.c, Immediate(_get_power_of_two(instruction.b, bits), source=instruction.b.source), source=instruction.source)
+	elif isinstance(instruction, DIV) and _get_power_of_two(instruction.c, bits) >= 0:
+		return BSR(instruction.a, instruction.b, Immediate(_get_power_of_two(instruction.c, bits), source=instruction.c.source), source=instruction.source)
+	elif isinstance(instruction, MOD) and _get_power_of_two(instruction.c, bits) >= 0:
+		return AND(instruction.a, instruction.b, Immediate(instruction.c.value - 1, source=instruction.c.source), source=instruction.source)
+	return instruction
+
+def _is_relocatable(program: "list[IInstruction]") -> bool:
+	for instruction in program:
+		if (isinstance(instruction, IBranchInstruction) or isinstance(instruction, CAL)) and instruction.a != None and not isinstance(instruction.a, Label): return False
+		for operand in instruction.get_operands():
+			if isinstance(operand, SpecialRegister) and operand.name == "PC": return False
+	return True
+
+def _thread_jumps(program: "list[IInstruction]") -> None:
+	for instruction in program:
+		if not (isinstance(instruction, IBranchInstruction) or isinstance(instruction, CAL)) or not isinstance(instruction.a, Label): continue
+		target = instruction.a.address
+		visited: set[int] = set()
+		while target >= 0 and target < len(program) and not target in visited and isinstance(program[target], JMP) and isinstance(program[target].a, Label):
+			visited.add(target)
+			target = program[target].a.address
+		if target != instruction.a.address: instruction.a = Label(instruction.a.name, target, source=instruction.a.source)
+
+def _get_leaders(program: "list[IInstruction]") -> "set[int]":
+	result: set[int] = set([0])
+	for address in range(len(program)):
+		instruction = program[address]
+		for operand in instruction.get_operands():
+			if isinstance(operand, Label): result.add(operand.address)
+		if isinstance(instruction, IBranchInstruction) or isinstance(instruction, CAL) or isinstance(instruction, RET) or isinstance(instruction, HLT) or isinstance(instruction, BREAK):
+			result.add(address + 1)
+	return result
+
+def _propagate_constants(program: "list[IInstruction]", leaders: "set[int]", removed: "set[int]") -> None:
+	known: dict[int, Immediate] = {}
+	for address in range(len(program)):
+		if address in leaders: known.clear()
+		if address in removed: continue
+		instruction = program[address]
+		info = _get_operand_types(instruction)
+		written = _get_written_register(instruction)
+		for slot in ["a", "b", "c"]:
+			operand = getattr(instruction, slot)
+			if not isinstance(operand, Register) or operand.index == 0 or (slot == "a" and written != None) or not operand.index in known: continue
+			if isinstance(info.get(slot), type) and issubclass(Immediate, info[slot]):
+				setattr(instruction, slot, Immediate(known[operand.index].value, source=operand.source))
+		if isinstance(instruction, MOV) and isinstance(instruction.b, Register) and instruction.b.index in known:
+			instruction = IMM(instruction.a, Immediate(known[instruction.b.index].value, source=instruction.b.source), source=instruction.source)
+			program[address] = instruction
+		if isinstance(instruction, CAL): known.clear()
+		elif written != None:
+			if isinstance(instruction, IMM): known[written] = instruction.b
+			else: known.pop(written, None)
+
+def _is_identity(instruction: IInstruction) -> bool:
+	if isinstance(instruction, MOV): return isinstance(instruction.a, Register) and isinstance(instruction.b, Register) and instruction.a.index == instruction.b.index
+	if not instruction.__class__ in _IDENTITY_OPERATIONS or not isinstance(instruction.a, Register): return False
+	a, b, c = instruction.a, instruction.b, instruction.c
+	if isinstance(b, Register) and b.index == a.index and isinstance(c, Immediate) and c.value == 0: return True
+	return isinstance(instruction, ADD) and isinstance(c, Register) and c.index == a.index and isinstance(b, Immediate) and b.value == 0
+
+def _eliminate_dead_stores(program: "list[IInstruction]", leaders: "set[int]", removed: "set[int]", bits: int) -> None:
+	every_register = set(range(1, max([operand.index for instruction in program for operand in instruction.get_operands() if isinstance(operand, Register)] + [0]) + 1))
+	live: set[int] = set(every_register)
+	for address in range(len(program) - 1, -1, -1):
+		if address + 1 in leaders: live = set(every_register)
+		if address in removed: continue
+		instruction = program[address]
+		written = _get_written_register(instruction)
+		if written != None and _is_pure(instruction, bits) and not written in live:
+			removed.add(address)
+			continue
+		if isinstance(instruction, CAL) or isinstance(instruction, RET) or isinstance(instruction, BREAK): live = set(every_register)
+		elif written != None: live.discard(written)
+		live.update(_get_read_registers(instruction))
+
+def _remove_fallthrough_jumps(program: "list[IInstruction]", removed: "set[int]") -> None:
+	for address in range(len(program) - 1, -1, -1):
+		instruction = program[address]
+		if address in removed or not isinstance(instruction, JMP) or not isinstance(instruction.a, Label): continue
+		target = instruction.a.address
+		if target > address and all([skipped in removed for skipped in range(address + 1, target)]): removed.add(address)
@@ -0,0 +1,110 @@
+import json, marshal
+from typing import Any, Tuple
+
+def export_instruction_profile(profile: "dict[str, Any]", path: str) -> None:
+	stream = open(path, "w")
+	json.dump(profile, stream, indent="\t", sort_keys=True)
+	stream.close()
+
+class CallSummary:
+	def __init__(self, profile: "dict[str, Any]") -> None:
+		self.source: str = profile["source"]
+		self.names: dict[int, str] = profile["names"]
+		self.lines: dict[int, int] = profile["lines"]
+		self.nodes: list[Tuple[int, int, int, int, int]] = profile["nodes"]
+		self.inclusive: list[int] = [node[3] for node in self.nodes]
+		for index in range(len(self.nodes) - 1, 0, -1): self.inclusive[self.nodes[index][0]] += self.inclusive[index]
+		self.exclusive_counts: dict[int, int] = {}
+		self.inclusive_counts: dict[int, int] = {}
+		self.call_counts: dict[int, int] = {}
+		self.edges: dict[Tuple[int, int], list[int]] = {}
+		for index in range(len(self.nodes)):
+			parent, address, site, count, calls = self.nodes[index]
+			self.exclusive_counts[address] = self.exclusive_counts.get(address, 0) + count
+			self.call_counts[address] = self.call_counts.get(address, 0) + calls
+			if not self.is_recursive(index): self.inclusive_counts[address] = self.inclusive_counts.get(address, 0) + self.inclusive[index]
+			if parent >= 0:
+				edge = self.edges.get((self.nodes[parent][1], address))
+				if edge == None:
+					edge = [0, 0, site, 0]
+					self.edges[(self.nodes[parent][1], address)] = edge
+				edge[0] += calls
+				edge[1] += self.inclusive[index]
+				edge[3] += count
+
+	def is_recursive(self, index: int) -> bool:
+		address = self.nodes[index][1]
+		parent = self.nodes[index][0]
+		while parent >= 0:
+			if self.nodes[parent][1] == address: return True
+			parent = self.nodes[parent][0]
+		return False
+
+	def get_stack(self, index: int) -> "list[int]":
+		result: list[int] = []
+		while index >= 0:
+			result.append(self.nodes[index][1])
+			index = self.nodes[index][0]
+		result.reverse()
+		return result
+
+	def get_name(self, address: int) -> str: return self.names.get(address, hex(address))
+	def get_line(self, address: int) -> int: return max(self.lines.get(address, 0), 0)
+
+def export_callgrind(profile: "dict[str, Any]", path: str) -> None:
+	summary = CallSummary(profile)
+	lines = ["# callgrind format", "version: 1", "creator: UrCode", "events: Instructions", f"summary: {summary.inclusive[0] if len(summary.inclusive) > 0 else 0}", "", f"fl={summary.source}"]
+	for address in summary.exclusive_counts:
+		lines.append(f"fn={summary.get_name(address)}")
+		lines.append(f"{summary.get_line(address)} {summary.exclusive_counts[address]}")
+		for (caller, callee), (calls, inclusive, site, exclusive) in summary.edges.items():
+			if caller != address: continue
+			lines.append(f"cfn={summary.get_name(callee)}")
+			lines.append(f"calls={calls} {summary.get_line(callee)}")
+			lines.append(f"{summary.get_line(site)} {inclusive}")
+		lines.append("")
+	stream = open(path, "w")
+	stream.write("\n".join(lines))
+	stream.close()
+
+def export_speedscope(profile: "dict[str, Any]", path: str) -> None:
+	summary = CallSummary(profile)
+	frames: list[dict[str, Any]] = []
+	frame_indices: dict[int, int] = {}
+	samples: list[list[int]] = []
+	weights: list[int] = []
+	for index in range(len(summary.nodes)):
+		count = summary.nodes[index][3]
+		if count == 0: continue
+		stack: list[int] = []
+		for address in summary.get_stack(index):
+			if not address in frame_indices:
+				frame_indices[address] = len(frames)
+				frames.append({ "name": summary.get_name(address), "file": summary.source, "line": summary.get_line(address) })
+			stack.append(frame_indices[address])
+		samples.append(stack)
+		weights.append(count)
+	document = {
+		"$schema": "https://www.speedscope.app/file-format-schema.json",
+		"name": summary.source,
+		"exporter": "UrCode",
+		"shared": { "frames": frames },
+		"profiles": [{ "type": "sampled", "name": summary.source, "unit": "none", "startValue": 0, "endValue": sum(weights), "samples": samples, "weights": weights }]
+	}
+	stream = open(path, "w")
+	json.dump(document, stream)
+	stream.close()
+
+def export_pstats(profile: "dict[str, Any]", path: str) -> None:
+	summary = CallSummary(profile)
+	get_key = lambda address: (summary.source, summary.get_line(address), summary.get_name(address))
+	stats: dict[Tuple[str, int, str], Tuple[int, int, float, float, dict]] = {}
+	for address in summary.exclusive_counts:
+		callers: dict[Tuple[str, int, str], Tuple[int, int, float, float]] = {}
+		for (caller, callee), (calls, inclusive, site, exclusive) in summary.edges.items():
+			if callee == address: callers[get_key(caller)] = (calls, calls, float(exclusive), float(inclusive))
+		calls = summary.call_counts[address]
+		stats[get_key(address)] = (calls, calls, float(summary.exclusive_counts[address]), float(summary.inclusive_counts.get(address, 0)), callers)
+	stream = open(path, "wb")
+	marshal.dump(stats, stream)
+	stream.close()
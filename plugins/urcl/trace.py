@@ -0,0 +1,249 @@
+import argparse
+import sys
+from typing import BinaryIO, Tuple, Union
+from plugins.urcl.emulator import HALT_FAULT, FilePort, ITracer, RandomPort, StdioPort, URCLEmulator
+from plugins.urcl.parser import parse_source
+from plugins.urcl.urcl import IN
+
+TRACE_MAGIC = b"URTR\x01"
+TRACE_STEP = 0
+TRACE_REGISTER = 1
+TRACE_SPECIAL_REGISTER = 2
+TRACE_MEMORY = 3
+TRACE_PORT_READ = 4
+TRACE_PORT_WRITE = 5
+TRACE_CALL = 6
+TRACE_RETURN = 7
+TRACE_NAMES = ["step", "register", "special register", "memory", "port read", "port write", "call", "return"]
+
+def _zigzag(value: int) -> int: return value * 2 if value >= 0 else -value * 2 - 1
+def _unzigzag(value: int) -> int: return value >> 1 if (value & 1) == 0 else -((value + 1) >> 1)
+
+class TraceWriter(ITracer):
+	def __init__(self, path: str, buffer_size: int = 0x10000) -> None:
+		self.path = path
+		self.buffer_size = buffer_size
+		self.buffer = bytearray(TRACE_MAGIC)
+		self.stream: Union[BinaryIO, None] = None
+		self.next_address: int = 0
+		self.last_memory_address: int = 0
+
+	def write_varint(self, value: int) -> None:
+		buffer = self.buffer
+		while value > 0x7F:
+			buffer.append((value & 0x7F) | 0x80)
+			value >>= 7
+		buffer.append(value)
+
+	def step(self, address: int) -> None:
+		self.write_varint((_zigzag(address - self.next_address) << 3) | TRACE_STEP)
+		self.next_address = address + 1
+		if len(self.buffer) >= self.buffer_size: self.flush()
+
+	def register(self, index: int, old: int, new: int) -> None:
+		self.write_varint((index << 3) | TRACE_REGISTER)
+		self.write_varint(_zigzag(new - old))
+
+	def special_register(self, id: int, old: int, new: int) -> None:
+		self.write_varint((id << 3) | TRACE_SPECIAL_REGISTER)
+		self.write_varint(_zigzag(new - old))
+
+	def memory(self, address: int, old: int, new: int) -> None:
+		self.write_varint((_zigzag(address - self.last_memory_address) << 3) | TRACE_MEMORY)
+		self.write_varint(_zigzag(new - old))
+		self.last_memory_address = address
+
+	def port_read(self, id: int, value: int) -> None:
+		self.write_varint((id << 3) | TRACE_PORT_READ)
+		self.write_varint(value)
+
+	def port_write(self, id: int, value: int) -> None:
+		self.write_varint((id << 3) | TRACE_PORT_WRITE)
+		self.write_varint(value)
+
+	def call(self, address: int, return_address: int) -> None:
+		self.write_varint((address << 3) | TRACE_CALL)
+		self.write_varint(return_address)
+
+	def ret(self) -> None: self.write_varint(TRACE_RETURN)
+
+	def flush(self) -> None:
+		if self.stream == None: self.stream = open(self.path, "wb")
+		self.stream.write(self.buffer)
+		self.stream.flush()
+		self.buffer.clear()
+
+	def close(self) -> None:
+		if self.stream == None and len(self.buffer) == 0: return
+		self.flush()
+		self.stream.close()
+		self.stream = None
+
+	def __getstate__(self) -> dict: return {**self.__dict__, "stream": None}
+
+class TraceReader:
+	def __init__(self, path: str) -> None:
+		stream = open(path, "rb")
+		self.data = stream.read()
+		stream.close()
+		if not self.data.startswith(TRACE_MAGIC): raise Exception(f"\"{path}\" is not an execution trace.")
+		self.position = len(TRACE_MAGIC)
+		self.steps: int = 0
+		self.address: int = 0
+		self.registers: dict[int, int] = {}
+		self.special_registers: dict[int, int] = {}
+		self.memory: dict[int, int] = {}
+		self.last_memory_address: int = 0
+
+	def read_varint(self) -> int:
+		result = 0
+		shift = 0
+		while True:
+			byte = self.data[self.position]
+			self.position += 1
+			result |= (byte & 0x7F) << shift
+			if byte < 0x80: return result
+			shift += 7
+
+	def read_event(self) -> Union[Tuple[int, int, int], None]:
+		if self.position >= len(self.data): return None
+		header = self.read_varint()
+		tag = header & 7
+		key = header >> 3
+		if tag == TRACE_STEP:
+			self.address += _unzigzag(key)
+			self.steps += 1
+			result = (tag, self.address, 0)
+			self.address += 1
+			return result
+		elif tag == TRACE_REGISTER:
+			value = self.registers.get(key, 0) + _unzigzag(self.read_varint())
+			self.registers[key] = value
+			return (tag, key, value)
+		elif tag == TRACE_SPECIAL_REGISTER:
+			value = self.special_registers.get(key, 0) + _unzigzag(self.read_varint())
+			self.special_registers[key] = value
+			return (tag, key, value)
+		elif tag == TRACE_MEMORY:
+			self.last_memory_address += _unzigzag(key)
+			value = self.memory.get(self.last_memory_address, 0) + _unzigzag(self.read_varint())
+			self.memory[self.last_memory_address] = value
+			return (tag, self.last_memory_address, value)
+		elif tag == TRACE_RETURN: return (tag, 0, 0)
+		return (tag, key, self.read_varint())
+
+class TraceReplayer(URCLEmulator):
+	def __init__(self, path: str, integer_mask: int = 0xFFFFFFFFFFFFFFFF) -> None:
+		super().__init__(integer_mask)
+		self.trace = TraceReader(path)
+
+	def load_program_rom(self, program: "list") -> None:
+		super().load_program_rom(program)
+		address = self.replay_events()
+		if address != None: self.special_registers[self.pc] = address
+
+	def step_into(self) -> None:
+		address = self.replay_events()
+		if address == None: self.halt()
+		else: self.special_registers[self.pc] = address
+
+	def replay_events(self) -> Union[int, None]:
+		event = self.trace.read_event()
+		while event != None:
+			tag, key, value = event
+			if tag == TRACE_STEP: return key
+			elif tag == TRACE_REGISTER: self.write_register_unmasked(key, value)
+			elif tag == TRACE_SPECIAL_REGISTER: self.write_special_register(key, value)
+			elif tag == TRACE_MEMORY: self.write_memory(key, value)
+			elif tag == TRACE_PORT_READ: self.port_reads += 1
+			elif tag == TRACE_PORT_WRITE: self.write_port(key, value)
+			elif tag == TRACE_CALL:
+				self.special_registers[self.pc] = key - 1
+				self.indicate_call(value)
+			elif tag == TRACE_RETURN: self.indicate_return()
+			event = self.trace.read_event()
+		return None
+
+class TraceDivergence:
+	def __init__(self, step: int, address: int, expected: Union[Tuple[int, int, int], None], actual: Union[Tuple[int, int, int], None]) -> None:
+		self.step = step
+		self.address = address
+		self.expected = expected
+		self.actual = actual
+
+	def __str__(self) -> str:
+		describe = lambda event: "end of trace" if event == None else f"{TRACE_NAMES[event[0]]} {event[1]} = {event[2]}"
+		return f"Traces diverge at step {self.step} (address {self.address}): expected {describe(self.expected)}, found {describe(self.actual)}."
+
+def compare_traces(expected_path: str, actual_path: str) -> Union[TraceDivergence, None]:
+	expected = TraceReader(expected_path)
+	actual = TraceReader(actual_path)
+	address = 0
+	while True:
+		expected_event = expected.read_event()
+		actual_event = actual.read_event()
+		if expected_event != actual_event: return TraceDivergence(expected.steps, address, expected_event, actual_event)
+		elif expected_event == None: return None
+		elif expected_event[0] == TRACE_STEP: address = expected_event[1]
+
+def load_program(source_path: str, input_path: Union[str, None] = None, output_path: Union[str, None] = None) -> URCLEmulator:
+	stream = open(source_path, "r")
+	parsed = parse_source(stream.read())
+	stream.close()
+	if len(parsed.errors) > 0: raise Exception("\n".join([f"Error (ln {line}): {error}" for line, error in parsed.errors]))
+	machine = URCLEmulator()
+	machine.add_port("TEXT", StdioPort() if input_path == None and output_path == None else FilePort(input_path, output_path))
+	machine.add_port("RAND", RandomPort())
+	machine.load_program_rom(parsed.program)
+	for name in parsed.labels: machine.add_label(parsed.labels[name], name)
+	return machine
+
+def capture_state(source_path: str, state_path: str, input_path: Union[str, None] = None, output_path: Union[str, None] = None) -> URCLEmulator:
+	machine = load_program(source_path, input_path, output_path)
+	machine.executing = True
+	while machine.executing and not isinstance(machine.get_current_instruction(), IN): machine.step()
+	machine.save_state(state_path)
+	return machine
+
+def record_trace(source_path: str, trace_path: str, input_path: Union[str, None] = None, output_path: Union[str, None] = None, state_path: Union[str, None] = None) -> URCLEmulator:
+	machine = load_program(source_path, input_path, output_path)
+	if state_path != None: machine.load_state(state_path)
+	tracer = TraceWriter(trace_path)
+	machine.set_tracer(tracer)
+	try: machine.execute()
+	finally:
+		machine.flush_ports()
+		tracer.close()
+	return machine
+
+def main(arguments: "list[str]") -> int:
+	parser = argparse.ArgumentParser(prog="plugins.urcl.trace", description="Record and compare URCL execution traces and machine snapshots.")
+	commands = parser.add_subparsers(dest="command", required=True)
+	record = commands.add_parser("record", help="Run a program headlessly and record its execution trace.")
+	record.add_argument("source")
+	record.add_argument("trace")
+	record.add_argument("--input", default=None, help="File read by the TEXT port instead of stdin.")
+	record.add_argument("--output", default=None, help="File written by the TEXT port instead of stdout.")
+	record.add_argument("--state", default=None, help="Snapshot to start from instead of address 0.")
+	snapshot = commands.add_parser("snapshot", help="Run a program until its first input and save a snapshot of the machine.")
+	snapshot.add_argument("source")
+	snapshot.add_argument("state")
+	snapshot.add_argument("--input", default=None, help="File read by the TEXT port instead of stdin.")
+	snapshot.add_argument("--output", default=None, help="File written by the TEXT port instead of stdout.")
+	compare = commands.add_parser("compare", help="Find the first divergence between two traces.")
+	compare.add_argument("expected")
+	compare.add_argument("actual")
+	options = parser.parse_args(arguments)
+	if options.command == "record":
+		reason = record_trace(options.source, options.trace, options.input, options.output, options.state).get_halt_reason()
+		if reason == None or reason.kind != HALT_FAULT: return 0
+		print(str(reason), file=sys.stderr)
+		return 1
+	elif options.command == "snapshot":
+		capture_state(options.source, options.state, options.input, options.output)
+		return 0
+	divergence = compare_traces(options.expected, options.actual)
+	print("Traces are identical." if divergence == None else str(divergence))
+	return 0 if divergence == None else 1
+
+if __name__ == "__main__": sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,227 @@
+import hashlib, importlib.machinery, importlib.util, os, py_compile
+from typing import Tuple
+from plugins.urcl.parser import parse_source
+from plugins.urcl.urcl import BITS, BREAK, CAL, CPY, HLT, IN, JMP, LOD, NOP, OUT, POP, PSH, RET, STR, IBranchInstruction, IInstruction, IOperand, Immediate, Label, Port, Register, SpecialRegister
+
+_VERSION = 1
+_SPARSE_MEMORY_MASK = 0xFFFF
+
+_stores: "dict[str, Tuple[str, bool]]" = {
+	"ADD": ("{b} + {c}", True),
+	"SUB": ("{b} - {c}", True),
+	"MLT": ("{b} * {c}", True),
+	"DIV": ("{b} // {c}", False),
+	"MOD": ("{b} % {c}", False),
+	"RSH": ("{b} >> 1", False),
+	"BSR": ("{b} >> {c}", False),
+	"LSH": ("{b} << 1", True),
+	"BSL": ("{b} << {c}", True),
+	"OR": ("{b} | {c}", False),
+	"AND": ("{b} & {c}", False),
+	"XOR": ("{b} ^ {c}", False),
+	"NOR": ("({b} | {c}) ^ {mask}", False),
+	"NAND": ("({b} & {c}) ^ {mask}", False),
+	"XNOR": ("({b} ^ {c}) ^ {mask}", False),
+	"NOT": ("{b} ^ {mask}", False),
+	"NEG": ("-{b}", True),
+	"INC": ("{b} + 1", True),
+	"DEC": ("{b} - 1", True),
+	"MOV": ("{b}", False),
+	"IMM": ("{b}", False),
+	"IN": ("{b}", True)
+}
+
+_branches: "dict[str, str]" = {
+	"BRZ": "{b} == 0",
+	"BNZ": "{b} != 0",
+	"BEV": "{b} % 2 == 0",
+	"BOD": "{b} % 2 == 1",
+	"BRP": "({b} & {sign}) == 0",
+	"BRN": "({b} & {sign}) != 0",
+	"BRC": "{b} + {c} > {mask}",
+	"BNC": "{b} + {c} <= {mask}",
+	"BRE": "{b} == {c}",
+	"BNE": "{b} != {c}",
+	"BRL": "{b} < {c}",
+	"BRG": "{b} > {c}",
+	"BLE": "{b} <= {c}",
+	"BGE": "{b} >= {c}"
+}
+
+_header = """import random, sys
+
+def read_port(name):
+	if name == "TEXT":
+		character = sys.stdin.read(1)
+		return ord(character) if len(character) > 0 else 0
+	elif name == "NUMB":
+		line = sys.stdin.readline().strip()
+		return int(line, 0) if len(line) > 0 else 0
+	elif name == "RAND": return random.getrandbits(64)
+	raise Exception(f"Port \\"{name}\\" is not supported.")
+
+def write_port(name, value):
+	if name == "TEXT": sys.stdout.write(chr(value & 0xFF))
+	elif name == "NUMB": sys.stdout.write(str(value))
+	elif name != "RAND": raise Exception(f"Port \\"{name}\\" is not supported.")
+
+"""
+
+_footer = """
+if __name__ == "__main__": run()
+"""
+
+class Transpiler:
+	def __init__(self, program: "list[IInstruction]", integer_mask: int = 0xFFFFFFFFFFFFFFFF) -> None:
+		self.program = program
+		self.integer_mask = integer_mask
+		for instruction in program:
+			if isinstance(instruction, BITS): self.integer_mask = (1 << instruction.a.value) - 1
+		self.sign_bit_mask = (self.integer_mask + 1) >> 1
+		self.sparse_memory = self.integer_mask > _SPARSE_MEMORY_MASK
+		self.register_count = 1
+		self.special_registers: list[str] = []
+		self.dynamic = False
+		for instruction in program:
+			if (isinstance(instruction, IBranchInstruction) or isinstance(instruction, CAL)) and instruction.a != None and not isinstance(instruction.a, Label): self.dynamic = True
+			for operand in instruction.get_operands():
+				if isinstance(operand, Register): self.register_count = max(self.register_count, operand.index + 1)
+				elif isinstance(operand, SpecialRegister):
+					if operand.name == "PC": self.dynamic = True
+					elif operand.name != "SP" and not operand.name in self.special_registers: self.special_registers.append(operand.name)
+		self.lines: list[str] = []
+
+	def get_leaders(self) -> "list[int]":
+		if self.dynamic: return list(range(len(self.program)))
+		result: set[int] = set([0])
+		for address in range(len(self.program)):
+			instruction = self.program[address]
+			is_transfer = isinstance(instruction, IBranchInstruction) and not isinstance(instruction, BREAK)
+			if is_transfer or isinstance(instruction, CAL) or isinstance(instruction, RET) or isinstance(instruction, HLT): result.add(address + 1)
+			for operand in instruction.get_operands():
+				if isinstance(operand, Label):
+					result.add(operand.address)
+					if not ((is_transfer or isinstance(instruction, CAL)) and operand is instruction.a): result.add(operand.address + 1)
+		return sorted([address for address in result if address >= 0 and address < len(self.program)])
+
+	def transpile(self) -> str:
+		self.lines = [_header]
+		memory = "{}" if self.sparse_memory else f"[0] * {self.integer_mask + 1}"
+		self.emit(0, "def run(read_port=read_port, write_port=write_port, memory=None):")
+		self.emit(1, f"if memory == None: memory = {memory}")
+		self.emit(1, " = ".join(self.get_register_names() + ["sp", "pc", "0"]))
+		self.emit(1, f"while pc < {len(self.program)}:")
+		leaders = self.get_leaders()
+		blocks = [(leaders[index], leaders[index + 1] if index + 1 < len(leaders) else len(self.program)) for index in range(len(leaders))]
+		if len(blocks) > 0: self.emit_dispatch(blocks, 0, len(blocks), 2)
+		else: self.emit(2, "break")
+		self.emit(1, f"return {self.get_state()}")
+		self.lines.append(_footer)
+		return "\n".join(self.lines)
+
+	def emit(self, indent: int, line: str) -> None:
+		self.lines.append("\t" * indent + line)
+
+	def emit_dispatch(self, blocks: "list[Tuple[int, int]]", start: int, end: int, indent: int) -> None:
+		if end - start == 1:
+			self.emit_block(blocks[start][0], blocks[start][1], indent)
+			return
+		middle = (start + end) // 2
+		self.emit(indent, f"if pc < {blocks[middle][0]}:")
+		self.emit_dispatch(blocks, start, middle, indent + 1)
+		self.emit(indent, "else:")
+		self.emit_dispatch(blocks, middle, end, indent + 1)
+
+	def emit_block(self, start: int, end: int, indent: int) -> None:
+		if end - start > 1: self.emit(indent, f"if pc != {start}: raise Exception(f\"Address {{pc}} is not a block entry.\")")
+		for address in range(start, end):
+			statements = self.translate(address, self.program[address])
+			for statement in statements: self.emit(indent, statement)
+			if len(statements) > 0 and statements[-1].startswith("pc = ") or len(statements) > 0 and statements[-1].startswith("return "): return
+		self.emit(indent, f"pc = {end}")
+
+	def translate(self, address: int, instruction: IInstruction) -> "list[str]":
+		name = instruction.__class__.__name__
+		b = self.load(instruction.b, address) if instruction.b != None else ""
+		c = self.load(instruction.c, address) if instruction.c != None else ""
+		if name in _stores:
+			expression, masked = _stores[name]
+			return self.store(instruction.a, expression.format(b=b, c=c, mask=self.integer_mask), masked)
+		elif name in _branches:
+			condition = _branches[name].format(b=b, c=c, mask=self.integer_mask, sign=self.sign_bit_mask)
+			return [f"pc = {self.get_target(instruction.a, address)} if {condition} else {address + 1}"]
+		elif isinstance(instruction, JMP): return [f"pc = {self.get_target(instruction.a, address)}"]
+		elif isinstance(instruction, LOD): return self.store(instruction.a, self.read_memory(b), False)
+		elif isinstance(instruction, STR): return [self.write_memory(self.load(instruction.a, address), b)]
+		elif isinstance(instruction, CPY): return [self.write_memory(self.load(instruction.a, address), self.read_memory(b))]
+		elif isinstance(instruction, PSH): return [f"sp = (sp - 1) & {self.integer_mask}", self.write_memory("sp", self.load(instruction.a, address))]
+		elif isinstance(instruction, POP): return ["top = sp"] + self.store(instruction.a, self.read_memory("top"), False) + [f"sp = (top + 1) & {self.integer_mask}"]
+		elif isinstance(instruction, CAL): return [f"sp = (sp - 1) & {self.integer_mask}", self.write_memory("sp", str(address)), f"pc = {self.get_target(instruction.a, address)}"]
+		elif isinstance(instruction, RET): return [f"top = {self.read_memory('sp')}", f"sp = (sp + 1) & {self.integer_mask}", f"pc = (top + 1) & {self.integer_mask}"]
+		elif isinstance(instruction, OUT): return self.store(instruction.a, b, False)
+		elif isinstance(instruction, HLT): return [f"return {self.get_state()}"]
+		elif isinstance(instruction, NOP) or isinstance(instruction, BREAK) or isinstance(instruction, BITS): return []
+		raise Exception(f"Instruction \"{name}\" cannot be transpiled.")
+
+	def load(self, operand: IOperand, address: int) -> str:
+		if isinstance(operand, Register): return "0" if operand.index == 0 else f"r{operand.index}"
+		elif isinstance(operand, SpecialRegister): return str(address) if operand.name == "PC" else self.get_special_register_name(operand.name)
+		elif isinstance(operand, Immediate): return str(operand.value & self.integer_mask)
+		elif isinstance(operand, Label): return str(operand.address)
+		elif isinstance(operand, Port): return f"(read_port({repr(operand.name)}) & {self.integer_mask})"
+		raise Exception(f"Operand \"{operand}\" cannot be transpiled.")
+
+	def store(self, operand: IOperand, value: str, masked: bool) -> "list[str]":
+		if isinstance(operand, Register):
+			if operand.index == 0: return [value]
+			return [f"r{operand.index} = ({value}) & {self.integer_mask}" if masked else f"r{operand.index} = {value}"]
+		elif isinstance(operand, SpecialRegister):
+			if operand.name == "PC": return [f"pc = ({value} + 1) & {self.integer_mask}"]
+			return [f"{self.get_special_register_name(operand.name)} = ({value}) & {self.integer_mask}"]
+		elif isinstance(operand, Port): return [f"write_port({repr(operand.name)}, {value})"]
+		raise Exception(f"Operand \"{operand}\" cannot be stored to.")
+
+	def get_target(self, operand: IOperand, address: int) -> str:
+		return str(operand.address & self.integer_mask) if isinstance(operand, Label) else self.load(operand, address)
+
+	def read_memory(self, address: str) -> str:
+		return f"memory.get({address}, 0)" if self.sparse_memory else f"memory[{address}]"
+
+	def write_memory(self, address: str, value: str) -> str:
+		return f"memory[{address}] = ({value}) & {self.integer_mask}"
+
+	def get_register_names(self) -> "list[str]":
+		return [f"r{index}" for index in range(1, self.register_count)] + [self.get_special_register_name(name) for name in self.special_registers]
+
+	def get_special_register_name(self, name: str) -> str:
+		return "sp" if name == "SP" else "s_" + "".join([character if character.isalnum() else "_" for character in name])
+
+	def get_state(self) -> str:
+		registers = [f"\"R{index}\": r{index}" for index in range(1, self.register_count)]
+		registers += [f"{repr(name)}: {self.get_special_register_name(name)}" for name in self.special_registers + ["SP"]]
+		return "{" + ", ".join(registers) + "}, memory"
+
+def transpile(program: "list[IInstruction]", integer_mask: int = 0xFFFFFFFFFFFFFFFF) -> str:
+	return Transpiler(program, integer_mask).transpile()
+
+def build(source: str, directory: str, integer_mask: int = 0xFFFFFFFFFFFFFFFF) -> str:
+	key = f"{_VERSION}:{importlib.util.MAGIC_NUMBER.hex()}:{integer_mask}:{source}"
+	name = "urcl_" + hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+	path = os.path.join(directory, name + ".pyc")
+	if os.path.exists(path): return path
+	parsed = parse_source(source)
+	if len(parsed.errors) > 0:
+		line, error = parsed.errors[0]
+		raise Exception(f"Error (ln {line}): {error}")
+	os.makedirs(directory, exist_ok=True)
+	source_path = os.path.join(directory, name + ".py")
+	with open(source_path, "w") as stream: stream.write(transpile(parsed.program, integer_mask))
+	py_compile.compile(source_path, cfile=path, doraise=True)
+	return path
+
+def load(path: str):
+	name = os.path.splitext(os.path.basename(path))[0]
+	loader = importlib.machinery.SourcelessFileLoader(name, path)
+	module = importlib.util.module_from_spec(importlib.util.spec_from_loader(name, loader))
+	loader.exec_module(module)
+	return module
@@ -1,70 +1,31 @@
-from multiprocessing import Process, Queue
-from typing import Any, Union
+from typing import Any, Tuple, Union
 import os
-from plugins.urcl.emulator import IDebugger, IPort, RandomPort, URCLEmulator
+import tkinter.filedialog as tkfd
+from plugins.urcl.emulator import URCLEmulator
 from plugins.urcl.parser import parse_source
+from plugins.urcl.profiling import CallSummary, export_callgrind, export_instruction_profile, export_pstats, export_speedscope
+from plugins.urcl.worker import DEBUG_BREAKPOINT_REMOVE, DEBUG_BREAKPOINT_SET, DEBUG_CLOSE, DEBUG_CONTINUE, DEBUG_COUNTERS, DEBUG_FINISHED, DEBUG_OPEN, DEBUG_QUERY_CALL_PROFILE, DEBUG_QUERY_COVERAGE, DEBUG_QUERY_HOTPATHS, DEBUG_QUERY_MEMORY, DEBUG_QUERY_MEMORY_RANGE, DEBUG_QUERY_PROFILE, DEBUG_REVERSE_CONTINUE, DEBUG_RUN_TO_ADDRESS, DEBUG_RUN_TO_MEMORY_WRITE, DEBUG_RUN_TO_REGISTER, DEBUG_SAVE_STATE, DEBUG_STEP_BACK, DEBUG_STEP_COUNT, DEBUG_STEP_INTO, DEBUG_STEP_OUT, DEBUG_STEP_OVER, FIELD_CALLS, FIELD_LINE, FIELD_REGISTERS, FIELD_STACK, FIELD_TIME, IO, BACKEND_PROCESS, DebuggerWorker, RunOptions, create_emulator, create_worker
 from editor.base import ui, get_icon_font, load_icon
 
-STREAM_COMMANDS = "commands"
-STREAM_REPORTS = "reports"
-IO = "io"
-DEBUG_OPEN = "open"
-DEBUG_CONTINUE = "continue"
-DEBUG_BREAKPOINT_SET = "break"
-DEBUG_BREAKPOINT_REMOVE = "unbreak"
-DEBUG_STEP_INTO = "step"
-DEBUG_STEP_OVER = "over"
-DEBUG_STEP_OUT = "out"
-DEBUG_QUERY_MEMORY = "memory"
-DEBUG_CLOSE = "close"
-FIELD_LINE = "line"
-FIELD_REGISTERS = "registers"
-FIELD_STACK = "stack"
-FIELD_CALLS = "call_stack"
-FIELD_HOTPATH = "hotpaths"
-
-def _on_run(machine: URCLEmulator, on_start: Queue) -> None:
-	on_start.put(None)
-	try: machine.execute()
-	except: ui.console.write("\nAn internal error occurred in the debugger.\n")
-
-def _on_break(debug: IDebugger, data: dict) -> None:
-	commands: Queue = data[STREAM_COMMANDS]
-	reports: Queue = data[STREAM_REPORTS]
-	reports.put(DEBUG_OPEN)
-	reports.put({ FIELD_LINE: debug.get_line(), FIELD_REGISTERS: debug.get_registers(), FIELD_STACK: debug.get_stack(), FIELD_CALLS: debug.get_call_stack(), FIELD_HOTPATH: debug.get_hotpaths() })
-	command = commands.get()
-	while command == DEBUG_QUERY_MEMORY or command == DEBUG_BREAKPOINT_SET or command == DEBUG_BREAKPOINT_REMOVE:
-		if command == DEBUG_QUERY_MEMORY:
-			reports.put(debug.read_memory(commands.get()))
-			command = commands.get()
-		elif command == DEBUG_BREAKPOINT_SET:
-			debug.set_breakpoint(commands.get())
-		elif command == DEBUG_BREAKPOINT_REMOVE:
-			debug.remove_breakpoint(commands.get())
-	if command == DEBUG_STEP_INTO: debug.step_into()
-	elif command == DEBUG_STEP_OVER: debug.step_over()
-	elif command == DEBUG_STEP_OUT: debug.step_out()
-	elif command == DEBUG_CONTINUE: debug.resume()
-	reports.put(DEBUG_CLOSE)
-
 class Debugger:
-	def __init__(self, machine: URCLEmulator) -> None:
+	def __init__(self, machine: URCLEmulator, worker: DebuggerWorker, options: RunOptions) -> None:
 		self.machine = machine
+		self.worker = worker
+		self.options = options
+		self.recording = options.record and options.replay_path == None
 		self.pending_additions: list[int] = []
 		self.pending_deletions: list[int] = []
-		self.commands = Queue()
-		self.reports = Queue()
-		self.on_start = Queue()
-		self.process = Process(target=_on_run, daemon=True, args=[machine, self.on_start])
-		streams = { STREAM_COMMANDS: self.commands, STREAM_REPORTS: self.reports }
-		self.machine.set_break_callback(_on_break, streams)
-		self.machine.set_port_data(streams)
+		self.commands = worker.commands
+		self.reports = worker.reports
+		self.pause_flag = worker.pause_flag
 		self.checker = ui.bind_busy_wait(lambda: True, self.check)
+		self.fast_checker: Union[str, None] = None
+		if worker.check_delay_ms > 0: self.fast_checker = ui.window.after(worker.check_delay_ms, self.check_soon)
 		self.checking = False
 		self.debugging = False
 		self.hotpaths: dict[str, dict[int, float]] = {}
 		self.last_line: int = 0
+		self.last_counters: dict[str, Any] = {}
 	
 	def add_breakpoint(self, line: int) -> None:
 		if line in self.pending_deletions: self.pending_deletions.remove(line)
@@ -82,7 +43,87 @@ class Debugger:
 			try: result = self.reports.get(timeout=1)
 			except: pass
 		return result
+
+	def read_memory_range(self, address: int, count: int) -> "list[int]":
+		result: list[int] = [0] * count
+		if self.debugging:
+			self.commands.put(DEBUG_QUERY_MEMORY_RANGE)
+			self.commands.put((address, count))
+			try: result = list(self.reports.get(timeout=1))
+			except: pass
+		return result
+
+	def read_hotpaths(self) -> "dict[str, dict[int, float]]":
+		if self.debugging:
+			self.commands.put(DEBUG_QUERY_HOTPATHS)
+			try: self.hotpaths = self.reports.get(timeout=1)
+			except: pass
+		return self.hotpaths
+
+	def read_instruction_profile(self) -> "dict[str, Any]":
+		result: dict[str, Any] = {}
+		if self.debugging:
+			self.commands.put(DEBUG_QUERY_PROFILE)
+			try: result = self.reports.get(timeout=1)
+			except: pass
+		return result
+
+	def read_call_profile(self) -> "dict[str, Any]":
+		result: dict[str, Any] = { "source": "", "nodes": [], "names": {}, "lines": {} }
+		if self.debugging:
+			self.commands.put(DEBUG_QUERY_CALL_PROFILE)
+			try: result = self.reports.get(timeout=1)
+			except: pass
+		return result
+
+	def read_coverage(self) -> "dict[int, Tuple[int, int]]":
+		result: dict[int, Tuple[int, int]] = {}
+		if self.debugging:
+			self.commands.put(DEBUG_QUERY_COVERAGE)
+			try: result = self.reports.get(timeout=1)
+			except: pass
+		return result
+
+	def save_state(self, path: str) -> str:
+		result = "The debugger is not paused."
+		if self.debugging:
+			self.commands.put(DEBUG_SAVE_STATE)
+			self.commands.put(path)
+			try: result = self.reports.get(timeout=10)
+			except: result = "The debugger did not respond."
+		return result
+
+	def refresh_hotpaths(self) -> None:
+		ui.performance_tab.set_show_callback(lambda name: ui.text_editor.set_hotpath(self.hotpaths.get(name, {})))
+		ui.performance_tab.set_functions(sorted(self.read_hotpaths().keys()))
+		profile = self.read_call_profile()
+		summary = CallSummary(profile)
+		ui.performance_tab.set_call_table([(summary.get_name(address), summary.inclusive_counts.get(address, 0), summary.exclusive_counts[address], summary.call_counts[address]) for address in summary.exclusive_counts])
+		ui.performance_tab.set_flame_graph([(parent, summary.get_name(address), count) for parent, address, site, count, calls in summary.nodes])
 	
+	def show_counters(self, counters: "dict[str, Any]") -> None:
+		last_time = self.last_counters.get(FIELD_TIME, counters[FIELD_TIME])
+		elapsed = counters[FIELD_TIME] - last_time
+		rate = (counters["retired"] - self.last_counters.get("retired", 0)) / elapsed if elapsed > 0 else 0
+		self.last_counters = counters
+		if not ui.performance_tab.is_shown(): return
+		rows = {
+			"Instructions": f"{counters['retired']:,}",
+			"Instructions/s": f"{rate:,.0f}",
+			"Memory blocks": str(counters["memory_blocks"]),
+			"Port reads": f"{counters['port_reads']:,}",
+			"Port writes": f"{counters['port_writes']:,}",
+			"Call depth": str(counters["call_depth"])
+		}
+		hot_addresses = counters["hot_addresses"]
+		for index in range(5):
+			if index < len(hot_addresses):
+				address, share = hot_addresses[index]
+				line = getattr(self.machine.get_instruction(address).source, "line_index", -1) + 1
+				rows[f"Hot #{index + 1}"] = f"{self.machine.get_address_name(address)} (ln {line}) {share:.0%}"
+			else: rows[f"Hot #{index + 1}"] = "-"
+		ui.performance_tab.set_counters(rows)
+
 	def send_console(self, text: str) -> None:
 		self.commands.put(IO)
 		self.commands.put(text)
@@ -90,6 +131,9 @@ class Debugger:
 	def resume(self) -> None:
 		if self.debugging: self.commands.put(DEBUG_CONTINUE)
 
+	def pause(self) -> None:
+		if not self.debugging: self.pause_flag.value = 1
+
 	def step(self) -> None:
 		if self.debugging: self.commands.put(DEBUG_STEP_INTO)
 	
@@ -99,20 +143,58 @@ class Debugger:
 	def step_out(self) -> None:
 		if self.debugging: self.commands.put(DEBUG_STEP_OUT)
 
+	def step_count(self, count: int) -> None:
+		if self.debugging:
+			self.commands.put(DEBUG_STEP_COUNT)
+			self.commands.put(count)
+
+	def run_to_address(self, address: int) -> None:
+		if self.debugging:
+			self.commands.put(DEBUG_RUN_TO_ADDRESS)
+			self.commands.put(address)
+
+	def run_to_line(self, line: int) -> None:
+		for address in range(len(self.machine.rom)):
+			source = self.machine.rom[address].source
+			if source != None and getattr(source, "line_index", -1) + 1 >= line:
+				self.run_to_address(address)
+				return
+
+	def step_back(self) -> None:
+		if self.debugging: self.commands.put(DEBUG_STEP_BACK)
+
+	def reverse_continue(self) -> None:
+		if self.debugging: self.commands.put(DEBUG_REVERSE_CONTINUE)
+
+	def run_to_register(self, name: str, comparison: str, value: int) -> None:
+		if self.debugging:
+			self.commands.put(DEBUG_RUN_TO_REGISTER)
+			self.commands.put((name, comparison, value))
+
+	def run_to_memory_write(self, address: int) -> None:
+		if self.debugging:
+			self.commands.put(DEBUG_RUN_TO_MEMORY_WRITE)
+			self.commands.put(address)
+
 	def start(self) -> None:
-		self.process.start()
-		try: self.on_start.get(timeout=10)
-		except: pass
+		self.worker.load(self.options)
 
 	def terminate(self) -> None:
-		self.process.terminate()
+		if not self.worker.stop(): self.worker.terminate()
+		if self.fast_checker != None: ui.window.after_cancel(self.fast_checker)
+		self.fast_checker = None
 		ui.unbind_busy_wait(self.checker)
 		self.checker = -1
 
+	def check_soon(self) -> None:
+		self.fast_checker = None
+		self.check()
+		if self.checker >= 0: self.fast_checker = ui.window.after(self.worker.check_delay_ms, self.check_soon)
+
 	def check(self) -> None:
 		if self.checking: return
 		self.checking = True
-		if not self.process.is_alive():
+		if not self.worker.is_alive():
 			stop()
 			return
 		try:
@@ -133,69 +215,69 @@ class Debugger:
 				if report == DEBUG_OPEN:
 					status: dict[str, Any] = self.reports.get(timeout=1)
 					self.last_line = int(status.get(FIELD_LINE, 0))
-					self.hotpaths = status.get(FIELD_HOTPATH, {})
-					variables = status.get(FIELD_REGISTERS, {})
-					stack = status.get(FIELD_STACK, [])
-					calls = status.get(FIELD_CALLS, [])
+					variables: dict[str, int] = status.get(FIELD_REGISTERS, {})
+					stack_length, stack_changes = status.get(FIELD_STACK, (0, {}))
+					calls_popped, calls_pushed = status.get(FIELD_CALLS, (0, []))
 					format_hex = lambda value: f"0x{hex(value).lstrip('0x').upper().rjust(int(self.machine.integer_bits / 4), '0')}"
 					self.debugging = True
 					set_state_debug()
 					ui.text_editor.set_location(self.last_line)
-					ui.variables_tab.set_variables(variables, int_format=lambda value: (format_hex(value), "number"))
-					ui.stack_tab.set_stack(stack, address_format=format_hex, value_format=format_hex)
-					ui.calls_tab.set_calls(calls, address_format=format_hex)
+					ui.variables_tab.update_variables(variables, int_format=lambda value: (format_hex(value), "number"))
+					ui.stack_tab.update_stack(stack_length, stack_changes, address_format=format_hex, value_format=format_hex)
+					ui.calls_tab.update_calls(calls_popped, calls_pushed, address_format=format_hex)
 					ui.memory_tab.set_address_format(format_hex)
 					ui.memory_tab.set_value_format(format_hex)
+					ui.memory_tab.set_address_limit(self.machine.integer_mask + 1)
 					ui.memory_tab.refresh_memory()
-					ui.performance_tab.set_show_callback(lambda name: ui.text_editor.set_hotpath(self.hotpaths[name]))
-					ui.performance_tab.set_functions(self.hotpaths.keys())
+					if ui.performance_tab.is_shown(): self.refresh_hotpaths()
+					if self.options.coverage: show_coverage(self.read_coverage())
 				elif report == DEBUG_CLOSE:
 					self.debugging = False
 					ui.text_editor.clear_location()
-					ui.variables_tab.clear_variables()
-					ui.stack_tab.clear_stack()
-					ui.calls_tab.clear_calls()
 					set_state_running()
+				elif report == DEBUG_COUNTERS:
+					self.show_counters(self.reports.get(timeout=1))
 				elif report == IO:
 					ui.console.write(self.reports.get(timeout=1))
+				elif report == DEBUG_QUERY_COVERAGE:
+					show_coverage(self.reports.get(timeout=1))
+				elif report == DEBUG_FINISHED:
+					self.worker.busy = False
+					stop()
+					return
 		except: pass
 		self.checking = False
 
-class DebuggerTextPort(IPort):
-	def __init__(self) -> None:
-		self.buffer = []
-
-	def read(self, machine: URCLEmulator) -> int:
-		data = machine.get_port_data()
-		commands: Queue = data[STREAM_COMMANDS]
-
-		while len(self.buffer) == 0:
-			op: str = ""
-			while op != IO:
-				op = commands.get()
-				if op == IO:
-					for c in commands.get():
-						try: self.buffer.append(ord(c))
-						except: self.buffer.append(0)
-		
-		return self.buffer.pop(0)
-	
-	def write(self, machine: URCLEmulator, value: int) -> None:
-		data = machine.get_port_data()
-		reports: Queue = data[STREAM_REPORTS]
-		reports.put(IO)
-		reports.put(chr(value))
-
+optimize_programs: bool = False
+profile_instructions: bool = False
+record_history: bool = False
+collect_coverage: bool = False
+trace_path: Union[str, None] = None
+debugger_backend: str = BACKEND_PROCESS
 breakpoints: "list[int]" = []
 debugger: Union[Debugger, None] = None
+workers: "dict[str, DebuggerWorker]" = {}
 run_action: int = -1
+replay_action: int = -1
+coverage_action: int = -1
+resume_snapshot_action: int = -1
+save_snapshot_action: int = -1
 stop_action: int = -1
 continue_action: int = -1
+pause_action: int = -1
 step_action: int = -1
 step_over_action: int = -1
 step_out_action: int = -1
+run_to_cursor_action: int = -1
+step_back_action: int = -1
+reverse_continue_action: int = -1
+export_profile_action: int = -1
+optimize_action: int = -1
+profile_action: int = -1
+record_action: int = -1
+trace_action: int = -1
 
-def compile_emulator(source: str) -> Union[URCLEmulator, None]:
+def compile_emulator(source: str, report: bool = False) -> Union[URCLEmulator, None]:
 	ui.console.clear()
 
 	parsed = parse_source(source)
@@ -208,13 +290,27 @@ def compile_emulator(source: str) -> Union[URCLEmulator, None]:
 			ui.console.write(f"Error (ln {line}): {error}\n")
 		return None
 
-	result = URCLEmulator()
-	result.add_port("TEXT", DebuggerTextPort())
-	result.add_port("RAND", RandomPort())
-	result.load_program_rom(parsed.program)
-	for name in parsed.labels: result.add_label(parsed.labels[name], name)
+	result, removed = create_emulator(parsed, optimize_programs)
+	if optimize_programs and report: ui.console.write(f"Optimizer removed {removed} instruction(s).\n")
+	return result
+
+def create_run_options(source: str) -> RunOptions:
+	result = RunOptions(source)
+	result.trace_path = trace_path
+	result.optimize = optimize_programs
+	result.profile = profile_instructions
+	result.record = record_history
+	result.coverage = collect_coverage
+	result.breakpoints = list(breakpoints)
 	return result
 
+def get_worker(backend: str) -> DebuggerWorker:
+	worker = workers.get(backend)
+	if worker == None or not worker.is_alive():
+		worker = create_worker(backend)
+		workers[backend] = worker
+	return worker
+
 def on_console_send() -> None:
 	if debugger != None: debugger.send_console(ui.console.read())
 
@@ -226,13 +322,51 @@ def on_breakpoint_removed(line: int) -> None:
 	while line in breakpoints: breakpoints.remove(line)
 	if debugger != None: debugger.remove_breakpoint(line)
 
-def run() -> None:
-	global debugger
-	machine = compile_emulator(ui.text_editor.get_text())
+def run(state_path: Union[str, None] = None, replay_path: Union[str, None] = None, backend: Union[str, None] = None, coverage: bool = False) -> None:
+	source = ui.text_editor.get_text()
+	machine = compile_emulator(source, True)
 	if machine == None: return
-	for breakpoint in breakpoints: machine.set_breakpoint(breakpoint)
+	options = create_run_options(source)
+	options.state_path = state_path
+	options.replay_path = replay_path
+	options.coverage = options.coverage or coverage
+	start_debugger(machine, options, debugger_backend if backend == None else backend)
+
+def replay() -> None:
+	file = tkfd.askopenfilename(filetypes=[("Execution trace", "*.trace"), ("All files", "*.*")])
+	if file != "": run(replay_path=file)
+
+def run_from_snapshot() -> None:
+	file = tkfd.askopenfilename(filetypes=[("Machine snapshot", "*.state"), ("All files", "*.*")])
+	if file != "": run(file)
+
+def save_snapshot() -> None:
+	if debugger == None or not debugger.debugging: return
+	file = tkfd.asksaveasfilename(defaultextension=".state", filetypes=[("Machine snapshot", "*.state")])
+	if file == "": return
+	error = debugger.save_state(file)
+	if error != "": ui.console.write(f"{error}\n")
+
+def show_coverage(coverage: "dict[int, Tuple[int, int]]") -> None:
+	ui.line_info.clear_lines()
+	for line in coverage:
+		hit, total = coverage[line]
+		if hit == 0: ui.line_info.set_line(line, "○", "error")
+		elif hit < total: ui.line_info.set_line(line, "◐", "warning")
+		else: ui.line_info.set_line(line, "●", "success")
+	ui.line_info.set_width(1)
+	ui.line_info.show()
+
+def hide_coverage() -> None:
+	ui.line_info.clear_lines()
+	ui.line_info.hide()
+
+def start_debugger(machine: URCLEmulator, options: RunOptions, backend: str = BACKEND_PROCESS) -> None:
+	global debugger
 	if debugger != None: debugger.terminate()
-	debugger = Debugger(machine)
+	clear_debug_views()
+	hide_coverage()
+	debugger = Debugger(machine, get_worker(backend), options)
 	set_state_running()
 	debugger.start()
 
@@ -240,37 +374,112 @@ def stop() -> None:
 	global debugger
 	if debugger != None: debugger.terminate()
 	debugger = None
+	clear_debug_views()
 	set_state_editing()
+	get_worker(debugger_backend)
+
+def export_profile() -> None:
+	if debugger == None or not debugger.debugging: return
+	file = tkfd.asksaveasfilename(defaultextension=".json", filetypes=[("Instruction histogram", "*.json"), ("Speedscope", "*.speedscope.json"), ("Callgrind", "callgrind.out.*"), ("pstats", "*.prof")])
+	if file == "": return
+	name = os.path.basename(file)
+	if name.endswith(".speedscope.json"): export_speedscope(debugger.read_call_profile(), file)
+	elif name.startswith("callgrind.out"): export_callgrind(debugger.read_call_profile(), file)
+	elif name.endswith(".prof"): export_pstats(debugger.read_call_profile(), file)
+	else: export_instruction_profile(debugger.read_instruction_profile(), file)
+
+def show_option(action: int, enabled: bool) -> None:
+	ui.action_bar.set_action_color(action, "#89D185" if enabled else "#858585")
+
+def toggle_optimizer() -> None:
+	global optimize_programs
+	optimize_programs = not optimize_programs
+	show_option(optimize_action, optimize_programs)
+
+def toggle_profiler() -> None:
+	global profile_instructions
+	profile_instructions = not profile_instructions
+	show_option(profile_action, profile_instructions)
+
+def toggle_recording() -> None:
+	global record_history
+	record_history = not record_history
+	show_option(record_action, record_history)
+
+def toggle_trace() -> None:
+	global trace_path
+	if trace_path == None:
+		file = tkfd.asksaveasfilename(defaultextension=".trace", filetypes=[("Execution trace", "*.trace")])
+		if file == "": return
+		trace_path = file
+	else: trace_path = None
+	show_option(trace_action, trace_path != None)
+
+def clear_debug_views() -> None:
+	ui.text_editor.clear_location()
+	ui.variables_tab.clear_variables()
+	ui.stack_tab.clear_stack()
+	ui.calls_tab.clear_calls()
+	ui.performance_tab.clear_counters()
+	ui.performance_tab.clear_profile()
 
 def lint() -> None:
 	compile_emulator(ui.text_editor.get_text())
 
 def set_state_editing() -> None:
 	ui.action_bar.enable_action(run_action)
+	ui.action_bar.enable_action(replay_action)
+	ui.action_bar.enable_action(coverage_action)
+	ui.action_bar.enable_action(resume_snapshot_action)
 	ui.action_bar.disable_action(stop_action)
 	ui.action_bar.disable_action(continue_action)
+	ui.action_bar.disable_action(pause_action)
 	ui.action_bar.disable_action(step_action)
 	ui.action_bar.disable_action(step_over_action)
 	ui.action_bar.disable_action(step_out_action)
+	ui.action_bar.disable_action(run_to_cursor_action)
+	ui.action_bar.disable_action(step_back_action)
+	ui.action_bar.disable_action(reverse_continue_action)
+	ui.action_bar.disable_action(export_profile_action)
+	ui.action_bar.disable_action(save_snapshot_action)
 	ui.memory_tab.clear_memory()
 	ui.text_editor.highlight()
 
 def set_state_running() -> None:
 	ui.action_bar.disable_action(run_action)
+	ui.action_bar.disable_action(replay_action)
+	ui.action_bar.disable_action(coverage_action)
+	ui.action_bar.disable_action(resume_snapshot_action)
 	ui.action_bar.enable_action(stop_action)
 	ui.action_bar.disable_action(continue_action)
+	ui.action_bar.enable_action(pause_action)
 	ui.action_bar.disable_action(step_action)
 	ui.action_bar.disable_action(step_over_action)
 	ui.action_bar.disable_action(step_out_action)
+	ui.action_bar.disable_action(run_to_cursor_action)
+	ui.action_bar.disable_action(step_back_action)
+	ui.action_bar.disable_action(reverse_continue_action)
+	ui.action_bar.disable_action(export_profile_action)
+	ui.action_bar.disable_action(save_snapshot_action)
 	ui.text_editor.highlight()
 
 def set_state_debug() -> None:
 	ui.action_bar.disable_action(run_action)
+	ui.action_bar.disable_action(replay_action)
+	ui.action_bar.disable_action(coverage_action)
+	ui.action_bar.disable_action(resume_snapshot_action)
 	ui.action_bar.enable_action(stop_action)
 	ui.action_bar.enable_action(continue_action)
+	ui.action_bar.disable_action(pause_action)
 	ui.action_bar.enable_action(step_action)
 	ui.action_bar.enable_action(step_over_action)
 	ui.action_bar.enable_action(step_out_action)
+	ui.action_bar.enable_action(run_to_cursor_action)
+	if debugger != None and debugger.recording:
+		ui.action_bar.enable_action(step_back_action)
+		ui.action_bar.enable_action(reverse_continue_action)
+	ui.action_bar.enable_action(export_profile_action)
+	ui.action_bar.enable_action(save_snapshot_action)
 
 if os.name == "nt":
 	ui.window.iconbitmap(os.path.abspath(os.path.join(os.path.dirname(__file__), "./urcl.ico")))
@@ -290,10 +499,30 @@ ui.text_editor.highlight_event.bind(lint)
 ui.breakpoint_added_bind.bind(on_breakpoint_added)
 ui.breakpoint_removed_bind.bind(on_breakpoint_removed)
 ui.memory_tab.set_request_callback(lambda address: 0 if debugger == None else debugger.read_memory(address))
+ui.performance_tab.shown_bind.bind(lambda: debugger.refresh_hotpaths() if debugger != None and debugger.debugging else None)
+ui.memory_tab.set_range_request_callback(lambda address, count: [0] * count if debugger == None else debugger.read_memory_range(address, count))
 run_action = ui.action_bar.add_action(load_icon("\uEB91", "Debug"), run, color="#89D185", font=get_icon_font())
+replay_action = ui.action_bar.add_action(load_icon("\uEA82", "Replay Trace"), replay, color="#89D185", font=get_icon_font())
+coverage_action = ui.action_bar.add_action(load_icon("\uEBDD", "Debug with Coverage"), lambda: run(coverage=True), color="#89D185", font=get_icon_font())
+resume_snapshot_action = ui.action_bar.add_action(load_icon("\uEAD2", "Run from Snapshot"), run_from_snapshot, color="#89D185", font=get_icon_font())
 stop_action = ui.action_bar.add_action(load_icon("\uEAD7", "Stop"), stop, color="#F48771", font=get_icon_font())
 continue_action = ui.action_bar.add_action(load_icon("\uEACF", "Resume"), lambda: debugger.resume() if debugger != None else None, color="#75BEFF", font=get_icon_font())
+pause_action = ui.action_bar.add_action(load_icon("\uEAD1", "Pause"), lambda: debugger.pause() if debugger != None else None, color="#75BEFF", font=get_icon_font())
 step_over_action = ui.action_bar.add_action(load_icon("\uEAD6", "Step Over"), lambda: debugger.step_over() if debugger != None else None, color="#75BEFF", font=get_icon_font())
 step_action = ui.action_bar.add_action(load_icon("\uEAD4", "Step Into"), lambda: debugger.step() if debugger != None else None, color="#75BEFF", font=get_icon_font())
 step_out_action = ui.action_bar.add_action(load_icon("\uEAD5", "Step Out"), lambda: debugger.step_out() if debugger != None else None, color="#75BEFF", font=get_icon_font())
-set_state_editing()
\ No newline at end of file
+run_to_cursor_action = ui.action_bar.add_action(load_icon("\uEBF8", "Run to Cursor"), lambda: debugger.run_to_line(int(ui.text_editor.index("insert").split(".")[0])) if debugger != None else None, color="#75BEFF", font=get_icon_font())
+step_back_action = ui.action_bar.add_action(load_icon("\uEB8F", "Step Back"), lambda: debugger.step_back() if debugger != None else None, color="#75BEFF", font=get_icon_font())
+reverse_continue_action = ui.action_bar.add_action(load_icon("\uEB8E", "Reverse Continue"), lambda: debugger.reverse_continue() if debugger != None else None, color="#75BEFF", font=get_icon_font())
+export_profile_action = ui.action_bar.add_action(load_icon("\uEBAC", "Export Profile"), export_profile, color="#75BEFF", font=get_icon_font())
+save_snapshot_action = ui.action_bar.add_action(load_icon("\uEB4A", "Save Snapshot"), save_snapshot, color="#75BEFF", font=get_icon_font())
+optimize_action = ui.action_bar.add_action(load_icon("\uEB44", "Optimize"), toggle_optimizer, font=get_icon_font())
+show_option(optimize_action, optimize_programs)
+profile_action = ui.action_bar.add_action(load_icon("\uEACD", "Profile Instructions"), toggle_profiler, font=get_icon_font())
+show_option(profile_action, profile_instructions)
+record_action = ui.action_bar.add_action(load_icon("\uEBA7", "Record History"), toggle_recording, font=get_icon_font())
+show_option(record_action, record_history)
+trace_action = ui.action_bar.add_action(load_icon("\uEAE8", "Record Trace"), toggle_trace, font=get_icon_font())
+show_option(trace_action, trace_path != None)
+set_state_editing()
+get_worker(debugger_backend)
\ No newline at end of file
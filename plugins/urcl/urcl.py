@@ -4,6 +4,7 @@ from typing import Union
 class IMachine:
 	def read_register(self, index: int) -> int: ...
 	def write_register(self, index: int, value: int) -> None: ...
+	def write_register_unmasked(self, index: int, value: int) -> None: ...
 	def get_special_register_id(self, name: str) -> int: ...
 	def read_special_register(self, id: int) -> int: ...
 	def write_special_register(self, id: int, value: int) -> None: ...
@@ -13,6 +14,7 @@ class IMachine:
 	def read_port(self, id: int) -> int: ...
 	def write_port(self, id: int, value: int) -> None: ...
 	def get_sign_bit_mask(self) -> int: ...
+	def get_carry_bit_mask(self) -> int: ...
 	def get_bit_mask(self) -> int: ...
 	def set_bit_mask(self, value: int) -> None: ...
 	def halt(self) -> None: ...
@@ -26,6 +28,7 @@ class IOperand:
 	def compile(self, machine: IMachine) -> None: return
 	def load(self, machine: IMachine) -> int: ...
 	def store(self, machine: IMachine, value: int) -> None: raise Exception("Operand type does not allow for a store operation.")
+	def store_unmasked(self, machine: IMachine, value: int) -> None: self.store(machine, value)
 
 class IRegister(IOperand):
 	def __init__(self, source) -> None: super().__init__(source)
@@ -34,8 +37,16 @@ class Register(IRegister):
 	def __init__(self, index: int, source = None) -> None:
 		super().__init__(source)
 		self.index = index
+	def compile(self, machine: IMachine) -> None:
+		if self.index == 0:
+			self.load = self.load_zero
+			self.store = self.store_none
+			self.store_unmasked = self.store_none
 	def load(self, machine: IMachine) -> int: return machine.read_register(self.index)
+	def load_zero(self, machine: IMachine) -> int: return 0
 	def store(self, machine: IMachine, value: int) -> None: return machine.write_register(self.index, value)
+	def store_unmasked(self, machine: IMachine, value: int) -> None: return machine.write_register_unmasked(self.index, value)
+	def store_none(self, machine: IMachine, value: int) -> None: return
 	def __str__(self) -> str: return f"R{self.index}"
 
 class SpecialRegister(IRegister):
@@ -79,6 +90,8 @@ class IInstruction:
 		self.b = b
 		self.c = c
 		self.source = source
+	def get_operands(self) -> "list[IOperand]":
+		return [operand for operand in [self.a, self.b, self.c] if operand != None]
 	def add_offset(self, offset: int) -> None:
 		if self.a != None: self.a.add_offset(offset)
 		if self.b != None: self.b.add_offset(offset)
@@ -109,7 +122,7 @@ class IBranchInstruction(IInstruction):
 
 class LOD(IInstruction):
 	def __init__(self, a: IRegister, b: IOperand, source = None) -> None: super().__init__(a, b, source=source)
-	def execute(self, machine: IMachine) -> None: self.a.store(machine, machine.read_memory(self.b.load(machine)))
+	def execute(self, machine: IMachine) -> None: self.a.store_unmasked(machine, machine.read_memory(self.b.load(machine)))
 
 class STR(IInstruction):
 	def __init__(self, a: IOperand, b: IOperand, source = None) -> None: super().__init__(a, b, source=source)
@@ -133,19 +146,19 @@ class MLT(IInstruction):
 
 class DIV(IInstruction):
 	def __init__(self, a: IRegister, b: IOperand, c: IOperand, source = None) -> None: super().__init__(a, b, c, source=source)
-	def execute(self, machine: IMachine) -> None: self.a.store(machine, self.b.load(machine) / self.c.load(machine))
+	def execute(self, machine: IMachine) -> None: self.a.store_unmasked(machine, self.b.load(machine) // self.c.load(machine))
 
 class MOD(IInstruction):
 	def __init__(self, a: IRegister, b: IOperand, c: IOperand, source = None) -> None: super().__init__(a, b, c, source=source)
-	def execute(self, machine: IMachine) -> None: self.a.store(machine, self.b.load(machine) % self.c.load(machine))
+	def execute(self, machine: IMachine) -> None: self.a.store_unmasked(machine, self.b.load(machine) % self.c.load(machine))
 
 class RSH(IInstruction):
 	def __init__(self, a: IRegister, b: IOperand, source = None) -> None: super().__init__(a, b, source=source)
-	def execute(self, machine: IMachine) -> None: self.a.store(machine, self.b.load(machine) >> 1)
+	def execute(self, machine: IMachine) -> None: self.a.store_unmasked(machine, self.b.load(machine) >> 1)
 
 class BSR(IInstruction):
 	def __init__(self, a: IRegister, b: IOperand, c: IOperand, source = None) -> None: super().__init__(a, b, c, source=source)
-	def execute(self, machine: IMachine) -> None: self.a.store(machine, self.b.load(machine) >> self.c.load(machine))
+	def execute(self, machine: IMachine) -> None: self.a.store_unmasked(machine, self.b.load(machine) >> self.c.load(machine))
 
 class LSH(IInstruction):
 	def __init__(self, a: IRegister, b: IOperand, source = None) -> None: super().__init__(a, b, source=source)
@@ -157,31 +170,43 @@ class BSL(IInstruction):
 
 class OR(IInstruction):
 	def __init__(self, a: IRegister, b: IOperand, c: IOperand, source = None) -> None: super().__init__(a, b, c, source=source)
-	def execute(self, machine: IMachine) -> None: self.a.store(machine, self.b.load(machine) | self.c.load(machine))
+	def execute(self, machine: IMachine) -> None: self.a.store_unmasked(machine, self.b.load(machine) | self.c.load(machine))
 
 class AND(IInstruction):
 	def __init__(self, a: IRegister, b: IOperand, c: IOperand, source = None) -> None: super().__init__(a, b, c, source=source)
-	def execute(self, machine: IMachine) -> None: self.a.store(machine, self.b.load(machine) & self.c.load(machine))
+	def execute(self, machine: IMachine) -> None: self.a.store_unmasked(machine, self.b.load(machine) & self.c.load(machine))
 
 class XOR(IInstruction):
 	def __init__(self, a: IRegister, b: IOperand, c: IOperand, source = None) -> None: super().__init__(a, b, c, source=source)
-	def execute(self, machine: IMachine) -> None: self.a.store(machine, self.b.load(machine) ^ self.c.load(machine))
+	def execute(self, machine: IMachine) -> None: self.a.store_unmasked(machine, self.b.load(machine) ^ self.c.load(machine))
 
 class NOR(IInstruction):
 	def __init__(self, a: IRegister, b: IOperand, c: IOperand, source = None) -> None: super().__init__(a, b, c, source=source)
-	def execute(self, machine: IMachine) -> None: self.a.store(machine, ~(self.b.load(machine) | self.c.load(machine)))
+	def compile(self, machine: IMachine) -> None:
+		super().compile(machine)
+		self.mask = machine.get_bit_mask()
+	def execute(self, machine: IMachine) -> None: self.a.store_unmasked(machine, (self.b.load(machine) | self.c.load(machine)) ^ self.mask)
 
 class NAND(IInstruction):
 	def __init__(self, a: IRegister, b: IOperand, c: IOperand, source = None) -> None: super().__init__(a, b, c, source=source)
-	def execute(self, machine: IMachine) -> None: self.a.store(machine, ~(self.b.load(machine) & self.c.load(machine)))
+	def compile(self, machine: IMachine) -> None:
+		super().compile(machine)
+		self.mask = machine.get_bit_mask()
+	def execute(self, machine: IMachine) -> None: self.a.store_unmasked(machine, (self.b.load(machine) & self.c.load(machine)) ^ self.mask)
 
 class XNOR(IInstruction):
 	def __init__(self, a: IRegister, b: IOperand, c: IOperand, source = None) -> None: super().__init__(a, b, c, source=source)
-	def execute(self, machine: IMachine) -> None: self.a.store(machine, ~(self.b.load(machine) ^ self.c.load(machine)))
+	def compile(self, machine: IMachine) -> None:
+		super().compile(machine)
+		self.mask = machine.get_bit_mask()
+	def execute(self, machine: IMachine) -> None: self.a.store_unmasked(machine, (self.b.load(machine) ^ self.c.load(machine)) ^ self.mask)
 
 class NOT(IInstruction):
 	def __init__(self, a: IRegister, b: IOperand, source = None) -> None: super().__init__(a, b, source=source)
-	def execute(self, machine: IMachine) -> None: self.a.store(machine, ~self.b.load(machine))
+	def compile(self, machine: IMachine) -> None:
+		super().compile(machine)
+		self.mask = machine.get_bit_mask()
+	def execute(self, machine: IMachine) -> None: self.a.store_unmasked(machine, self.b.load(machine) ^ self.mask)
 
 class NEG(IInstruction):
 	def __init__(self, a: IRegister, b: IOperand, source = None) -> None: super().__init__(a, b, source=source)
@@ -197,11 +222,11 @@ class DEC(IInstruction):
 
 class MOV(IInstruction):
 	def __init__(self, a: IRegister, b: IRegister, source = None) -> None: super().__init__(a, b, source=source)
-	def execute(self, machine: IMachine) -> None: self.a.store(machine, self.b.load(machine))
+	def execute(self, machine: IMachine) -> None: self.a.store_unmasked(machine, self.b.load(machine))
 
 class IMM(IInstruction):
 	def __init__(self, a: IRegister, b: Immediate, source = None) -> None: super().__init__(a, b, source=source)
-	def execute(self, machine: IMachine) -> None: self.a.store(machine, self.b.load(machine))
+	def execute(self, machine: IMachine) -> None: self.a.store_unmasked(machine, self.b.load(machine))
 
 class NOP(IInstruction):
 	def __init__(self, source = None) -> None: super().__init__(source=source)
@@ -258,8 +283,14 @@ class BRC(IBranchInstruction):
 	def compile(self, machine: IMachine) -> None:
 		super().compile(machine)
 		self.int_max = machine.get_bit_mask()
+		if isinstance(self.c, Immediate):
+			self.limit = self.int_max - self.c.value
+			self.execute = self.execute_immediate
 	def execute(self, machine: IMachine) -> None:
-		if (self.b.load(machine) > (self.int_max - self.c.load(machine))):
+		if (self.b.load(machine) + self.c.load(machine)) > self.int_max:
+			machine.write_special_register(self.pc, self.a.load(machine) - 1)
+	def execute_immediate(self, machine: IMachine) -> None:
+		if self.b.load(machine) > self.limit:
 			machine.write_special_register(self.pc, self.a.load(machine) - 1)
 
 class BNC(IBranchInstruction):
@@ -267,8 +298,14 @@ class BNC(IBranchInstruction):
 	def compile(self, machine: IMachine) -> None:
 		super().compile(machine)
 		self.int_max = machine.get_bit_mask()
+		if isinstance(self.c, Immediate):
+			self.limit = self.int_max - self.c.value
+			self.execute = self.execute_immediate
 	def execute(self, machine: IMachine) -> None:
-		if (self.b.load(machine) <= (self.int_max - self.c.load(machine))):
+		if (self.b.load(machine) + self.c.load(machine)) <= self.int_max:
+			machine.write_special_register(self.pc, self.a.load(machine) - 1)
+	def execute_immediate(self, machine: IMachine) -> None:
+		if self.b.load(machine) <= self.limit:
 			machine.write_special_register(self.pc, self.a.load(machine) - 1)
 
 class BRE(IBranchInstruction):
@@ -318,7 +355,7 @@ class POP(IStackInstruction):
 	def __init__(self, a: IRegister, source = None) -> None: super().__init__(a, source=source)
 	def execute(self, machine: IMachine) -> None:
 		sp = machine.read_special_register(self.sp)
-		self.a.store(machine, machine.read_memory(sp))
+		self.a.store_unmasked(machine, machine.read_memory(sp))
 		machine.write_special_register(self.sp, sp + 1)
 
 class CAL(IInstruction):
@@ -366,10 +403,7 @@ class HLT(IInstruction):
 
 class BITS(IInstruction):
 	def __init__(self, a: Immediate, source = None) -> None: super().__init__(a, source=source)
-	def compile(self, machine: IMachine) -> None:
-		mask: int = 0
-		for i in range(self.a.load(machine)): mask = (mask << 1) | 1
-		machine.set_bit_mask(mask)
+	def compile(self, machine: IMachine) -> None: machine.set_bit_mask((1 << self.a.load(machine)) - 1)
 
 def get_instructions() -> list:
 	result = []
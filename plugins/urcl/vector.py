@@ -0,0 +1,303 @@
+from collections import deque
+from typing import Callable, Tuple, Union
+from plugins.urcl.urcl import BITS, BREAK, CAL, CPY, DIV, HLT, IN, JMP, LOD, NOP, OUT, POP, PSH, RET, STR, IInstruction, IOperand, Immediate, Label, Port, Register, SpecialRegister
+
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+_operations: "dict[str, Callable]" = {
+	"ADD": lambda b, c, mask: b + c,
+	"SUB": lambda b, c, mask: b - c,
+	"MLT": lambda b, c, mask: b * c,
+	"OR": lambda b, c, mask: b | c,
+	"AND": lambda b, c, mask: b & c,
+	"XOR": lambda b, c, mask: b ^ c,
+	"NOR": lambda b, c, mask: (b | c) ^ mask,
+	"NAND": lambda b, c, mask: (b & c) ^ mask,
+	"XNOR": lambda b, c, mask: (b ^ c) ^ mask,
+	"NOT": lambda b, c, mask: b ^ mask,
+	"NEG": lambda b, c, mask: (b ^ mask) + 1,
+	"INC": lambda b, c, mask: b + 1,
+	"DEC": lambda b, c, mask: b - 1,
+	"RSH": lambda b, c, mask: b >> 1,
+	"LSH": lambda b, c, mask: b << 1,
+	"MOV": lambda b, c, mask: b,
+	"IMM": lambda b, c, mask: b
+}
+
+_conditions: "dict[str, Callable]" = {
+	"BRZ": lambda b, c, sign: b == 0,
+	"BNZ": lambda b, c, sign: b != 0,
+	"BEV": lambda b, c, sign: (b & 1) == 0,
+	"BOD": lambda b, c, sign: (b & 1) != 0,
+	"BRP": lambda b, c, sign: (b & sign) == 0,
+	"BRN": lambda b, c, sign: (b & sign) != 0,
+	"BRE": lambda b, c, sign: b == c,
+	"BNE": lambda b, c, sign: b != c,
+	"BRL": lambda b, c, sign: b < c,
+	"BRG": lambda b, c, sign: b > c,
+	"BLE": lambda b, c, sign: b <= c,
+	"BGE": lambda b, c, sign: b >= c
+}
+
+class VectorEmulator:
+	def __init__(self, lanes: int, integer_mask: int = 0xFFFFFFFFFFFFFFFF, memory_block_size: int = 0x1000) -> None:
+		if numpy == None: raise Exception("NumPy is required for vectorized execution.")
+		if lanes <= 0: raise Exception("Lane count must be greater than zero.")
+		if memory_block_size <= 0 or (memory_block_size & (memory_block_size - 1)) != 0: raise Exception("Memory block size must be a power of two.")
+		self.lanes = lanes
+		self.integer_mask = integer_mask
+		self.memory_block_size = memory_block_size
+		self.memory_blocks: dict[int, numpy.ndarray] = {}
+		self.rom: list[IInstruction] = []
+		self.handlers: list[Callable] = []
+		self.inputs: dict[str, list[deque]] = {}
+		self.outputs: dict[str, list[list[int]]] = {}
+		self.errors: dict[int, str] = {}
+		self.random = numpy.random.default_rng()
+		self.all_lanes = numpy.arange(lanes)
+		self.register_count = 1
+		self.special_register_names: list[str] = ["PC", "SP"]
+		self.allocate()
+
+	def set_bit_mask(self, integer_mask: int) -> None:
+		if integer_mask <= 0: raise Exception("Integer mask must be greater than zero.")
+		self.integer_mask = integer_mask
+
+	def get_bit_mask(self) -> int: return self.integer_mask
+
+	def allocate(self) -> None:
+		bits = self.integer_mask.bit_length()
+		self.dtype = numpy.uint8 if bits <= 8 else numpy.uint16 if bits <= 16 else numpy.uint32 if bits <= 32 else numpy.uint64
+		if bits > 64: raise Exception("Vectorized execution supports at most 64 bits.")
+		self.width = numpy.dtype(self.dtype).itemsize * 8
+		self.mask = self.dtype(self.integer_mask)
+		self.sign = self.dtype((self.integer_mask + 1) >> 1)
+		self.memory_block_offset = self.dtype(min(self.memory_block_size, self.integer_mask + 1) - 1)
+		self.memory_block_shift = self.dtype(int(self.memory_block_offset).bit_length())
+		self.registers = numpy.zeros((self.register_count, self.lanes), dtype=self.dtype)
+		self.special_registers = numpy.zeros((len(self.special_register_names), self.lanes), dtype=self.dtype)
+		self.memory_blocks.clear()
+		self.halted = numpy.zeros(self.lanes, dtype=bool)
+		self.pc = self.special_registers[0]
+		self.sp = self.special_registers[1]
+		self.errors.clear()
+
+	def load_program_rom(self, program: "list[IInstruction]") -> None:
+		self.rom = program
+		for instruction in program:
+			if isinstance(instruction, BITS): self.set_bit_mask((1 << instruction.a.value) - 1)
+			for operand in instruction.get_operands():
+				if isinstance(operand, Register): self.register_count = max(self.register_count, operand.index + 1)
+				elif isinstance(operand, SpecialRegister) and not operand.name in self.special_register_names: self.special_register_names.append(operand.name)
+		self.allocate()
+		self.handlers = [self.compile(instruction) for instruction in program]
+
+	def set_input(self, name: str, lane: int, values: "list[int]") -> None:
+		self.get_input_buffers(name)[lane].extend(values)
+
+	def set_inputs(self, name: str, values: "list[list[int]]") -> None:
+		for lane in range(min(len(values), self.lanes)): self.set_input(name, lane, values[lane])
+
+	def get_output(self, name: str, lane: int) -> "list[int]":
+		return self.get_output_buffers(name)[lane]
+
+	def get_input_buffers(self, name: str) -> "list[deque]":
+		result = self.inputs.get(name)
+		if result == None:
+			result = [deque() for _ in range(self.lanes)]
+			self.inputs[name] = result
+		return result
+
+	def get_output_buffers(self, name: str) -> "list[list[int]]":
+		result = self.outputs.get(name)
+		if result == None:
+			result = [[] for _ in range(self.lanes)]
+			self.outputs[name] = result
+		return result
+
+	def read_register(self, index: int) -> "numpy.ndarray": return self.registers[index] if index < self.register_count else numpy.zeros(self.lanes, dtype=self.dtype)
+
+	def read_special_register(self, name: str) -> "numpy.ndarray": return self.special_registers[self.special_register_names.index(name)]
+
+	def read_memory(self, address: int) -> "numpy.ndarray":
+		address &= self.integer_mask
+		index = address >> int(self.memory_block_shift)
+		return self.memory_blocks[index][address & int(self.memory_block_offset)] if index in self.memory_blocks else numpy.zeros(self.lanes, dtype=self.dtype)
+
+	def get_memory_block(self, index: int) -> "numpy.ndarray":
+		if not index in self.memory_blocks: self.memory_blocks[index] = numpy.zeros((int(self.memory_block_offset) + 1, self.lanes), dtype=self.dtype)
+		return self.memory_blocks[index]
+
+	def get_block_groups(self, address, indices: "numpy.ndarray") -> "list[Tuple[int, Union[slice, numpy.ndarray]]]":
+		blocks = numpy.broadcast_to(address >> self.memory_block_shift, indices.shape)
+		if len(blocks) == 0: return []
+		elif (blocks == blocks[0]).all(): return [(int(blocks[0]), slice(None))]
+		return [(int(block), blocks == block) for block in numpy.unique(blocks)]
+
+	def get_registers(self, lane: int) -> "dict[str, int]":
+		result: "dict[str, int]" = {}
+		for i in range(1, self.register_count, 1): result[f"R{i}"] = int(self.registers[i, lane])
+		for i in range(len(self.special_register_names)): result[self.special_register_names[i]] = int(self.special_registers[i, lane])
+		return result
+
+	def is_halted(self) -> bool: return bool(self.halted.all())
+
+	def execute(self, max_steps: int = -1) -> int:
+		steps = 0
+		with numpy.errstate(all="ignore"):
+			while steps != max_steps and self.step(): steps += 1
+		return steps
+
+	def step(self) -> bool:
+		self.halted |= self.pc >= len(self.rom)
+		if self.halted.all(): return False
+		if not self.halted.any() and (self.pc == self.pc[0]).all():
+			self.handlers[int(self.pc[0])](slice(None))
+			return True
+		active = numpy.nonzero(~self.halted)[0]
+		pcs = self.pc[active]
+		for address in numpy.unique(pcs): self.handlers[int(address)](active[pcs == address])
+		return True
+
+	def halt(self, lanes: Union[slice, "numpy.ndarray"]) -> None:
+		self.halted[lanes] = True
+
+	def fault(self, lanes: "numpy.ndarray", message: str) -> None:
+		for lane in lanes: self.errors[int(lane)] = message
+		self.halted[lanes] = True
+
+	def get_lane_indices(self, lanes: Union[slice, "numpy.ndarray"]) -> "numpy.ndarray":
+		return self.all_lanes if isinstance(lanes, slice) else lanes
+
+	def compile(self, instruction: IInstruction) -> Callable:
+		name = instruction.__class__.__name__
+		a, b, c = instruction.a, instruction.b, instruction.c
+		if name in _operations:
+			operation = _operations[name]
+			def execute_operation(lanes) -> None:
+				self.store(a, lanes, operation(self.load(b, lanes), self.load(c, lanes) if c != None else None, self.mask))
+			return execute_operation
+		elif name in _conditions:
+			condition = _conditions[name]
+			def execute_branch(lanes) -> None:
+				taken = condition(self.load(b, lanes), self.load(c, lanes) if c != None else None, self.sign)
+				self.pc[lanes] = numpy.where(taken, self.load_target(a, lanes), (self.pc[lanes] + 1) & self.mask)
+			return execute_branch
+		elif name == "BRC" or name == "BNC":
+			def execute_carry(lanes) -> None:
+				value = self.load(b, lanes)
+				total = value + self.load(c, lanes)
+				carry = (total < value) | (total > self.mask)
+				self.pc[lanes] = numpy.where(carry if name == "BRC" else ~carry, self.load_target(a, lanes), (self.pc[lanes] + 1) & self.mask)
+			return execute_carry
+		elif name == "DIV" or name == "MOD": return lambda lanes: self.divide(instruction, lanes)
+		elif name == "BSL" or name == "BSR": return lambda lanes: self.shift(instruction, lanes)
+		elif isinstance(instruction, JMP):
+			def execute_jump(lanes) -> None: self.pc[lanes] = self.load_target(a, lanes)
+			return execute_jump
+		elif isinstance(instruction, LOD): return lambda lanes: self.store(a, lanes, self.read_memory_lanes(self.load(b, lanes), lanes))
+		elif isinstance(instruction, STR): return lambda lanes: self.advance(lanes, self.write_memory_lanes(self.load(a, lanes), lanes, self.load(b, lanes)))
+		elif isinstance(instruction, CPY): return lambda lanes: self.advance(lanes, self.write_memory_lanes(self.load(a, lanes), lanes, self.read_memory_lanes(self.load(b, lanes), lanes)))
+		elif isinstance(instruction, PSH): return lambda lanes: self.push(lanes, self.load(a, lanes), True)
+		elif isinstance(instruction, POP):
+			def execute_pop(lanes) -> None:
+				sp = self.sp[lanes]
+				value = self.read_memory_lanes(sp, lanes)
+				self.sp[lanes] = (sp + 1) & self.mask
+				self.store(a, lanes, value)
+			return execute_pop
+		elif isinstance(instruction, CAL):
+			def execute_call(lanes) -> None:
+				self.push(lanes, self.pc[lanes], False)
+				self.pc[lanes] = self.load_target(a, lanes)
+			return execute_call
+		elif isinstance(instruction, RET):
+			def execute_return(lanes) -> None:
+				sp = self.sp[lanes]
+				self.pc[lanes] = (self.read_memory_lanes(sp, lanes) + 1) & self.mask
+				self.sp[lanes] = (sp + 1) & self.mask
+			return execute_return
+		elif isinstance(instruction, IN): return lambda lanes: self.store(a, lanes, self.read_port(b.name, lanes))
+		elif isinstance(instruction, OUT): return lambda lanes: self.advance(lanes, self.write_port(a.name, lanes, self.load(b, lanes)))
+		elif isinstance(instruction, HLT): return self.halt
+		elif isinstance(instruction, NOP) or isinstance(instruction, BREAK) or isinstance(instruction, BITS): return self.advance
+		raise Exception(f"Instruction \"{name}\" cannot be vectorized.")
+
+	def advance(self, lanes: Union[slice, "numpy.ndarray"], _ = None) -> None:
+		self.pc[lanes] = (self.pc[lanes] + 1) & self.mask
+
+	def load(self, operand: IOperand, lanes: Union[slice, "numpy.ndarray"]):
+		if isinstance(operand, Register): return self.dtype(0) if operand.index == 0 else self.registers[operand.index, lanes]
+		elif isinstance(operand, Immediate): return self.dtype(operand.value & self.integer_mask)
+		elif isinstance(operand, Label): return self.dtype(operand.address & self.integer_mask)
+		elif isinstance(operand, SpecialRegister): return self.special_registers[self.special_register_names.index(operand.name), lanes]
+		elif isinstance(operand, Port): return self.read_port(operand.name, lanes)
+		raise Exception(f"Operand \"{operand}\" cannot be vectorized.")
+
+	def load_target(self, operand: IOperand, lanes: Union[slice, "numpy.ndarray"]):
+		return self.load(operand, lanes) & self.mask
+
+	def store(self, operand: IOperand, lanes: Union[slice, "numpy.ndarray"], value) -> None:
+		if isinstance(operand, Register):
+			if operand.index != 0: self.registers[operand.index, lanes] = value & self.mask
+		elif isinstance(operand, SpecialRegister):
+			if operand.name == "PC":
+				self.pc[lanes] = (value + 1) & self.mask
+				return
+			self.special_registers[self.special_register_names.index(operand.name), lanes] = value & self.mask
+		elif isinstance(operand, Port): self.write_port(operand.name, lanes, value)
+		else: raise Exception(f"Operand \"{operand}\" cannot be stored to.")
+		self.advance(lanes)
+
+	def divide(self, instruction: IInstruction, lanes: Union[slice, "numpy.ndarray"]) -> None:
+		b = self.load(instruction.b, lanes)
+		c = self.load(instruction.c, lanes)
+		zero = numpy.broadcast_to(c == 0, self.pc[lanes].shape)
+		if zero.any():
+			self.fault(self.get_lane_indices(lanes)[zero], "Division by zero.")
+			lanes = self.get_lane_indices(lanes)[~zero]
+			b = b if numpy.ndim(b) == 0 else b[~zero]
+			c = c if numpy.ndim(c) == 0 else c[~zero]
+			if len(lanes) == 0: return
+		self.store(instruction.a, lanes, b // c if isinstance(instruction, DIV) else b % c)
+
+	def shift(self, instruction: IInstruction, lanes: Union[slice, "numpy.ndarray"]) -> None:
+		b = self.load(instruction.b, lanes)
+		c = self.load(instruction.c, lanes)
+		amount = numpy.minimum(c, self.width - 1).astype(self.dtype)
+		value = (b << amount) if instruction.__class__.__name__ == "BSL" else (b >> amount)
+		self.store(instruction.a, lanes, numpy.where(c < self.width, value, 0).astype(self.dtype))
+
+	def push(self, lanes: Union[slice, "numpy.ndarray"], value, advance: bool) -> None:
+		sp = (self.sp[lanes] - 1) & self.mask
+		self.sp[lanes] = sp
+		self.write_memory_lanes(sp, lanes, value)
+		if advance: self.advance(lanes)
+
+	def read_memory_lanes(self, address, lanes: Union[slice, "numpy.ndarray"]):
+		indices = self.get_lane_indices(lanes)
+		offsets = numpy.broadcast_to(numpy.asarray(address & self.memory_block_offset, dtype=numpy.intp), indices.shape)
+		result = numpy.zeros(len(indices), dtype=self.dtype)
+		for block, selected in self.get_block_groups(address, indices):
+			if block in self.memory_blocks: result[selected] = self.memory_blocks[block][offsets[selected], indices[selected]]
+		return result
+
+	def write_memory_lanes(self, address, lanes: Union[slice, "numpy.ndarray"], value) -> None:
+		indices = self.get_lane_indices(lanes)
+		offsets = numpy.broadcast_to(numpy.asarray(address & self.memory_block_offset, dtype=numpy.intp), indices.shape)
+		values = numpy.broadcast_to(value & self.mask, indices.shape)
+		for block, selected in self.get_block_groups(address, indices): self.get_memory_block(block)[offsets[selected], indices[selected]] = values[selected]
+
+	def read_port(self, name: str, lanes: Union[slice, "numpy.ndarray"]) -> "numpy.ndarray":
+		indices = self.get_lane_indices(lanes)
+		if name == "RAND": return self.random.integers(0, self.integer_mask, size=len(indices), dtype=self.dtype, endpoint=True)
+		buffers = self.get_input_buffers(name)
+		return numpy.array([buffers[lane].popleft() if len(buffers[lane]) > 0 else 0 for lane in indices], dtype=self.dtype) & self.mask
+
+	def write_port(self, name: str, lanes: Union[slice, "numpy.ndarray"], value) -> None:
+		buffers = self.get_output_buffers(name)
+		values = numpy.broadcast_to(value, (len(self.get_lane_indices(lanes)),))
+		for lane, item in zip(self.get_lane_indices(lanes), values): buffers[lane].append(int(item))
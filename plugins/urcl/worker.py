@@ -0,0 +1,308 @@
+from array import array
+from collections import deque
+from multiprocessing import Process, Queue, RawValue
+from queue import SimpleQueue
+from threading import Thread
+from typing import Any, Tuple, Union
+import time
+from plugins.urcl.emulator import HALT_BUDGET, HALT_FAULT, HALT_STOPPED, FlagPoller, IDebugger, IPort, RandomPort, URCLEmulator
+from plugins.urcl.optimizer import optimize
+from plugins.urcl.parser import ParsingResult, parse_source
+from plugins.urcl.trace import TraceReplayer, TraceWriter
+
+STREAM_COMMANDS = "commands"
+STREAM_REPORTS = "reports"
+IO = "io"
+DEBUG_OPEN = "open"
+DEBUG_CONTINUE = "continue"
+DEBUG_BREAKPOINT_SET = "break"
+DEBUG_BREAKPOINT_REMOVE = "unbreak"
+DEBUG_STEP_INTO = "step"
+DEBUG_STEP_OVER = "over"
+DEBUG_STEP_OUT = "out"
+DEBUG_STEP_COUNT = "step_count"
+DEBUG_RUN_TO_ADDRESS = "run_address"
+DEBUG_RUN_TO_REGISTER = "run_register"
+DEBUG_RUN_TO_MEMORY_WRITE = "run_write"
+DEBUG_STEP_BACK = "step_back"
+DEBUG_REVERSE_CONTINUE = "reverse_continue"
+DEBUG_QUERY_MEMORY = "memory"
+DEBUG_QUERY_MEMORY_RANGE = "memory_range"
+DEBUG_QUERY_HOTPATHS = "hotpaths"
+DEBUG_QUERY_PROFILE = "profile"
+DEBUG_QUERY_CALL_PROFILE = "call_profile"
+DEBUG_QUERY_COVERAGE = "coverage"
+DEBUG_SAVE_STATE = "save_state"
+DEBUG_COUNTERS = "counters"
+DEBUG_CLOSE = "close"
+DEBUG_LOAD = "load"
+DEBUG_STOP = "stop"
+DEBUG_FINISHED = "finished"
+BACKEND_PROCESS = "process"
+BACKEND_THREAD = "thread"
+FIELD_LINE = "line"
+FIELD_REGISTERS = "registers"
+FIELD_STACK = "stack"
+FIELD_CALLS = "call_stack"
+FIELD_HOTPATH = "hotpaths"
+FIELD_BITS = "bits"
+FIELD_SNAPSHOT = "snapshot"
+FIELD_TIME = "time"
+
+def _pack_words(values: "list[int]", bits: int) -> Any:
+	return array("Q", values) if bits > 0 and bits <= 64 else values
+
+def _get_status(debug: IDebugger, data: dict) -> "dict[str, Any]":
+	registers = debug.get_registers()
+	stack = debug.get_stack()
+	calls = debug.get_call_stack()
+	last_registers, last_stack, last_calls = data.get(FIELD_SNAPSHOT, ({}, [], []))
+	data[FIELD_SNAPSHOT] = (registers, stack, calls)
+	kept = 0
+	while kept < len(calls) and kept < len(last_calls) and calls[kept] == last_calls[kept]: kept += 1
+	return {
+		FIELD_LINE: debug.get_line(),
+		FIELD_REGISTERS: { name: registers[name] for name in registers if last_registers.get(name) != registers[name] },
+		FIELD_STACK: (len(stack), { index: stack[index] for index in range(len(stack)) if index >= len(last_stack) or last_stack[index] != stack[index] }),
+		FIELD_CALLS: (len(last_calls) - kept, calls[kept:])
+	}
+
+def _on_break(debug: IDebugger, data: dict) -> None:
+	commands: Queue = data[STREAM_COMMANDS]
+	reports: Queue = data[STREAM_REPORTS]
+	reports.put(DEBUG_OPEN)
+	reports.put(_get_status(debug, data))
+	command = commands.get()
+	while command == DEBUG_QUERY_MEMORY or command == DEBUG_QUERY_MEMORY_RANGE or command == DEBUG_QUERY_HOTPATHS or command == DEBUG_QUERY_PROFILE or command == DEBUG_QUERY_CALL_PROFILE or command == DEBUG_QUERY_COVERAGE or command == DEBUG_SAVE_STATE or command == DEBUG_BREAKPOINT_SET or command == DEBUG_BREAKPOINT_REMOVE:
+		if command == DEBUG_QUERY_HOTPATHS:
+			reports.put(debug.get_hotpaths())
+		elif command == DEBUG_QUERY_PROFILE:
+			reports.put(debug.get_instruction_profile())
+		elif command == DEBUG_QUERY_CALL_PROFILE:
+			reports.put(debug.get_call_profile())
+		elif command == DEBUG_QUERY_COVERAGE:
+			reports.put(debug.get_line_coverage())
+		elif command == DEBUG_SAVE_STATE:
+			try:
+				debug.save_state(commands.get())
+				reports.put("")
+			except Exception as ex: reports.put(str(ex))
+		elif command == DEBUG_QUERY_MEMORY:
+			reports.put(debug.read_memory(commands.get()))
+		elif command == DEBUG_QUERY_MEMORY_RANGE:
+			address, count = commands.get()
+			reports.put(_pack_words(debug.read_memory_range(address, count), data.get(FIELD_BITS, 0)))
+		elif command == DEBUG_BREAKPOINT_SET:
+			debug.set_breakpoint(commands.get())
+		elif command == DEBUG_BREAKPOINT_REMOVE:
+			debug.remove_breakpoint(commands.get())
+		command = commands.get()
+	if command == DEBUG_STEP_INTO: debug.step_into()
+	elif command == DEBUG_STEP_OVER: debug.step_over()
+	elif command == DEBUG_STEP_OUT: debug.step_out()
+	elif command == DEBUG_CONTINUE: debug.resume()
+	elif command == DEBUG_STEP_COUNT: debug.step_count(commands.get())
+	elif command == DEBUG_RUN_TO_ADDRESS: debug.run_to_address(commands.get())
+	elif command == DEBUG_RUN_TO_REGISTER: debug.run_to_register(*commands.get())
+	elif command == DEBUG_RUN_TO_MEMORY_WRITE: debug.run_to_memory_write(commands.get())
+	elif command == DEBUG_STEP_BACK: debug.step_back()
+	elif command == DEBUG_REVERSE_CONTINUE: debug.reverse_continue()
+	elif command == DEBUG_STOP: debug.halt(HALT_STOPPED)
+	reports.put(DEBUG_CLOSE)
+
+class DebuggerPoller(FlagPoller):
+	def __init__(self, flag, stop_flag, reports: Queue, publish_interval: float = 0.25, yield_slices: bool = False) -> None:
+		super().__init__(flag)
+		self.stop_flag = stop_flag
+		self.reports = reports
+		self.publish_interval = publish_interval
+		self.next_publish = 0.0
+		self.yield_slices = yield_slices
+
+	def __call__(self, machine: URCLEmulator) -> bool:
+		if self.stop_flag.value != 0:
+			machine.halt(HALT_STOPPED)
+			return False
+		now = time.monotonic()
+		if now >= self.next_publish:
+			self.next_publish = now + self.publish_interval
+			self.reports.put(DEBUG_COUNTERS)
+			self.reports.put({ **machine.get_counters(), FIELD_TIME: now })
+		if self.yield_slices: time.sleep(0)
+		return super().__call__(machine)
+
+class DebuggerTextPort(IPort):
+	def __init__(self, buffer_size: int = 1024, flush_interval: float = 0.05) -> None:
+		self.buffer: deque[int] = deque()
+		self.output: list[str] = []
+		self.buffer_size = buffer_size
+		self.flush_interval = flush_interval
+		self.last_flush = 0.0
+
+	def read(self, machine: URCLEmulator) -> int:
+		self.flush(machine)
+		data = machine.get_port_data()
+		commands: Queue = data[STREAM_COMMANDS]
+
+		while len(self.buffer) == 0:
+			op: str = commands.get()
+			if op == DEBUG_STOP:
+				machine.halt(HALT_STOPPED)
+				return 0
+			elif op == IO:
+				for c in commands.get():
+					try: self.buffer.append(ord(c))
+					except: self.buffer.append(0)
+		
+		return self.buffer.popleft()
+	
+	def write(self, machine: URCLEmulator, value: int) -> None:
+		self.output.append(chr(value & 0xFF))
+		if len(self.output) >= self.buffer_size or time.monotonic() - self.last_flush >= self.flush_interval: self.flush(machine)
+
+	def flush(self, machine: URCLEmulator) -> None:
+		self.last_flush = time.monotonic()
+		if len(self.output) == 0: return
+		reports: Queue = machine.get_port_data()[STREAM_REPORTS]
+		reports.put(IO)
+		reports.put("".join(self.output))
+		self.output.clear()
+
+	def get_state(self) -> Any: return list(self.buffer)
+	def set_state(self, state: Any) -> None: self.buffer = deque(state)
+
+class RunOptions:
+	def __init__(self, source: str) -> None:
+		self.source = source
+		self.replay_path: Union[str, None] = None
+		self.state_path: Union[str, None] = None
+		self.trace_path: Union[str, None] = None
+		self.optimize: bool = False
+		self.profile: bool = False
+		self.record: bool = False
+		self.coverage: bool = False
+		self.instruction_budget: int = -1
+		self.time_budget: float = -1.0
+		self.breakpoints: list[int] = []
+
+def create_emulator(parsed: ParsingResult, optimize_program: bool = False, replay_path: Union[str, None] = None) -> Tuple[URCLEmulator, int]:
+	program = parsed.program
+	labels = parsed.labels
+	removed = 0
+	result = URCLEmulator() if replay_path == None else TraceReplayer(replay_path)
+	if optimize_program:
+		optimized = optimize(program, labels)
+		program = optimized.program
+		labels = optimized.labels
+		removed = optimized.removed
+		result.set_line_map(optimized.line_map)
+		result.reserve_registers(optimized.register_count)
+	result.add_port("TEXT", DebuggerTextPort())
+	result.add_port("RAND", RandomPort())
+	result.load_program_rom(program)
+	for name in labels: result.add_label(labels[name], name)
+	return (result, removed)
+
+def prepare_emulator(options: RunOptions) -> URCLEmulator:
+	parsed = parse_source(options.source)
+	if len(parsed.errors) > 0: raise Exception("\n".join([f"Error (ln {line}): {error}" for line, error in parsed.errors]))
+	machine, removed = create_emulator(parsed, options.optimize, options.replay_path)
+	if options.state_path != None: machine.load_state(options.state_path)
+	if options.replay_path == None:
+		if options.profile: machine.set_profiling(True)
+		if options.record: machine.set_recording(True)
+		if options.trace_path != None: machine.set_tracer(TraceWriter(options.trace_path))
+	machine.set_call_profiling(True)
+	if options.coverage: machine.set_coverage(True)
+	machine.set_budget(options.instruction_budget, options.time_budget)
+	for breakpoint in options.breakpoints: machine.set_breakpoint(breakpoint)
+	return machine
+
+def _on_serve(commands: Queue, reports: Queue, pause_flag, stop_flag, poll_interval: int, yield_slices: bool = False) -> None:
+	streams = { STREAM_COMMANDS: commands, STREAM_REPORTS: reports }
+	while True:
+		if commands.get() != DEBUG_LOAD: continue
+		options: RunOptions = commands.get()
+		try: machine = prepare_emulator(options)
+		except Exception as ex:
+			reports.put(IO)
+			reports.put(f"{ex}\n")
+			reports.put(DEBUG_FINISHED)
+			continue
+		machine.set_poller(DebuggerPoller(pause_flag, stop_flag, reports, yield_slices=yield_slices), poll_interval)
+		machine.set_break_callback(_on_break, { **streams, FIELD_BITS: machine.integer_bits })
+		machine.set_port_data(streams)
+		try:
+			machine.execute()
+			reason = machine.get_halt_reason()
+			if reason != None and (reason.kind == HALT_BUDGET or reason.kind == HALT_FAULT):
+				reports.put(IO)
+				reports.put(f"\n{reason}\n")
+			if options.coverage:
+				reports.put(DEBUG_QUERY_COVERAGE)
+				reports.put(machine.get_line_coverage())
+		except:
+			reports.put(IO)
+			reports.put("\nAn internal error occurred in the debugger.\n")
+		reports.put(DEBUG_FINISHED)
+
+class DebuggerWorker:
+	def __init__(self, poll_interval: int = 4096) -> None:
+		self.commands = Queue()
+		self.reports = Queue()
+		self.pause_flag = RawValue("b", 0)
+		self.stop_flag = RawValue("b", 0)
+		self.process = Process(target=_on_serve, daemon=True, args=[self.commands, self.reports, self.pause_flag, self.stop_flag, poll_interval])
+		self.process.start()
+		self.busy = False
+		self.check_delay_ms = 0
+
+	def is_alive(self) -> bool: return self.process.is_alive()
+
+	def load(self, options: RunOptions) -> None:
+		self.pause_flag.value = 0
+		self.stop_flag.value = 0
+		self.busy = True
+		self.commands.put(DEBUG_LOAD)
+		self.commands.put(options)
+
+	def stop(self, timeout: float = 1.0) -> bool:
+		if not self.busy: return True
+		self.stop_flag.value = 1
+		self.commands.put(DEBUG_STOP)
+		deadline = time.monotonic() + timeout
+		try:
+			while self.reports.get(timeout=max(deadline - time.monotonic(), 0)) != DEBUG_FINISHED: pass
+		except: return False
+		self.busy = False
+		return True
+
+	def terminate(self) -> None:
+		self.process.terminate()
+
+class ThreadFlag:
+	def __init__(self) -> None:
+		self.value = 0
+
+class ThreadDebuggerWorker(DebuggerWorker):
+	def __init__(self, poll_interval: int = 1024) -> None:
+		self.commands = SimpleQueue()
+		self.reports = SimpleQueue()
+		self.pause_flag = ThreadFlag()
+		self.stop_flag = ThreadFlag()
+		self.thread = Thread(target=_on_serve, daemon=True, args=[self.commands, self.reports, self.pause_flag, self.stop_flag, poll_interval, True])
+		self.thread.start()
+		self.busy = False
+		self.abandoned = False
+		self.check_delay_ms = 10
+
+	def is_alive(self) -> bool: return self.thread.is_alive() and not self.abandoned
+
+	def terminate(self) -> None:
+		self.abandoned = True
+		self.stop_flag.value = 1
+
+def create_worker(backend: str) -> DebuggerWorker:
+	if backend == BACKEND_PROCESS: return DebuggerWorker()
+	elif backend == BACKEND_THREAD: return ThreadDebuggerWorker()
+	raise Exception(f"Unknown debugger backend \"{backend}\".")
@@ -0,0 +1,108 @@
+import asyncio
+from plugins.urcl.emulator import HALT_BUDGET, HALT_END_OF_ROM, HALT_FAULT, HALT_INSTRUCTION, HALT_STOPPED, AsyncQueuePort, MemoryTapePort, URCLEmulator
+from plugins.urcl.parser import parse_source
+
+_LOOP = "IMM R1 50\n.loop\nDEC R1 R1\nBNZ .loop R1\nHLT\n"
+
+def create(source: str, port: MemoryTapePort = None, integer_mask: int = 0xFFFF) -> URCLEmulator:
+	machine = URCLEmulator(integer_mask)
+	machine.add_port("TEXT", port if port != None else MemoryTapePort([1, 2, 3]))
+	machine.load_program_rom(parse_source(source).program)
+	return machine
+
+def test_halt_reasons():
+	machine = create(_LOOP)
+	machine.execute()
+	assert machine.get_halt_reason().kind == HALT_INSTRUCTION
+	assert machine.get_halt_reason().line == 5
+	machine = create("IMM R1 3\nINC R1 R1\n")
+	machine.execute()
+	assert machine.get_halt_reason().kind == HALT_END_OF_ROM
+	machine = create("IMM R1 3\nDIV R1 R1 R0\n")
+	machine.execute()
+	reason = machine.get_halt_reason()
+	assert reason.kind == HALT_FAULT
+	assert reason.address == 1
+	assert str(reason).startswith("ZeroDivisionError")
+	machine = create(_LOOP)
+	machine.set_breakpoint(3)
+	machine.set_break_callback(lambda debugger, data: debugger.halt(HALT_STOPPED))
+	machine.execute()
+	assert machine.get_halt_reason().kind == HALT_STOPPED
+	assert str(machine.get_halt_reason()) == "Program was stopped. (ln 3)"
+
+def test_retired_counts():
+	machine = create(_LOOP)
+	machine.execute()
+	assert machine.retired == 102
+	machine = create("IMM R1 3\nINC R1 R1\n")
+	machine.execute()
+	assert machine.retired == 2
+	machine = create("IMM R1 3\nDIV R1 R1 R0\n")
+	machine.execute()
+	assert machine.retired == 1
+
+def test_retired_counts_while_debugging():
+	for command in ["resume", "step_into", "step_over", "step_count"]:
+		machine = create(_LOOP)
+		machine.set_breakpoint(3)
+		machine.set_break_callback(lambda debugger, data, command=command: debugger.step_count(2) if command == "step_count" else getattr(debugger, command)())
+		machine.execute()
+		assert machine.retired == 102
+		assert machine.get_halt_reason().kind == HALT_INSTRUCTION
+	machine = create(_LOOP)
+	machine.set_poller(lambda machine: True, 7)
+	machine.set_break_callback(lambda debugger, data: debugger.resume())
+	machine.execute()
+	assert machine.retired == 102
+
+def test_instruction_budget():
+	machine = create(_LOOP)
+	machine.set_budget(60)
+	machine.execute()
+	assert machine.get_halt_reason().kind == HALT_BUDGET
+	assert machine.retired == 60
+	machine = create(_LOOP)
+	machine.set_budget(60, check_interval=7)
+	machine.set_breakpoint(3)
+	machine.set_break_callback(lambda debugger, data: debugger.resume())
+	machine.execute()
+	assert machine.retired == 60
+	machine = create(_LOOP)
+	machine.set_budget(1000)
+	machine.execute()
+	assert machine.get_halt_reason().kind == HALT_INSTRUCTION
+
+def test_time_budget():
+	machine = create(".loop\nJMP .loop\n")
+	machine.set_budget(seconds=0.05, check_interval=100)
+	machine.execute()
+	assert machine.get_halt_reason().kind == HALT_BUDGET
+
+def test_memory_budget():
+	machine = create("STR 0 1\nSTR 0x10000 2\nSTR 0x20000 3\nHLT\n", integer_mask=0xFFFFFFFF)
+	machine.set_budget(memory_blocks=2)
+	machine.execute()
+	assert machine.get_halt_reason().kind == HALT_BUDGET
+	assert machine.read_memory(0x20000) == 0
+
+def test_output_budget():
+	port = MemoryTapePort()
+	machine = create(".loop\nOUT %TEXT 65\nJMP .loop\n", port)
+	machine.set_budget(output_writes=3)
+	machine.execute()
+	assert machine.get_halt_reason().kind == HALT_BUDGET
+	assert port.get_output() == [65, 65, 65]
+
+def test_run_async():
+	port = AsyncQueuePort([])
+	machine = create("IN R1 %TEXT\nIN R2 %TEXT\nADD R3 R1 R2\nOUT %TEXT R3\nHLT\n", port)
+	async def feed() -> None:
+		for value in [4, 5]:
+			await asyncio.sleep(0.01)
+			port.feed([value])
+	async def main() -> None: await asyncio.gather(machine.run_async(), feed())
+	asyncio.run(main())
+	assert port.output == [9]
+	assert machine.retired == 5
+	assert machine.get_halt_reason().kind == HALT_INSTRUCTION
@@ -0,0 +1,50 @@
+import random
+from editor.document import TextDocument
+
+def check(document: TextDocument, text: str) -> None:
+	assert document.get_text() == text
+	assert document.get_length() == len(text)
+	lines = text.split("\n")
+	assert document.get_line_count() == len(lines)
+	for line in range(len(lines)): assert document.get_line(line + 1) == lines[line]
+	for offset in range(0, len(text) + 1, 7):
+		line, column = document.get_position(offset)
+		assert line == text.count("\n", 0, offset) + 1
+		assert document.get_offset(line, column) == offset
+
+def test_edits_match_string_model():
+	rng = random.Random(1)
+	text = "hello\nworld\n"
+	document = TextDocument(text)
+	for _ in range(2000):
+		if rng.random() < 0.6 or len(text) == 0:
+			offset = document._append_offset if rng.random() < 0.3 and document._append_offset >= 0 else rng.randint(0, len(text))
+			inserted = rng.choice(["a", "\n", "xy\nz", "", "q" * rng.randint(1, 5)])
+			document.insert(offset, inserted)
+			text = text[:offset] + inserted + text[offset:]
+		else:
+			start = rng.randint(0, len(text))
+			end = rng.randint(start, len(text))
+			document.delete(start, end)
+			text = text[:start] + text[end:]
+		check(document, text)
+
+def test_get_range():
+	document = TextDocument("abc")
+	document.insert(3, "def\nghi")
+	document.insert(0, ">")
+	assert document.get_range(2, 6) == "bcde"
+	assert document.get_range(-5, 100) == ">abcdef\nghi"
+	assert document.get_range(5, 2) == ""
+
+def test_changes_are_reported():
+	document = TextDocument("one\ntwo\n")
+	changes = []
+	document.bind(changes.append)
+	document.insert(4, "new\n")
+	document.delete(0, 4)
+	assert [(change.line, change.column, change.text, change.get_line_delta()) for change in changes] == [(2, 0, "new\n", 1), (1, 0, "", -1)]
+	document.unbind(changes.append)
+	document.set_text("x")
+	assert len(changes) == 2
+	check(document, "x")
@@ -0,0 +1,42 @@
+from plugins.urcl.emulator import HALT_BUDGET, HALT_FAULT, HALT_INSTRUCTION
+from plugins.urcl.fuzzer import Fuzzer, main, parse_program, run_case
+
+_SOURCE = """IN R1 %TEXT
+BNE .done R1 70
+IN R1 %TEXT
+BNE .done R1 85
+IN R1 %TEXT
+BNE .hang R1 90
+DIV R2 R1 R0
+.hang
+BNE .done R1 72
+.spin
+JMP .spin
+.done
+HLT
+"""
+
+def test_run_case():
+	parsed = parse_program(_SOURCE)
+	assert run_case(parsed, b"", 100).status == HALT_INSTRUCTION
+	assert run_case(parsed, b"FUH", 100).status == HALT_BUDGET
+	case = run_case(parsed, b"FUZ", 100)
+	assert case.status == HALT_FAULT
+	assert case.steps == 6
+	assert case.addresses == set(range(6))
+	assert "ZeroDivisionError" in case.message
+
+def test_fuzzer_finds_new_coverage():
+	fuzzer = Fuzzer(_SOURCE, budget=100, max_length=8, seed=1)
+	fuzzer.add_seed(b"FU")
+	fuzzer.run(300, batch_size=50)
+	assert fuzzer.executions == 301
+	assert len(fuzzer.corpus) >= 2
+	assert fuzzer.get_coverage() > 0.5
+	assert all([len(data) <= 8 for data in fuzzer.corpus])
+
+def test_command_line(tmp_path):
+	source = tmp_path / "program.urcl"
+	source.write_text("IN R1 %TEXT\nHLT\n")
+	assert main([str(source), "--iterations", "20", "--jobs", "1", "--corpus", str(tmp_path / "corpus"), "--seed", "1"]) == 0
+	assert len(list((tmp_path / "corpus").iterdir())) >= 1
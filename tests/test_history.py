@@ -0,0 +1,95 @@
+import random
+from plugins.urcl.emulator import HALT_INSTRUCTION, MemoryTapePort, URCLEmulator
+from plugins.urcl.parser import parse_source
+
+_SOURCE = """IMM R1 40
+.loop
+IN R2 %TAPE
+ADD R3 R3 R2
+STR R1 R3
+PSH R3
+POP R4
+CAL .count
+DEC R1 R1
+BNZ .loop R1
+HLT
+.count
+INC R5 R5
+RET
+"""
+
+def create(source: str, interval: int) -> URCLEmulator:
+	machine = URCLEmulator(0xFFFF)
+	machine.add_port("TAPE", MemoryTapePort(list(range(300))))
+	machine.load_program_rom(parse_source(source).program)
+	machine.set_recording(True, interval)
+	return machine
+
+def capture(machine: URCLEmulator) -> tuple:
+	return list(machine.general_registers), list(machine.special_registers), list(machine.call_stack), machine.read_memory_range(0, 64), machine.read_memory_range(0xFFC0, 64)
+
+def replay(steps: int, interval: int) -> URCLEmulator:
+	machine = create(_SOURCE, interval)
+	machine.executing = True
+	for _ in range(steps): machine.step()
+	return machine
+
+def test_rewind_matches_fresh_run():
+	rng = random.Random(1)
+	for interval in [1, 3, 7, 50]:
+		machine = create(_SOURCE, interval)
+		machine.execute()
+		total = machine.history_step
+		for step in [rng.randrange(total + 1) for _ in range(8)] + [0, total]:
+			machine.rewind_to(step)
+			assert capture(machine) == capture(replay(step, interval))
+			assert machine.executing == (step < total)
+
+def test_rewind_after_halt():
+	machine = create("".join([f"IMM R{index % 4 + 1} {index + 1}\n" for index in range(8)]) + "HLT\n", 3)
+	machine.execute()
+	assert machine.get_halt_reason().kind == HALT_INSTRUCTION
+	machine.rewind_to(2)
+	assert machine.special_registers[machine.pc] == 2
+	assert machine.general_registers[1:] == [1, 2, 0, 0]
+	assert machine.executing
+	assert machine.get_halt_reason() == None
+	machine.rewind_to(machine.history_end)
+	assert not machine.executing
+	assert machine.get_halt_reason().kind == HALT_INSTRUCTION
+	machine.rewind_to(3)
+	machine.execute()
+	assert machine.general_registers[1:] == [5, 6, 7, 8]
+	assert machine.get_halt_reason().kind == HALT_INSTRUCTION
+
+def test_step_back():
+	machine = create(_SOURCE, 5)
+	machine.execute()
+	total = machine.history_step
+	machine.step_back()
+	assert machine.history_step == total - 1
+	assert machine.executing
+	assert capture(machine) == capture(replay(total - 1, 5))
+
+def test_reverse_continue():
+	machine = create(_SOURCE, 7)
+	machine.execute()
+	machine.set_breakpoint(5)
+	machine.reverse_continue()
+	assert machine.get_line() == 5
+	assert machine.read_register(1) == 1
+	assert capture(machine) == capture(replay(machine.history_step, 7))
+	machine.reverse_continue()
+	assert machine.get_line() == 5
+	assert machine.read_register(1) == 2
+
+def test_port_output_is_not_repeated():
+	machine = URCLEmulator()
+	port = MemoryTapePort()
+	machine.add_port("TEXT", port)
+	machine.load_program_rom(parse_source("OUT %TEXT 1\nOUT %TEXT 2\nOUT %TEXT 3\nHLT\n").program)
+	machine.set_recording(True, 2)
+	machine.execute()
+	machine.rewind_to(1)
+	machine.execute()
+	assert port.get_output() == [1, 2, 3]
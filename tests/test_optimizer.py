@@ -0,0 +1,75 @@
+from plugins.urcl.emulator import HALT_FAULT, HALT_INSTRUCTION, MemoryTapePort, URCLEmulator
+from plugins.urcl.optimizer import optimize
+from plugins.urcl.parser import parse_source
+
+def run(source: str, data: "list[int]" = [], optimized: bool = False) -> "tuple":
+	parsed = parse_source(source)
+	assert len(parsed.errors) == 0
+	machine = URCLEmulator()
+	port = MemoryTapePort(data)
+	machine.add_port("TEXT", port)
+	if optimized:
+		result = optimize(parsed.program, parsed.labels)
+		machine.load_program_rom(result.program)
+		machine.reserve_registers(result.register_count)
+	else: machine.load_program_rom(parsed.program)
+	machine.execute()
+	return port.get_output(), machine.get_halt_reason().kind, machine.general_registers[1:]
+
+def check(source: str, data: "list[int]" = []) -> "tuple":
+	expected = run(source, data)
+	assert run(source, data, True) == expected
+	return expected
+
+def test_output_matches():
+	source = """BITS 16
+IMM R1 5
+IMM R2 3
+MOV R3 R1
+ADD R3 R3 0
+MLT R4 R3 8
+DIV R5 R4 4
+MOD R6 R4 16
+IMM R7 9
+IMM R7 10
+JMP .a
+.a
+JMP .b
+.b
+ADD R1 R1 R2
+MOV R1 R1
+BRL .b R1 30
+OUT %TEXT R1
+HLT
+"""
+	assert check(source)[:2] == ([32], HALT_INSTRUCTION)
+	result = optimize(parse_source(source).program, parse_source(source).labels)
+	assert result.removed > 0
+	assert len(result.program) + result.removed == len(parse_source(source).program)
+
+def test_calls_and_returns():
+	source = """IMM R1 0
+.loop
+CAL .increment
+OUT %TEXT R1
+BRL .loop R1 4
+HLT
+.increment
+ADD R1 R1 1
+MOV R2 R2
+RET
+"""
+	assert check(source)[:2] == ([1, 2, 3, 4], HALT_INSTRUCTION)
+
+def test_division_faults_are_kept():
+	assert check("IN R1 %TEXT\nDIV R2 R1 R1\nIMM R2 5\nOUT %TEXT R2\nHLT\n", [0])[:2] == ([], HALT_FAULT)
+	assert check("IN R1 %TEXT\nMOD R2 R1 R1\nIMM R2 5\nOUT %TEXT R2\nHLT\n", [0])[:2] == ([], HALT_FAULT)
+
+def test_computed_jumps_are_not_rewritten():
+	assert check("IMM R2 10\nJMP .skip\nIMM R2 1\nOUT %TEXT R2\nHLT\n.skip\nIMM R3 3\nJMP R3\n")[:2] == ([10], HALT_INSTRUCTION)
+
+def test_register_count_covers_removed_stores():
+	parsed = parse_source("IMM R9 1\nIMM R1 2\nOUT %TEXT R1\nHLT\n")
+	result = optimize(parsed.program, parsed.labels)
+	assert result.register_count == 10
+	assert run("IMM R9 1\nIMM R1 2\nOUT %TEXT R1\nHLT\n", optimized=True)[0] == [2]
@@ -0,0 +1,73 @@
+import json
+import pytest
+from plugins.urcl.emulator import _STATE_MAGIC, AsyncQueuePort, MemoryTapePort, URCLEmulator
+from plugins.urcl.parser import parse_source
+
+_SOURCE = """IMM R1 40
+.loop
+IN R2 %TAPE
+ADD R3 R3 R2
+STR R1 R3
+STR 0x12345 R3
+PSH R3
+CAL .count
+POP R4
+DEC R1 R1
+BNZ .loop R1
+OUT %TAPE R3
+HLT
+.count
+INC R5 R5
+OUT %TAPE R5
+RET
+"""
+
+def create(source: str = _SOURCE) -> URCLEmulator:
+	machine = URCLEmulator()
+	machine.add_port("TAPE", MemoryTapePort(list(range(100, 200))))
+	machine.load_program_rom(parse_source(source).program)
+	return machine
+
+def test_round_trip(tmp_path):
+	path = str(tmp_path / "state")
+	expected = create()
+	expected.executing = True
+	for _ in range(150): expected.step()
+	expected.save_state(path)
+	actual = create()
+	actual.load_state(path)
+	assert actual.general_registers == expected.general_registers
+	assert actual.special_registers == expected.special_registers
+	assert actual.call_stack == expected.call_stack
+	assert actual.memory_blocks == expected.memory_blocks
+	assert actual.ports[0].get_output() == expected.ports[0].get_output()
+	expected.execute()
+	actual.execute()
+	assert actual.general_registers == expected.general_registers
+	assert actual.ports[0].get_output() == expected.ports[0].get_output()
+	assert actual.get_halt_reason().kind == expected.get_halt_reason().kind
+
+def test_header_is_not_executable(tmp_path):
+	path = tmp_path / "state"
+	create().save_state(str(path))
+	data = path.read_bytes()[len(_STATE_MAGIC):]
+	header = json.loads(data[8:8 + int.from_bytes(data[:8], "little")])
+	assert header["ports"]["TAPE"] == ["MemoryTapePort", [list(range(100, 200)), []]]
+
+def test_rejects_other_program(tmp_path):
+	path = str(tmp_path / "state")
+	create().save_state(path)
+	with pytest.raises(Exception): create("IMM R1 1\nHLT\n").load_state(path)
+
+def test_async_port_state(tmp_path):
+	path = str(tmp_path / "state")
+	machine = URCLEmulator()
+	port = AsyncQueuePort([1, 2, 3])
+	machine.add_port("TAPE", port)
+	machine.load_program_rom(parse_source("IN R1 %TAPE\nHLT\n").program)
+	machine.save_state(path)
+	restored = URCLEmulator()
+	restored.add_port("TAPE", AsyncQueuePort([]))
+	restored.load_program_rom(parse_source("IN R1 %TAPE\nHLT\n").program)
+	restored.load_state(path)
+	assert list(restored.ports[0].input) == [1, 2, 3]
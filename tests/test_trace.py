@@ -0,0 +1,76 @@
+from plugins.urcl.emulator import MemoryTapePort, RandomPort, URCLEmulator
+from plugins.urcl.parser import parse_source
+from plugins.urcl.trace import TraceReplayer, TraceWriter, compare_traces, main
+
+_SOURCE = """IMM R1 20
+.loop
+IN R2 %RAND
+IN R3 %TAPE
+ADD R4 R4 R3
+STR R1 R2
+PSH R4
+CAL .emit
+POP R5
+DEC R1 R1
+BNZ .loop R1
+HLT
+.emit
+OUT %TAPE R4
+RET
+"""
+
+def create(machine: URCLEmulator, source: str = _SOURCE) -> URCLEmulator:
+	parsed = parse_source(source)
+	machine.add_port("TAPE", MemoryTapePort(list(range(100, 200))))
+	machine.add_port("RAND", RandomPort())
+	machine.load_program_rom(parsed.program)
+	for name in parsed.labels: machine.add_label(parsed.labels[name], name)
+	return machine
+
+def capture(machine: URCLEmulator) -> tuple:
+	return list(machine.general_registers), list(machine.special_registers), list(machine.call_stack), machine.read_memory_range(0, 32), machine.read_memory_range(0xFFFFFFFFFFFFFFE0, 32)
+
+def record(path: str, source: str = _SOURCE) -> "list[tuple]":
+	machine = create(URCLEmulator(), source)
+	machine.set_tracer(TraceWriter(path))
+	machine.executing = True
+	states = []
+	while machine.executing:
+		states.append(capture(machine))
+		machine.step()
+	machine.tracer.close()
+	states.append(capture(machine))
+	return states, machine.ports[0].get_output()
+
+def test_round_trip(tmp_path):
+	path = str(tmp_path / "a.trace")
+	states, output = record(path)
+	replayer = create(TraceReplayer(path))
+	replayer.executing = True
+	index = 0
+	while replayer.executing:
+		assert capture(replayer) == states[index]
+		replayer.step_into()
+		index += 1
+	assert index == len(states) - 1
+	assert replayer.ports[0].get_output() == output
+
+def test_compare_traces(tmp_path):
+	first = str(tmp_path / "a.trace")
+	second = str(tmp_path / "b.trace")
+	record(first)
+	record(second)
+	assert compare_traces(first, first) == None
+	divergence = compare_traces(first, second)
+	assert divergence != None
+	assert divergence.address == 1
+	assert str(divergence).startswith("Traces diverge at step")
+
+def test_command_line(tmp_path, capsys):
+	source = tmp_path / "program.urcl"
+	source.write_text("IMM R1 3\n.loop\nOUT %TEXT 65\nDEC R1 R1\nBNZ .loop R1\nHLT\n")
+	output = tmp_path / "output"
+	assert main(["record", str(source), str(tmp_path / "a.trace"), "--output", str(output)]) == 0
+	assert output.read_text() == "AAA"
+	assert main(["compare", str(tmp_path / "a.trace"), str(tmp_path / "a.trace")]) == 0
+	assert capsys.readouterr().out == "Traces are identical.\n"
@@ -0,0 +1,68 @@
+import pytest
+from plugins.urcl.emulator import IPort, URCLEmulator
+from plugins.urcl.parser import parse_source
+from plugins.urcl.transpiler import build, load, transpile
+
+class RecordingPort(IPort):
+	def __init__(self) -> None:
+		self.output: list[int] = []
+
+	def read(self, machine: URCLEmulator) -> int: return 0
+	def write(self, machine: URCLEmulator, value: int) -> None: self.output.append(value)
+
+_SOURCE = """BITS 16
+IMM R1 0
+IMM R2 1
+.loop
+ADD R3 R1 R2
+MOV R1 R2
+MOV R2 R3
+PSH R3
+CAL .count
+POP R4
+STR R5 R4
+INC R5 R5
+BRL .loop R5 20
+NOR R6 R5 R1
+OUT %NUMB R2
+OUT %TEXT 10
+HLT
+.count
+LOD R7 SP
+ADD R7 R7 1
+RET
+"""
+
+def execute(source: str) -> "dict":
+	scope = {"__name__": "transpiled"}
+	exec(transpile(parse_source(source).program), scope)
+	return scope
+
+def test_matches_emulator(tmp_path):
+	machine = URCLEmulator()
+	port = RecordingPort()
+	machine.add_port("NUMB", port)
+	machine.add_port("TEXT", port)
+	machine.load_program_rom(parse_source(_SOURCE).program)
+	machine.execute()
+	path = build(_SOURCE, str(tmp_path))
+	assert build(_SOURCE, str(tmp_path)) == path
+	output = []
+	registers, memory = load(path).run(write_port=lambda name, value: output.append(value))
+	assert output == port.output
+	for index in range(1, 8): assert registers[f"R{index}"] == machine.read_register(index)
+	assert registers["SP"] == machine.read_special_register(machine.get_special_register_id("SP"))
+
+def test_halts_at_end_of_program():
+	registers, memory = execute("IMM R1 4\nINC R1 R1\n")["run"]()
+	assert registers["R1"] == 5
+
+def test_division_by_zero_faults():
+	with pytest.raises(ZeroDivisionError): execute("IMM R1 4\nIMM R2 0\nDIV R3 R1 R2\nHLT\n")["run"]()
+
+def test_output_is_masked(capsys):
+	execute("OUT %TEXT 321\nHLT\n")["run"]()
+	assert capsys.readouterr().out == chr(321 & 0xFF)
+
+def test_build_reports_errors(tmp_path):
+	with pytest.raises(Exception): build("IMM R1\n", str(tmp_path))
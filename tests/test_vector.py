@@ -0,0 +1,96 @@
+import pytest
+from plugins.urcl.emulator import MemoryTapePort, URCLEmulator
+from plugins.urcl.parser import parse_source
+
+numpy = pytest.importorskip("numpy")
+from plugins.urcl.vector import VectorEmulator
+
+_COLLATZ = """BITS 16
+IN R1 %NUMB
+IMM R2 0
+.loop
+BRE .done R1 1
+BEV .even R1
+MLT R1 R1 3
+INC R1 R1
+JMP .next
+.even
+BSR R1 R1 1
+.next
+INC R2 R2
+PSH R2
+CAL .record
+POP R3
+JMP .loop
+.record
+LOD R4 SP
+NOR R5 R4 R1
+RET
+.done
+DIV R6 R2 R1
+MOD R7 R2 7
+SUB R8 R0 R2
+OUT %NUMB R2
+HLT
+"""
+
+def compare(source: str, inputs: "list[list[int]]") -> VectorEmulator:
+	program = parse_source(source).program
+	vector = VectorEmulator(len(inputs))
+	vector.load_program_rom(program)
+	vector.set_inputs("NUMB", inputs)
+	vector.execute()
+	for lane in range(len(inputs)):
+		machine = URCLEmulator()
+		port = MemoryTapePort(inputs[lane])
+		machine.add_port("NUMB", port)
+		machine.load_program_rom(parse_source(source).program)
+		machine.execute()
+		registers = vector.get_registers(lane)
+		for index in range(1, vector.register_count): assert registers[f"R{index}"] == machine.read_register(index)
+		assert registers["SP"] == machine.read_special_register(machine.get_special_register_id("SP"))
+		assert vector.get_output("NUMB", lane) == port.get_output()
+	return vector
+
+def test_lanes_match_scalar_emulator():
+	vector = compare(_COLLATZ, [[value] for value in range(1, 65)])
+	assert vector.is_halted()
+	assert len(vector.errors) == 0
+
+def test_wide_addresses_do_not_alias():
+	source = """BITS 32
+STR 0xFFFF 7
+STR 0x1FFFF 9
+LOD R1 0xFFFF
+OUT %NUMB R1
+LOD R1 0x1FFFF
+OUT %NUMB R1
+IN R2 %NUMB
+STR R2 R2
+LOD R3 R2
+OUT %NUMB R3
+LOD R4 0x10000
+OUT %NUMB R4
+HLT
+"""
+	vector = compare(source, [[5], [0x10000], [0x20005], [0xFFFFFFFF]])
+	assert vector.get_output("NUMB", 1) == [7, 9, 0x10000, 0x10000]
+	assert len(vector.memory_blocks) < 8
+
+def test_memory_is_allocated_on_demand():
+	vector = VectorEmulator(1000)
+	assert len(vector.memory_blocks) == 0
+	assert vector.read_memory(0x1234).shape == (1000,)
+
+def test_division_by_zero_faults_lane():
+	vector = VectorEmulator(2)
+	vector.load_program_rom(parse_source("IN R1 %NUMB\nDIV R2 10 R1\nOUT %NUMB R2\nHLT\n").program)
+	vector.set_inputs("NUMB", [[2], [0]])
+	vector.execute()
+	assert vector.get_output("NUMB", 0) == [5]
+	assert vector.get_output("NUMB", 1) == []
+	assert list(vector.errors) == [1]
+
+def test_rejects_invalid_configuration():
+	with pytest.raises(Exception): VectorEmulator(0)
+	with pytest.raises(Exception): VectorEmulator(4, memory_block_size=3)